@@ -1,15 +1,27 @@
-import io
-import unicodedata
-import requests
+import functools
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import numpy as np
 import pandas as pd
 import streamlit as st
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
 from datetime import datetime
 
+from top_precos.alertas import ListaObservacao
+from top_precos.canonico import VERSAO as VERSAO_CANONICA
+from top_precos.catalogo import Catalogo, Recorte
+from top_precos.dados import ErroPlanilha, preparar_fontes
+from top_precos.diagnostico import METRICAS, encerrar_rodada, iniciar_rodada, rodada_fragmento
+from top_precos.exportacao import exportar_csv, exportar_xlsx, generate_pdf
+from top_precos.fonte import abrir_fonte, interpretar_fontes
+from top_precos.formatacao import format_brl, cards_html, cards_html_pagina, cards_menor_preco_html_pagina
+from top_precos.historico import HistoricoPrecos
+from top_precos.lista import agrupar_por_mercado, lista_dataframe, resolver_selecao, subtotais_por_mercado, sugerir_lista
+from top_precos.snapshot import ler_snapshot, salvar_snapshot
+from top_precos.texto import norm
+
 # =========================
 # CONFIG GERAL + TEMA
 # =========================
@@ -20,6 +32,12 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+logger = logging.getLogger("top_precos.app")
+
+# Diagnóstico opcional: TOP_PRECOS_DIAGNOSTICO=1 (processo todo) ou ?diag=1 (esta sessão)
+DIAGNOSTICO = METRICAS.ativo or st.query_params.get("diag") == "1"
+rodada = iniciar_rodada(DIAGNOSTICO)
+
 # Paleta baseada no TOP Preços: azuis e verdes
 PRIMARY = "#4A90A4"
 SECONDARY = "#5BA05B"
@@ -30,8 +48,31 @@ TEXT = "#FFFFFF"
 MUTED = "#B0B0B0"
 ECONOMY = "#4CAF50"
 
-# URL da planilha
-DATA_URL = "https://docs.google.com/spreadsheets/d/e/2PACX-1vTQuWn9iSZkiuiaA5--9CSqfJ6NBxrCK_ClWfKH_es49sSWQkVEvkIB0h6Ow0EKZkHBwhN7IveSW7LR/pub?gid=1059501700&single=true&output=csv"
+# Snapshot do último catálogo bom, lido na partida enquanto a planilha baixa
+SNAPSHOT_PATH = os.environ.get("TOP_PRECOS_SNAPSHOT") or os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "catalogo.feather")
+
+# Histórico de preços (SQLite, só as mudanças entre cargas); TOP_PRECOS_HISTORICO=0 desliga
+HISTORICO_PATH = os.environ.get("TOP_PRECOS_HISTORICO") or os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "historico.sqlite")
+
+# Alertas de preço: regras em SQLite e caixa de saída em JSON Lines; TOP_PRECOS_ALERTAS=0 desliga
+ALERTAS_PATH = os.environ.get("TOP_PRECOS_ALERTAS") or os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "alertas.sqlite")
+ALERTAS_SAIDA = os.environ.get("TOP_PRECOS_ALERTAS_SAIDA") or os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "alertas.jsonl")
+
+# Tamanho máximo aceito para a planilha baixada (MB)
+MAX_PLANILHA_MB = float(os.environ.get("TOP_PRECOS_MAX_MB") or 50)
+
+# Cards renderizados por página nas listas de produtos
+CARDS_POR_PAGINA = 30
+
+# Regras de alerta listadas na interface (as mais recentes) e o rótulo de "sem mercado fixo"
+ALERTAS_EXIBIDOS = 20
+QUALQUER_MERCADO = "Qualquer mercado"
+
+# URL da planilha (TOP_PRECOS_DATA_URL aponta para outra fonte, ex.: servidor local de testes)
+DATA_URL = os.environ.get("TOP_PRECOS_DATA_URL") or "https://docs.google.com/spreadsheets/d/e/2PACX-1vTQuWn9iSZkiuiaA5--9CSqfJ6NBxrCK_ClWfKH_es49sSWQkVEvkIB0h6Ow0EKZkHBwhN7IveSW7LR/pub?gid=1059501700&single=true&output=csv"
+
+# Várias planilhas (URLs ou arquivos locais): TOP_PRECOS_FONTES="Norte=https://...; Sul=/dados/sul.csv"
+FONTES = interpretar_fontes(os.environ.get("TOP_PRECOS_FONTES", "")) or {"Planilha": DATA_URL}
 
 # CSS
 st.markdown(f"""
@@ -242,322 +283,420 @@ html, body, [data-testid="stAppViewContainer"] {{
 # =========================
 HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
 
-def format_brl(x):
-    if pd.isna(x):
-        return "-"
-    s = f"{float(x):,.2f}"
-    return "R$ " + s.replace(",", "X").replace(".", ",").replace("X", ".")
-
-def norm(s: str) -> str:
-    s = str(s or "").strip().lower()
-    s = "".join(ch for ch in unicodedata.normalize("NFD", s) if unicodedata.category(ch) != "Mn")
-    s = " ".join(s.split())
-    return s
+@st.cache_resource(show_spinner=False)
+def fonte_planilha(origem: str):
+    """Fonte compartilhada por todas as sessões (uma Session HTTP por URL)."""
+    return abrir_fonte(origem, ttl=120, timeout=25, headers=HEADERS, max_bytes=int(MAX_PLANILHA_MB * 1024 * 1024))
+
+@st.cache_resource(max_entries=3, show_spinner=False)
+def preparar_catalogo(versao: tuple, _conteudos: tuple):
+    """CSVs brutos (lidos em partes) → colunas padronizadas → um catálogo ordenado → índice de busca e resumos.
+
+    Chaveado só por ``versao``, os pares (fonte, hash do conteúdo): reruns da
+    interface e refreshes que trazem as mesmas planilhas reaproveitam o
+    resultado já preparado.
+    """
+    METRICAS.contar("catalogo_cache_miss")
+    # A versão do produto canônico entra no digest: regras novas não reaproveitam o snapshot antigo
+    digest = hashlib.sha256(repr((versao, VERSAO_CANONICA)).encode()).hexdigest()
+    # Com dados novos da rede, o snapshot lido na partida não é mais necessário
+    snapshot_salvo.clear()
+
+    with METRICAS.etapa("snapshot_leitura"):
+        lido = ler_snapshot(SNAPSHOT_PATH, digest, VERSAO_CANONICA)
+    if lido is not None:
+        METRICAS.contar("snapshot_hit")
+        # Histórico criado depois do snapshot: a mesma versão também entra (sem mudanças, não grava nada)
+        registrar_historico(lido[1])
+        catalogo = construir_catalogo(lido[1])
+        return catalogo.df, catalogo
 
-@st.cache_data(ttl=120)
-def load_from_google_sheets(url: str) -> pd.DataFrame:
     try:
-        r = requests.get(url, headers=HEADERS, timeout=25, allow_redirects=True)
-        r.raise_for_status()
-        return pd.read_csv(io.BytesIO(r.content))
+        with METRICAS.etapa("preparar") as etapa:
+            df, erros, precos = preparar_fontes({nome: conteudo for (nome, _), conteudo in zip(versao, _conteudos)})
+            etapa.linhas(len(df))
+    except ErroPlanilha as e:
+        st.error(str(e))
+        return pd.DataFrame(), None
     except Exception as e:
         st.error(f"Erro ao carregar dados: {e}")
-        return pd.DataFrame()
-
-def padronizar_colunas(df: pd.DataFrame) -> pd.DataFrame:
+        return None, None
+    for nome, erro in erros.items():
+        st.warning(f"⚠️ Fonte {nome} ignorada: {erro}")
+    registrar_precos_rejeitados(precos)
     if df.empty:
-        return df
-        
-    colmap = {c.strip().lower(): c for c in df.columns}
-
-    def pick(*ops):
-        for o in ops:
-            if o in colmap:
-                return colmap[o]
+        return None, None
+    try:
+        with METRICAS.etapa("snapshot_gravacao"):
+            salvar_snapshot(df, digest, SNAPSHOT_PATH, VERSAO_CANONICA)
+    except OSError:
+        pass  # snapshot é só um atalho de partida; sem disco gravável segue sem ele
+    registrar_historico(df)
+    catalogo = construir_catalogo(df)
+    return catalogo.df, catalogo
+
+@st.cache_resource(show_spinner=False)
+def relatorios_precos() -> dict:
+    """{fonte: RelatorioPrecos} da última carga de cada fonte, para o diagnóstico."""
+    return {}
+
+def registrar_precos_rejeitados(precos: dict):
+    """Preços rejeitados vão para o log e o diagnóstico, não para a tela de cada sessão:
+    avisos dentro de ``preparar_catalogo`` (em cache) seriam repetidos a cada rerun."""
+    relatorios_precos().update(precos)
+    for nome, relatorio in precos.items():
+        if relatorio.rejeitados.empty:
+            continue
+        METRICAS.contar("precos_rejeitados", len(relatorio.rejeitados))
+        # Rótulo 0 é a linha 2 do CSV (depois do cabeçalho)
+        linhas = ", ".join(str(i + 2) for i in relatorio.rejeitados.index[:5])
+        logger.warning("Fonte %s: %d preço(s) ignorado(s) %s; linhas %s%s", nome, len(relatorio.rejeitados),
+                       relatorio.resumo(), linhas, "…" if len(relatorio.rejeitados) > 5 else "")
+
+# Dados locais complementares (histórico, alertas): perder uma gravação nunca derruba a carga
+BANCOS_LOCAIS = {"historico": HistoricoPrecos, "alertas": ListaObservacao}
+
+@st.cache_resource(show_spinner=False)
+def banco_local(tipo: str, caminho: str, *args):
+    """Instância de ``BANCOS_LOCAIS[tipo]`` compartilhada pelo processo, ou None se desligada
+    (``caminho`` "0") ou sem disco gravável."""
+    if caminho == "0":
+        return None
+    try:
+        return BANCOS_LOCAIS[tipo](caminho, *args)
+    except (sqlite3.Error, OSError):
         return None
 
-    c_prod = pick("produto", "item", "descrição", "descricao", "nome")
-    c_mkt = pick("mercado", "supermercado", "fornecedor", "loja")
-    c_val = pick("valor unitário", "valor unitario", "preço", "preco", "valor", "price")
-    
-    if not all([c_prod, c_mkt, c_val]):
-        st.error("Colunas esperadas não encontradas. Esperado: Produto, Mercado, Valor")
-        return pd.DataFrame()
-
-    df = df[[c_prod, c_mkt, c_val]].copy()
-    df.columns = ["Produto", "Mercado", "Valor"]
-    
-    # Limpa valores monetários
-    df["Valor"] = (
-        df["Valor"].astype(str)
-        .str.replace("R$", "", regex=False)
-        .str.replace("\u00A0", " ", regex=False)
-        .str.replace(".", "", regex=False)
-        .str.replace(",", ".", regex=False)
-    )
-    df["Valor"] = pd.to_numeric(df["Valor"], errors="coerce")
-    df = df.dropna(subset=["Produto", "Mercado", "Valor"])
-    
-    df["produto_norm"] = df["Produto"].apply(norm)
-    return df
-
-def generate_pdf(selected_products):
-    """Gera PDF com lista de compras"""
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    
-    # Estilos
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=20,
-        textColor=colors.HexColor('#4A90A4'),
-        alignment=1,  # CENTER
-        spaceAfter=20
+def em_segundo_plano(nome: str, tarefa):
+    """Roda ``tarefa`` numa thread, sem atrasar a carga do catálogo; erro de disco só
+    perde esta rodada (a próxima versão tenta de novo)."""
+    def rodar():
+        try:
+            tarefa()
+        except (sqlite3.Error, OSError):
+            pass
+
+    threading.Thread(target=rodar, name=f"top-precos-{nome}", daemon=True).start()
+
+def registrar_historico(df: pd.DataFrame):
+    """Grava as mudanças de preço desta versão em segundo plano."""
+    historico = banco_local("historico", HISTORICO_PATH)
+    if historico is None:
+        return
+
+    def gravar():
+        with METRICAS.etapa("historico", linhas=len(df)):
+            METRICAS.contar("historico_mudancas", historico.registrar(df))
+
+    em_segundo_plano("historico", gravar)
+
+def avaliar_alertas(catalogo: Catalogo):
+    """Avalia todas as regras contra o catálogo novo em segundo plano."""
+    lista = banco_local("alertas", ALERTAS_PATH, ALERTAS_SAIDA)
+    if lista is None:
+        return
+
+    def avaliar():
+        with METRICAS.etapa("alertas"):
+            METRICAS.contar("alertas_disparados", len(lista.avaliar(catalogo)))
+
+    em_segundo_plano("alertas", avaliar)
+
+def construir_catalogo(df: pd.DataFrame) -> Catalogo:
+    with METRICAS.etapa("catalogo", linhas=len(df)):
+        catalogo = Catalogo(df)
+    avaliar_alertas(catalogo)
+    return catalogo
+
+@st.cache_resource(show_spinner=False)
+def snapshot_salvo(caminho: str):
+    """Último catálogo bom gravado em disco, enquanto a rede não responde; um snapshot
+    de outra versão do produto canônico fica de fora (os produto_id dele não valem mais)."""
+    lido = ler_snapshot(caminho, versao=VERSAO_CANONICA)
+    if lido is None:
+        return None, None
+    catalogo = construir_catalogo(lido[1])
+    return catalogo.df, catalogo
+
+def carregar_catalogo(origens: dict):
+    """DataFrame preparado e ``Catalogo`` das planilhas em ``origens`` ({nome: URL ou arquivo})."""
+    fontes = {nome: fonte_planilha(origem) for nome, origem in origens.items()}
+    METRICAS.contar("catalogo_consultas")
+    # Todas as fontes revalidam ao mesmo tempo, cada uma na sua thread
+    baixados = {nome: fonte.obter(bloquear=False) for nome, fonte in fontes.items()}
+
+    pendentes = [nome for nome, fonte in fontes.items() if baixados[nome] is None and fonte.pendente]
+    if pendentes:
+        # Nenhuma sessão espera a rede enquanto houver um snapshot em disco
+        df, catalogo = snapshot_salvo(SNAPSHOT_PATH)
+        if df is not None:
+            return df, catalogo
+        # Os downloads já correm em paralelo: a espera total é a da fonte mais lenta
+        for nome in pendentes:
+            baixados[nome] = fontes[nome].obter()
+
+    disponiveis = {nome: baixado for nome, baixado in baixados.items() if baixado is not None}
+    falhas = {nome: fontes[nome].erro for nome in fontes if nome not in disponiveis}
+    if not disponiveis:
+        df, catalogo = snapshot_salvo(SNAPSHOT_PATH)
+        erro = "; ".join(str(e) for e in falhas.values())
+        if df is None:
+            st.error(f"Erro ao carregar dados: {erro}")
+            return None, None
+        st.warning(f"⚠️ Não foi possível atualizar os dados ({erro}). Exibindo a última versão salva.")
+        return df, catalogo
+    for nome, erro in falhas.items():
+        st.warning(f"⚠️ Fonte {nome} indisponível ({erro}). Exibindo as demais.")
+    return preparar_catalogo(
+        tuple((nome, digest) for nome, (digest, _) in disponiveis.items()),
+        tuple(conteudo for _, conteudo in disponiveis.values()),
     )
-    
-    # Elementos do PDF
-    elements = []
-    
-    # Título
-    title = Paragraph("TOP Preços - Lista de Compras", title_style)
-    elements.append(title)
-    
-    # Data
-    date = Paragraph(f"Data: {datetime.now().strftime('%d/%m/%Y %H:%M')}", styles['Normal'])
-    elements.append(date)
-    elements.append(Spacer(1, 20))
-    
-    # Agrupa por fornecedor
-    produtos_por_fornecedor = {}
-    total_geral = 0
-    
-    for key, item in selected_products.items():
-        fornecedor = item['Mercado']
-        if fornecedor not in produtos_por_fornecedor:
-            produtos_por_fornecedor[fornecedor] = []
-        produtos_por_fornecedor[fornecedor].append(item)
-        total_geral += item['Valor'] * item['Quantidade']
-    
-    # Para cada fornecedor
-    for fornecedor, produtos in produtos_por_fornecedor.items():
-        # Header do fornecedor
-        fornecedor_title = Paragraph(f"<b>{fornecedor}</b>", styles['Heading2'])
-        elements.append(fornecedor_title)
-        
-        # Tabela de produtos
-        data = [['Produto', 'Qtd', 'Valor Unit.', 'Subtotal']]
-        
-        total_fornecedor = 0
-        for produto in produtos:
-            subtotal = produto['Valor'] * produto['Quantidade']
-            total_fornecedor += subtotal
-            
-            data.append([
-                produto['Produto'],
-                str(produto['Quantidade']),
-                format_brl(produto['Valor']),
-                format_brl(subtotal)
-            ])
-        
-        # Adiciona total do fornecedor
-        data.append(['', '', 'Total:', format_brl(total_fornecedor)])
-        
-        # Cria tabela
-        table = Table(data)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4A90A4')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -2), colors.beige),
-            ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#5BA05B')),
-            ('TEXTCOLOR', (0, -1), (-1, -1), colors.whitesmoke),
-            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        
-        elements.append(table)
-        elements.append(Spacer(1, 20))
-    
-    # Total geral
-    total_para = Paragraph(f"<b>TOTAL GERAL: {format_brl(total_geral)}</b>", styles['Heading2'])
-    elements.append(total_para)
-    
-    # Gera PDF
-    doc.build(elements)
-    buffer.seek(0)
-    return buffer
-
-def render_cards_mobile(df_view: pd.DataFrame):
-    for _, row in df_view.iterrows():
-        st.markdown(f"""
-        <div class="product-card">
-            <div class="product-name">{row['Produto']}</div>
-            <div class="supplier-info">
-                <span class="supplier-label">Supermercado</span>
-                <span style="color: var(--muted); font-size: 1.05rem; font-weight: 500;">{row['Mercado']}</span>
-            </div>
-            <div class="price-container">
-                <span class="price-value">{format_brl(row['Valor'])}</span>
-                <span class="available-badge">✅ Disponível</span>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
 
-def render_cards_with_selection(df_view: pd.DataFrame):
-    for idx, row in df_view.iterrows():
+def reset_pagina(view: str):
+    st.session_state[f"pagina_{view}"] = 1
+
+def mudar_pagina(view: str, delta: int):
+    st.session_state[f"pagina_{view}"] = st.session_state.get(f"pagina_{view}", 1) + delta
+
+def paginar(recorte: Recorte, view: str, page_size: int = CARDS_POR_PAGINA) -> pd.DataFrame:
+    """Devolve só a fatia da página atual de ``view`` (a única parte do recorte que vira DataFrame)"""
+    total_paginas = max(1, -(-len(recorte) // page_size))
+    pagina = min(max(st.session_state.get(f"pagina_{view}", 1), 1), total_paginas)
+    st.session_state[f"pagina_{view}"] = pagina
+    inicio = (pagina - 1) * page_size
+    return recorte.fatia(inicio, inicio + page_size)
+
+def render_paginacao(recorte: Recorte, view: str, page_size: int = CARDS_POR_PAGINA):
+    total_paginas = max(1, -(-len(recorte) // page_size))
+    if total_paginas == 1:
+        return
+    pagina = st.session_state.get(f"pagina_{view}", 1)
+
+    col_ant, col_info, col_prox = st.columns([1, 2, 1])
+    with col_ant:
+        st.button("◀ Anterior", key=f"ant_{view}", disabled=pagina <= 1,
+                  on_click=mudar_pagina, args=(view, -1), use_container_width=True)
+    with col_info:
+        st.markdown(f"<div style='text-align: center; padding: 8px; color: var(--muted);'>Página {pagina} de {total_paginas}</div>", unsafe_allow_html=True)
+    with col_prox:
+        st.button("Próxima ▶", key=f"prox_{view}", disabled=pagina >= total_paginas,
+                  on_click=mudar_pagina, args=(view, 1), use_container_width=True)
+
+def render_exportacao(recorte: Recorte, nome: str, view: str):
+    """Botões de download XLSX/CSV; o arquivo só é gerado no clique, fora do rerun.
+
+    Os callables ficam guardados na sessão até o próximo rerun: capturam o
+    recorte (posições), não uma cópia das linhas.
+    """
+    carimbo = datetime.now().strftime('%Y%m%d_%H%M')
+    col_xlsx, col_csv = st.columns(2)
+    with col_xlsx:
+        st.download_button(
+            "⬇ Excel (XLSX)", data=lambda: exportar_xlsx(recorte.materializar()), file_name=f"{nome}_{carimbo}.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            key=f"xlsx_{view}", on_click="ignore", use_container_width=True
+        )
+    with col_csv:
+        st.download_button(
+            "⬇ CSV", data=lambda: exportar_csv(recorte.materializar()), file_name=f"{nome}_{carimbo}.csv", mime="text/csv",
+            key=f"csv_{view}", on_click="ignore", use_container_width=True
+        )
+
+def render_historico(recorte: Recorte, view: str):
+    """Evolução do preço de um produto da página atual e as maiores quedas da semana."""
+    historico = banco_local("historico", HISTORICO_PATH)
+    if historico is None:
+        return
+    with st.expander("📈 Histórico de preços"):
+        pagina = paginar(recorte, view).drop_duplicates("produto_norm")
+        normalizados = dict(zip(pagina["Produto"].astype(str), pagina["produto_norm"].astype(str)))
+        escolhido = st.selectbox("Produto", list(normalizados), key=f"historico_{view}")
+        try:
+            precos = historico.precos_vigentes(normalizados[escolhido]) if escolhido else pd.DataFrame()
+            quedas = historico.maiores_quedas(dias=7, limite=10)
+        except sqlite3.Error as e:
+            st.info(f"Histórico indisponível: {e}")
+            return
+        if precos.empty:
+            st.caption("Ainda sem histórico para este produto.")
+        else:
+            st.line_chart(precos, y_label="R$")
+            mais_barato = precos.idxmin(axis=1).value_counts()
+            st.caption(f"Mais barato na maior parte dos dias: {mais_barato.index[0]} ({mais_barato.iloc[0]} de {len(precos)} dias)")
+        if not quedas.empty:
+            st.markdown("**🔻 Maiores quedas da semana**")
+            st.dataframe(pd.DataFrame({
+                "Produto": quedas["produto"], "Mercado": quedas["mercado"],
+                "Antes": quedas["antes"].map(format_brl), "Agora": quedas["agora"].map(format_brl),
+                "Queda": (quedas["queda_pct"] * 100).round(1).astype(str) + "%",
+            }), hide_index=True, use_container_width=True)
+
+def criar_alerta(catalogo: Catalogo, normalizados: dict, view: str):
+    """Callback do botão de alerta: cadastra a regra e avalia só ela contra o catálogo atual."""
+    lista = banco_local("alertas", ALERTAS_PATH, ALERTAS_SAIDA)
+    produto = st.session_state[f"alerta_produto_{view}"]
+    if lista is None or not produto:
+        return
+    alvo = st.session_state[f"alerta_alvo_{view}"]
+    mercado = None if st.session_state[f"alerta_mercado_{view}"] == QUALQUER_MERCADO else st.session_state[f"alerta_mercado_{view}"]
+    if alvo is None and mercado is not None:
+        st.toast("Com um mercado escolhido, informe o preço alvo.")
+        return
+    try:
+        regra = lista.adicionar(normalizados[produto], produto, alvo, mercado)
+        lista.avaliar(catalogo, ids=[regra])
+    except sqlite3.Error as e:
+        st.toast(f"Não foi possível criar o alerta: {e}")
+
+def remover_alerta(regra: int):
+    lista = banco_local("alertas", ALERTAS_PATH, ALERTAS_SAIDA)
+    if lista is not None:
+        lista.remover(regra)
+
+def render_alertas(catalogo: Catalogo, recorte: Recorte, view: str):
+    """Alertas disparados, criação de alerta para um produto da página atual e as regras cadastradas."""
+    lista = banco_local("alertas", ALERTAS_PATH, ALERTAS_SAIDA)
+    if lista is None:
+        return
+    recentes = lista.recentes
+    with st.expander(f"🔔 Alertas de preço ({len(recentes)})" if len(recentes) else "🔔 Alertas de preço"):
+        if not recentes.empty:
+            st.dataframe(pd.DataFrame({
+                "Produto": recentes["produto"],
+                "Alerta": np.where(recentes["tipo"] == "alvo", "Abaixo do alvo",
+                                   "Mais barato agora em " + recentes["mercado"].astype(str)),
+                "Mercado": recentes["mercado"], "Preço": recentes["valor"].map(format_brl),
+                "Alvo": recentes["alvo"].map(lambda v: "" if pd.isna(v) else format_brl(v)),
+            }), hide_index=True, use_container_width=True)
+
+        pagina = paginar(recorte, view).drop_duplicates("produto_norm")
+        normalizados = dict(zip(pagina["Produto"].astype(str), pagina["produto_norm"].astype(str)))
+        col_prod, col_alvo, col_merc = st.columns([3, 1, 2])
+        with col_prod:
+            st.selectbox("Produto", list(normalizados), key=f"alerta_produto_{view}")
+        with col_alvo:
+            st.number_input("Preço alvo (R$)", min_value=0.0, value=None, step=0.5, format="%.2f",
+                            key=f"alerta_alvo_{view}", help="Vazio: só avisa quando o mercado mais barato mudar")
+        with col_merc:
+            st.selectbox("Mercado", [QUALQUER_MERCADO] + catalogo.mercados, key=f"alerta_mercado_{view}")
+        st.button("🔔 Criar alerta", key=f"alerta_criar_{view}", on_click=criar_alerta,
+                  args=(catalogo, normalizados, view))
+
+        try:
+            regras = lista.regras()
+        except sqlite3.Error as e:
+            st.info(f"Alertas indisponíveis: {e}")
+            return
+        if regras.empty:
+            return
+        st.markdown(f"**Regras cadastradas ({len(regras)})**")
+        for regra in regras.tail(ALERTAS_EXIBIDOS).iloc[::-1].itertuples():
+            col_texto, col_remover = st.columns([6, 1])
+            with col_texto:
+                alvo = "mercado mais barato" if pd.isna(regra.alvo) else f"até {format_brl(regra.alvo)}"
+                agora = "" if pd.isna(regra.ultimo_valor) else f" · agora {format_brl(regra.ultimo_valor)} ({regra.ultimo_mercado})"
+                mercado = QUALQUER_MERCADO if pd.isna(regra.mercado) else regra.mercado
+                st.caption(f"{regra.produto} · {alvo} · {mercado}{agora}")
+            with col_remover:
+                st.button("🗑️", key=f"alerta_remover_{regra.id}", help="Remover alerta",
+                          on_click=remover_alerta, args=(regra.id,))
+
+def alternar_item(id_linha: int, chave: str):
+    """Callback do checkbox: marca/desmarca uma oferta da seleção."""
+    if st.session_state[chave]:
+        st.session_state.selecao.setdefault(id_linha, 1)
+    else:
+        st.session_state.selecao.pop(id_linha, None)
+        st.session_state.selecao_conhecidos.pop(id_linha, None)
+
+def mudar_quantidade(id_linha: int, mercado: str, valor: float, delta: int):
+    """Callback dos botões ➖/➕: ajusta a quantidade e, pela diferença, o subtotal do mercado e o total."""
+    selecao = st.session_state.selecao
+    if id_linha not in selecao or selecao[id_linha] + delta < 1:
+        return
+    selecao[id_linha] += delta
+    st.session_state.subtotais[mercado] += valor * delta
+    st.session_state.total_compra += valor * delta
+
+def aplicar_sugestao(sugestao: pd.DataFrame):
+    # Cada item vai para a oferta sugerida; itens fora do catálogo ficam como estão
+    troca = dict(zip(sugestao['id atual'], sugestao['id']))
+    nova = {}
+    for id_linha, quantidade in st.session_state.selecao.items():
+        destino = troca.get(id_linha, id_linha)
+        nova[destino] = nova.get(destino, 0) + quantidade
+    st.session_state.selecao = nova
+    st.session_state.pop("sugestao", None)
+    # Os checkboxes da aba "Minha Lista" voltam a refletir a nova seleção
+    for k in [k for k in st.session_state if str(k).startswith("sel_")]:
+        del st.session_state[k]
+
+def render_cards_mobile(recorte: Recorte, view: str = "main", page_size: int = CARDS_POR_PAGINA,
+                        montar_html=cards_html_pagina):
+    pagina = paginar(recorte, view, page_size)
+    # Um único bloco HTML por página
+    with METRICAS.etapa("render", linhas=len(pagina)):
+        st.markdown(montar_html(pagina), unsafe_allow_html=True)
+    render_paginacao(recorte, view, page_size)
+
+def render_cards_with_selection(recorte: Recorte, view: str = "list", page_size: int = CARDS_POR_PAGINA):
+    pagina = paginar(recorte, view, page_size)
+    with METRICAS.etapa("render", linhas=len(pagina)):
+        htmls = cards_html(pagina)
+
+    selecao = st.session_state.selecao
+    for id_linha, html in zip(pagina["id"].tolist(), htmls):
         with st.container():
             col1, col2 = st.columns([0.1, 0.9])
             
             with col1:
-                product_key = f"{row['Produto']}_{row['Mercado']}"
-                # Verifica se já está selecionado
-                is_selected = 'selected_products' in st.session_state and product_key in st.session_state.selected_products
-                selected = st.checkbox("", value=is_selected, key=f"product_{idx}", label_visibility="collapsed")
+                # Seleção muda só no callback; a renderização apenas lê o estado
+                chave = f"sel_{id_linha}"
+                st.checkbox("Selecionar", value=id_linha in selecao, key=chave, label_visibility="collapsed",
+                            on_change=alternar_item, args=(id_linha, chave))
                 
             with col2:
-                st.markdown(f"""
-                <div class="product-card">
-                    <div class="product-name">{row['Produto']}</div>
-                    <div class="supplier-info">
-                        <span class="supplier-label">Supermercado</span>
-                        <span style="color: var(--muted); font-size: 1.05rem; font-weight: 500;">{row['Mercado']}</span>
-                    </div>
-                    <div class="price-container">
-                        <span class="price-value">{format_brl(row['Valor'])}</span>
-                        <span class="available-badge">✅ Disponível</span>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            # Gerencia seleção no session state
-            if selected:
-                if 'selected_products' not in st.session_state:
-                    st.session_state.selected_products = {}
-                
-                if product_key not in st.session_state.selected_products:
-                    st.session_state.selected_products[product_key] = {
-                        'Produto': row['Produto'],
-                        'Mercado': row['Mercado'],
-                        'Valor': row['Valor'],
-                        'Quantidade': 1
-                    }
-            else:
-                if 'selected_products' in st.session_state and product_key in st.session_state.selected_products:
-                    del st.session_state.selected_products[product_key]
-
-# =========================
-# CARREGAMENTO DE DADOS
-# =========================
-try:
-    df_raw = load_from_google_sheets(DATA_URL)
-    if df_raw.empty:
-        st.error("Nenhum dado encontrado na planilha.")
-        st.stop()
-        
-    df = padronizar_colunas(df_raw)
-    if df.empty:
-        st.error("Erro ao processar dados da planilha.")
-        st.stop()
-        
-except Exception as e:
-    st.error(f"❌ Erro ao carregar dados: {e}")
-    st.stop()
-
-# =========================
-# INTERFACE PRINCIPAL
-# =========================
-
-st.markdown("""
-<div class="main-header">
-    <h1>🏆 TOP Preços</h1>
-    <div class="subtitle">Compare preços entre supermercados e economize</div>
-</div>
-""", unsafe_allow_html=True)
-
-# Navegação por abas
-tab1, tab2, tab3 = st.tabs(["🏠 Página Principal", "📝 Minha Lista", "🛒 Lista de Compras"])
-
-with tab1:
-    st.success("✅ Dados carregados com sucesso!")
-    
-    # Container de busca
-    st.markdown('<div class="search-container">', unsafe_allow_html=True)
-    busca_principal = st.text_input("🔍 Pesquisar produto", placeholder="Digite o nome do produto (ex: Arroz, Feijão, Óleo...)", key="search_main")
-    st.markdown('</div>', unsafe_allow_html=True)
-    
-    # Filtra resultados
-    if busca_principal:
-        resultado_principal = df[df["produto_norm"].str.contains(norm(busca_principal), na=False)]
-    else:
-        resultado_principal = df.copy()
-    
-    # Exibição dos resultados
-    if resultado_principal.empty:
-        st.markdown("""
-        <div style="text-align: center; padding: 40px; background: var(--card); border-radius: 15px; margin: 20px 0;">
-            <h3 style="color: var(--muted);">🔍 Nenhum produto encontrado</h3>
-            <p style="color: var(--muted);">Tente buscar por outro termo ou verifique a ortografia.</p>
-        </div>
-        """, unsafe_allow_html=True)
-    else:
-        resultado_principal = resultado_principal.sort_values(['Produto', 'Valor'])
-        st.markdown(f"### 📋 Lista de Preços ({len(resultado_principal)} produtos)")
-        render_cards_mobile(resultado_principal[["Produto", "Mercado", "Valor", "produto_norm"]])
-
-with tab2:
-    st.success("✅ Dados carregados com sucesso!")
-    st.info("💡 Selecione os produtos que deseja comprar marcando as caixas ao lado de cada item.")
-    
-    # Container de busca
-    st.markdown('<div class="search-container">', unsafe_allow_html=True)
-    busca_lista = st.text_input("🔍 Pesquisar produto", placeholder="Digite o nome do produto (ex: Arroz, Feijão, Óleo...)", key="search_list")
-    st.markdown('</div>', unsafe_allow_html=True)
-    
-    # Filtra resultados
-    if busca_lista:
-        resultado_lista = df[df["produto_norm"].str.contains(norm(busca_lista), na=False)]
-    else:
-        resultado_lista = df.copy()
-    
-    # Exibição dos resultados com seleção
-    if resultado_lista.empty:
-        st.markdown("""
-        <div style="text-align: center; padding: 40px; background: var(--card); border-radius: 15px; margin: 20px 0;">
-            <h3 style="color: var(--muted);">🔍 Nenhum produto encontrado</h3>
-            <p style="color: var(--muted);">Tente buscar por outro termo ou verifique a ortografia.</p>
-        </div>
-        """, unsafe_allow_html=True)
-    else:
-        resultado_lista = resultado_lista.sort_values(['Produto', 'Valor'])
-        st.markdown(f"### 📝 Selecionar Produtos ({len(resultado_lista)} produtos)")
-        render_cards_with_selection(resultado_lista[["Produto", "Mercado", "Valor", "produto_norm"]])
-
-with tab3:
-    if 'selected_products' not in st.session_state or not st.session_state.selected_products:
+                st.markdown(html, unsafe_allow_html=True)
+
+    render_paginacao(recorte, view, page_size)
+
+def fragmento(funcao):
+    """``st.fragment`` com diagnóstico: o rerun só do fragmento abre a própria rodada
+    (a do topo do script já foi encerrada), e o ?diag=1 também mede lista, otimização e PDF."""
+    @functools.wraps(funcao)
+    def rodar(*args, **kwargs):
+        with rodada_fragmento(DIAGNOSTICO, funcao.__name__):
+            return funcao(*args, **kwargs)
+    return st.fragment(rodar)
+
+@fragmento
+def render_lista_compras(catalogo: Catalogo, selected_products: dict):
+    """Aba "Lista de Compras" como fragmento: os botões ➖/➕ reexecutam só esta função.
+
+    Sem recarregar o catálogo nem redesenhar as outras abas, o custo de mudar
+    uma quantidade depende do tamanho da lista, não do catálogo. Os totais vêm
+    de ``st.session_state``, ajustados pela diferença em ``mudar_quantidade``.
+    """
+    selecao = st.session_state.selecao
+    # Produto, mercado e preço vêm da última execução completa; a quantidade, do estado atual
+    itens = {k: {**item, 'Quantidade': selecao[k]} for k, item in selected_products.items() if k in selecao}
+    if not itens:
         st.markdown("""
         <div style="text-align: center; padding: 40px; background: var(--card); border-radius: 15px; margin: 20px 0;">
             <h3 style="color: var(--muted);">🛒 Sua lista está vazia</h3>
             <p style="color: var(--muted);">Vá para "Minha Lista" e selecione os produtos que deseja comprar.</p>
         </div>
         """, unsafe_allow_html=True)
-    else:
-        selected_products = st.session_state.selected_products
-        
-        # Calcula valor total considerando quantidades
-        total_value = sum(item['Valor'] * item['Quantidade'] for item in selected_products.values())
-        
+        return
+
+    with METRICAS.etapa("lista_compras", linhas=len(itens)):
         # Card com valor total e botão de exportar
         col1, col2 = st.columns([1, 1])
         
         with col1:
             st.markdown(f"""
             <div class="total-card">
-                <span class="total-value">{format_brl(total_value)}</span>
+                <span class="total-value">{format_brl(st.session_state.total_compra)}</span>
                 <div class="total-label">Total da Compra</div>
             </div>
             """, unsafe_allow_html=True)
@@ -565,7 +704,8 @@ with tab3:
         with col2:
             st.markdown("<br><br>", unsafe_allow_html=True)
             if st.button("📄 Exportar Lista em PDF", use_container_width=True, type="primary"):
-                pdf_buffer = generate_pdf(selected_products)
+                with METRICAS.etapa("pdf", linhas=len(itens)):
+                    pdf_buffer = generate_pdf(itens)
                 st.download_button(
                     label="⬇ Baixar PDF",
                     data=pdf_buffer,
@@ -573,21 +713,62 @@ with tab3:
                     mime="application/pdf",
                     use_container_width=True
                 )
-        
+            render_exportacao(Recorte(lista_dataframe(itens)), "lista_compras", "lista")
+
+        # Otimização: onde comprar cada item pelo menor total
+        with st.expander("🧮 Economizar: onde comprar cada produto"):
+            max_mercados = st.number_input(
+                "Máximo de mercados que deseja visitar (0 = sem limite)",
+                min_value=0, max_value=len(catalogo.mercados), step=1, key="max_mercados"
+            )
+            # Só no botão: cada ➖/➕ reexecuta o fragmento, e a otimização não precisa rodar a cada toque
+            # id do catálogo, não ele mesmo: o resultado guardado não segura um catálogo antigo na memória
+            chave = (id(catalogo), tuple(sorted((k, item['Quantidade']) for k, item in itens.items())), max_mercados)
+            if st.button("🧮 Calcular sugestão", use_container_width=True):
+                with METRICAS.etapa("otimizar", linhas=len(itens)):
+                    st.session_state.sugestao = (chave, sugerir_lista(catalogo, itens, max_mercados or None))
+            calculada = st.session_state.get("sugestao")
+            if calculada is None or calculada[0] != chave:
+                st.caption("A lista mudou desde o último cálculo." if calculada else
+                           "Calcule para ver o menor total e os itens que mudam de mercado.")
+            else:
+                sugestao, total_atual, total_sugerido, otimo = calculada[1]
+                if sugestao.empty:
+                    st.info("Nenhum item da lista está no catálogo atual.")
+                elif not np.isfinite(total_sugerido):
+                    st.info("Não há como comprar todos os itens visitando só essa quantidade de mercados.")
+                else:
+                    col_a, col_b = st.columns([1, 1])
+                    economia = total_atual - total_sugerido
+                    col_a.metric("Total sugerido", format_brl(total_sugerido), delta_color="inverse",
+                                 delta=f"-{format_brl(economia)}" if economia >= 0 else f"+{format_brl(-economia)}")
+                    col_b.metric("Mercados a visitar", sugestao['Mercado'].nunique())
+                    if not otimo:
+                        st.caption("Busca interrompida pelo limite de tempo: melhor combinação encontrada até aqui.")
+
+                    mudancas = sugestao[sugestao['Mercado'].astype(str) != sugestao['Mercado atual'].astype(str)]
+                    if mudancas.empty:
+                        st.success("✅ Sua lista já está no menor preço possível.")
+                    else:
+                        tabela = mudancas.drop(columns=['id atual', 'id']).assign(**{
+                            'Valor atual': mudancas['Valor atual'].map(format_brl),
+                            'Valor': mudancas['Valor'].map(format_brl),
+                        })
+                        st.dataframe(tabela, hide_index=True, use_container_width=True)
+                        # A sugestão troca ofertas da seleção: os checkboxes de "Minha Lista" pedem a execução completa
+                        if st.button("✅ Aplicar sugestão", on_click=aplicar_sugestao, args=(sugestao,), use_container_width=True):
+                            st.rerun()
+
         # Agrupa por fornecedor
-        produtos_por_fornecedor = {}
-        for key, item in selected_products.items():
-            fornecedor = item['Mercado']
-            if fornecedor not in produtos_por_fornecedor:
-                produtos_por_fornecedor[fornecedor] = []
-            produtos_por_fornecedor[fornecedor].append((key, item))
+        produtos_por_fornecedor = agrupar_por_mercado(itens)
         
         # Exibe produtos agrupados por fornecedor
-        st.markdown(f"### 🛒 Seus Produtos ({len(selected_products)} itens)")
+        st.markdown(f"### 🛒 Seus Produtos ({len(itens)} itens)")
         
         for fornecedor, produtos in produtos_por_fornecedor.items():
-            # Header do fornecedor (sem emoji)
-            st.markdown(f'<div class="supplier-header">{fornecedor}</div>', unsafe_allow_html=True)
+            # Header do fornecedor (sem emoji), com o subtotal mantido pelos callbacks
+            st.markdown(f'<div class="supplier-header">{fornecedor} · {format_brl(st.session_state.subtotais[fornecedor])}</div>',
+                        unsafe_allow_html=True)
             
             for product_key, item in produtos:
                 # Calcula subtotal
@@ -611,18 +792,133 @@ with tab3:
                 col_qty1, col_qty2, col_qty3 = st.columns([1, 2, 1])
                 
                 with col_qty1:
-                    if st.button("➖", key=f"minus_{product_key}", help="Diminuir quantidade"):
-                        if item['Quantidade'] > 1:
-                            st.session_state.selected_products[product_key]['Quantidade'] -= 1
-                            st.rerun()
+                    st.button("➖", key=f"minus_{product_key}", help="Diminuir quantidade",
+                              disabled=item['Quantidade'] <= 1, on_click=mudar_quantidade,
+                              args=(product_key, fornecedor, item['Valor'], -1))
                 
                 with col_qty2:
                     st.markdown(f"<div style='text-align: center; padding: 8px; font-weight: bold; font-size: 1.1rem;'>Quantidade: {item['Quantidade']}</div>", unsafe_allow_html=True)
                 
                 with col_qty3:
-                    if st.button("➕", key=f"plus_{product_key}", help="Aumentar quantidade"):
-                        st.session_state.selected_products[product_key]['Quantidade'] += 1
-                        st.rerun()
+                    st.button("➕", key=f"plus_{product_key}", help="Aumentar quantidade",
+                              on_click=mudar_quantidade, args=(product_key, fornecedor, item['Valor'], 1))
+
+# =========================
+# CARREGAMENTO DE DADOS
+# =========================
+try:
+    df, catalogo = carregar_catalogo(FONTES)
+    if df is None:
+        st.error("Nenhum dado encontrado na planilha.")
+        st.stop()
+        
+    if df.empty:
+        st.error("Erro ao processar dados da planilha.")
+        st.stop()
+        
+except Exception as e:
+    st.error(f"❌ Erro ao carregar dados: {e}")
+    st.stop()
+
+# Seleção: {id da oferta: quantidade}; os itens são re-resolvidos no catálogo atual
+if 'selecao' not in st.session_state:
+    st.session_state.selecao = {}
+    st.session_state.selecao_conhecidos = {}
+selected_products = resolver_selecao(catalogo, st.session_state.selecao, st.session_state.selecao_conhecidos)
+# Totais da lista somados só na execução completa; entre elas, os callbacks de quantidade os ajustam
+st.session_state.subtotais = subtotais_por_mercado(selected_products)
+st.session_state.total_compra = sum(st.session_state.subtotais.values())
+
+# =========================
+# INTERFACE PRINCIPAL
+# =========================
+
+# Widgets de abas fechadas não rodam, e o Streamlit descartaria o valor deles: mantém o que foi digitado.
+# Nenhum deles recebe valor inicial no próprio widget (o Streamlit avisaria a cada execução): o padrão
+# de quem não é vazio/falso/primeira opção vem daqui
+st.session_state.setdefault("max_mercados", 0)
+for chave in ("search_main", "modo_menor_preco", "historico_main", "alerta_produto_main", "alerta_alvo_main",
+              "alerta_mercado_main", "search_list", "max_mercados"):
+    if chave in st.session_state:
+        st.session_state[chave] = st.session_state[chave]
+
+st.markdown("""
+<div class="main-header">
+    <h1>🏆 TOP Preços</h1>
+    <div class="subtitle">Compare preços entre supermercados e economize</div>
+</div>
+""", unsafe_allow_html=True)
+
+# Navegação por abas: só a aba aberta roda (busca, cards e widgets das outras ficam de fora)
+tab1, tab2, tab3 = st.tabs(["🏠 Página Principal", "📝 Minha Lista", "🛒 Lista de Compras"],
+                           key="aba", on_change="rerun")
+
+with tab1:
+    if tab1.open:
+        st.success("✅ Dados carregados com sucesso!")
+        
+        # Container de busca
+        st.markdown('<div class="search-container">', unsafe_allow_html=True)
+        busca_principal = st.text_input("🔍 Pesquisar produto", placeholder="Digite o nome do produto (ex: Arroz, Feijão, Óleo...)", key="search_main", on_change=reset_pagina, args=("main",))
+        st.markdown('</div>', unsafe_allow_html=True)
+        menor_preco = st.toggle("💰 Mostrar só o menor preço de cada produto", key="modo_menor_preco", on_change=reset_pagina, args=("main",))
+        
+        # Filtra resultados: posições sobre o catálogo compartilhado (ou o resumo agregado na carga)
+        with METRICAS.etapa("busca") as etapa:
+            resultado_principal = catalogo.recorte(norm(busca_principal), menor_preco=menor_preco)
+            etapa.linhas(len(resultado_principal))
+        
+        # Exibição dos resultados
+        if resultado_principal.empty:
+            st.markdown("""
+            <div style="text-align: center; padding: 40px; background: var(--card); border-radius: 15px; margin: 20px 0;">
+                <h3 style="color: var(--muted);">🔍 Nenhum produto encontrado</h3>
+                <p style="color: var(--muted);">Tente buscar por outro termo ou verifique a ortografia.</p>
+            </div>
+            """, unsafe_allow_html=True)
+        elif menor_preco:
+            st.markdown(f"### 💰 Menor Preço por Produto ({len(resultado_principal)} produtos)")
+            render_exportacao(resultado_principal, "menor_preco", "main")
+            render_cards_mobile(resultado_principal, view="main", montar_html=cards_menor_preco_html_pagina)
+            render_historico(resultado_principal, "main")
+            render_alertas(catalogo, resultado_principal, "main")
+        else:
+            st.markdown(f"### 📋 Lista de Preços ({len(resultado_principal)} produtos)")
+            render_exportacao(resultado_principal, "precos", "main")
+            render_cards_mobile(resultado_principal, view="main")
+            render_historico(resultado_principal, "main")
+            render_alertas(catalogo, resultado_principal, "main")
+
+with tab2:
+    if tab2.open:
+        st.success("✅ Dados carregados com sucesso!")
+        st.info("💡 Selecione os produtos que deseja comprar marcando as caixas ao lado de cada item.")
+        
+        # Container de busca
+        st.markdown('<div class="search-container">', unsafe_allow_html=True)
+        busca_lista = st.text_input("🔍 Pesquisar produto", placeholder="Digite o nome do produto (ex: Arroz, Feijão, Óleo...)", key="search_list", on_change=reset_pagina, args=("list",))
+        st.markdown('</div>', unsafe_allow_html=True)
+        
+        # Filtra resultados
+        with METRICAS.etapa("busca") as etapa:
+            resultado_lista = catalogo.recorte(norm(busca_lista))
+            etapa.linhas(len(resultado_lista))
+        
+        # Exibição dos resultados com seleção
+        if resultado_lista.empty:
+            st.markdown("""
+            <div style="text-align: center; padding: 40px; background: var(--card); border-radius: 15px; margin: 20px 0;">
+                <h3 style="color: var(--muted);">🔍 Nenhum produto encontrado</h3>
+                <p style="color: var(--muted);">Tente buscar por outro termo ou verifique a ortografia.</p>
+            </div>
+            """, unsafe_allow_html=True)
+        else:
+            st.markdown(f"### 📝 Selecionar Produtos ({len(resultado_lista)} produtos)")
+            render_cards_with_selection(resultado_lista, view="list")
+
+with tab3:
+    if tab3.open:
+        render_lista_compras(catalogo, selected_products)
 
 st.markdown("---")
 st.markdown("""
@@ -631,4 +927,29 @@ st.markdown("""
     🔄 Última atualização em cache: 2 minutos<br>
     📱 Interface otimizada para dispositivos móveis
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+if DIAGNOSTICO:
+    with st.expander("🩺 Diagnóstico"):
+        st.caption("Tempos por etapa (ms) nas últimas execuções deste processo")
+        st.dataframe(pd.DataFrame(METRICAS.resumo()), hide_index=True, use_container_width=True)
+        contadores = METRICAS.contadores()
+        consultas = contadores.get("catalogo_consultas", 0)
+        misses = contadores.get("catalogo_cache_miss", 0)
+        col_a, col_b, col_c = st.columns(3)
+        col_a.metric("Cache do catálogo: acertos", max(consultas - misses, 0))
+        col_b.metric("Cache do catálogo: faltas", misses)
+        col_c.metric("Downloads (200 / 304 / erro)", f"{contadores.get('download_200', 0)} / {contadores.get('download_304', 0)} / {contadores.get('download_erro', 0)}")
+        rejeitados = {nome: r for nome, r in relatorios_precos().items() if not r.rejeitados.empty}
+        if rejeitados:
+            st.caption("Preços ignorados na última carga de cada fonte")
+            st.dataframe(pd.DataFrame([
+                {"Fonte": nome, "Decimal": r.decimal, "Linhas": r.linhas, "Ignorados": len(r.rejeitados),
+                 "Motivos": ", ".join(f"{n} {m}" for m, n in r.resumo().items()),
+                 "Primeiras linhas": ", ".join(str(i + 2) for i in r.rejeitados.index[:5])}
+                for nome, r in rejeitados.items()
+            ]), hide_index=True, use_container_width=True)
+        if rodada is not None:
+            st.caption("Esta execução")
+            st.code(rodada.linha_log(), language="json")
+encerrar_rodada(rodada)
@@ -0,0 +1,12 @@
+"""Benchmarks do top_precos; rodar como módulo (``python -m benchmarks.<nome>``)."""
+import time
+
+
+def cronometrar(fn, repeticoes: int = 3):
+    """(melhor tempo em segundos, último resultado) de ``repeticoes`` chamadas."""
+    melhor, resultado = float("inf"), None
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        resultado = fn()
+        melhor = min(melhor, time.perf_counter() - t0)
+    return melhor, resultado
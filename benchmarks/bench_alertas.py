@@ -0,0 +1,72 @@
+"""Benchmark dos alertas de preço: todas as regras da lista de observação contra o catálogo.
+
+Sorteia regras sobre os nomes do catálogo (parte com mercado fixo, parte com
+nomes que não existem) e mede ``avaliar_regras`` sozinho e ``ListaObservacao.avaliar``
+(com a gravação do estado e da caixa de saída), na primeira avaliação (lê as regras
+do disco e todas mudam de estado), numa carga seguinte com preços reajustados e
+ao cadastrar uma regra nova (só ela é avaliada).
+
+Uso: python -m benchmarks.bench_alertas [--linhas 1000000] [--regras 100000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from top_precos.alertas import ListaObservacao, avaliar_regras
+from top_precos.catalogo import Catalogo
+from top_precos.dados import preparar_dataframe
+
+from .sintetico import gerar_planilha
+
+
+def sortear_regras(catalogo: Catalogo, n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    linhas = catalogo.df.iloc[rng.integers(0, len(catalogo.df), n)]
+    mercado = linhas["Mercado"].to_numpy(dtype=object, copy=True)
+    mercado[rng.random(n) < 0.7] = None
+    nomes = linhas["produto_norm"].to_numpy(dtype=object, copy=True)
+    nomes[rng.random(n) < 0.05] = "produto que nao existe"
+    return pd.DataFrame({
+        "produto_norm": nomes, "produto": linhas["Produto"].astype(object).to_numpy(),
+        "alvo": np.round(linhas["Valor"].to_numpy() * rng.uniform(0.8, 1.1, n), 2), "mercado": mercado,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--linhas", type=int, default=1_000_000)
+    parser.add_argument("--regras", type=int, default=100_000)
+    args = parser.parse_args()
+
+    df = preparar_dataframe(gerar_planilha(args.linhas))
+    # Carga seguinte: os mesmos produtos, com preços que subiram ou caíram até 10%
+    reajuste = np.round(df["Valor"].to_numpy() * np.random.default_rng(1).uniform(0.9, 1.1, len(df)), 2)
+    cargas = [Catalogo(df), Catalogo(df.assign(Valor=reajuste))]
+    regras = sortear_regras(cargas[0], args.regras)
+    print(f"{len(cargas[0].df):,} linhas, {args.regras:,} regras")
+
+    estado = regras.assign(id=np.arange(len(regras)), ultimo_valor=np.nan, ultimo_mercado=None)
+    t0 = time.perf_counter()
+    alertas, _ = avaliar_regras(estado, cargas[0])
+    print(f"avaliar_regras: {(time.perf_counter() - t0) * 1e3:.0f}ms, {len(alertas):,} alertas")
+
+    with tempfile.TemporaryDirectory() as pasta:
+        lista = ListaObservacao(os.path.join(pasta, "alertas.sqlite"), os.path.join(pasta, "saida.jsonl"))
+        lista.adicionar_varias(regras)
+        for nome, catalogo in (("primeira carga", cargas[0]), ("carga seguinte", cargas[1])):
+            t0 = time.perf_counter()
+            alertas = lista.avaliar(catalogo)
+            print(f"ListaObservacao.avaliar ({nome}): {(time.perf_counter() - t0) * 1e3:.0f}ms, "
+                  f"{alertas['tipo'].value_counts().to_dict()}")
+        regra = lista.adicionar(*regras.iloc[0][["produto_norm", "produto"]])
+        t0 = time.perf_counter()
+        lista.avaliar(cargas[1], ids=[regra])
+        print(f"ListaObservacao.avaliar (regra nova): {(time.perf_counter() - t0) * 1e3:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
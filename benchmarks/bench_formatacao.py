@@ -0,0 +1,64 @@
+"""Micro-benchmark: formatação BRL e cards vetorizados vs. caminho por linha.
+
+Uso: python -m benchmarks.bench_formatacao [n_linhas ...]
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+from top_precos.formatacao import cards_html, format_brl, format_brl_series
+
+from . import cronometrar
+
+
+def card_html_por_linha(df_view: pd.DataFrame) -> list:
+    """Caminho antigo: iterrows + f-string + format_brl por linha."""
+    out = []
+    for _, row in df_view.iterrows():
+        out.append(f"""
+        <div class="product-card">
+            <div class="product-name">{row['Produto']}</div>
+            <div class="supplier-info">
+                <span class="supplier-label">Supermercado</span>
+                <span style="color: var(--muted); font-size: 1.05rem; font-weight: 500;">{row['Mercado']}</span>
+            </div>
+            <div class="price-container">
+                <span class="price-value">{format_brl(row['Valor'])}</span>
+                <span class="available-badge">✅ Disponível</span>
+            </div>
+        </div>
+        """)
+    return out
+
+
+def frame(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    valores = np.round(rng.lognormal(2.5, 1.2, n), 2)
+    valores[rng.random(n) < 0.01] = np.nan
+    return pd.DataFrame({
+        "Produto": [f"Produto Açúcar {i % 5000}" for i in range(n)],
+        "Mercado": rng.choice(["Atacadão", "Assaí", "Carrefour", "Extra"], n),
+        "Valor": valores,
+    })
+
+
+def main(tamanhos):
+    print(f"{'linhas':>9} | {'brl linha':>10} {'brl vetor':>10} {'x':>6} | {'card linha':>10} {'card vetor':>10} {'x':>6}")
+    for n in tamanhos:
+        df = frame(n)
+        assert format_brl_series(df["Valor"]).tolist() == [format_brl(v) for v in df["Valor"]]
+        assert cards_html(df).tolist() == card_html_por_linha(df)
+
+        t_brl, _ = cronometrar(lambda: [format_brl(v) for v in df["Valor"]])
+        t_brl_v, _ = cronometrar(lambda: format_brl_series(df["Valor"]))
+        t_card, _ = cronometrar(lambda: card_html_por_linha(df), 1)
+        t_card_v, _ = cronometrar(lambda: cards_html(df))
+        print(
+            f"{n:>9} | {t_brl * 1e3:>8.1f}ms {t_brl_v * 1e3:>8.1f}ms {t_brl / t_brl_v:>5.1f}x"
+            f" | {t_card * 1e3:>8.1f}ms {t_card_v * 1e3:>8.1f}ms {t_card / t_card_v:>5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [30, 1_000, 100_000])
@@ -0,0 +1,78 @@
+"""Benchmark do histórico de preços: gravação incremental e consultas sobre milhões de mudanças.
+
+Simula ``cargas`` atualizações da planilha (uma a cada 6 h), cada uma mudando
+o preço de ``--mudam`` das ofertas, e mede as consultas da interface.
+
+Uso: python -m benchmarks.bench_historico [--linhas 200000] [--cargas 40] [--mudam 0.25]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from top_precos.dados import preparar_csv
+from top_precos.historico import HistoricoPrecos
+
+from .sintetico import gerar_csv
+
+INTERVALO = 6 * 3600
+
+
+def cronometrar_ms(fn, repeticoes: int = 20) -> np.ndarray:
+    tempos = []
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        fn()
+        tempos.append((time.perf_counter() - t0) * 1e3)
+    return np.array(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--linhas", type=int, default=200_000)
+    parser.add_argument("--cargas", type=int, default=40)
+    parser.add_argument("--mudam", type=float, default=0.25)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    df = preparar_csv(gerar_csv(args.linhas))
+    base = df["Valor"].to_numpy().copy()
+    inicio = int(time.time()) - args.cargas * INTERVALO
+
+    with tempfile.TemporaryDirectory() as pasta:
+        historico = HistoricoPrecos(os.path.join(pasta, "historico.sqlite"))
+        t0 = time.perf_counter()
+        gravadas = historico.registrar(df, inicio)
+        print(f"carga inicial: {gravadas:,} linhas em {time.perf_counter() - t0:.2f}s")
+
+        tempos = []
+        for i in range(1, args.cargas):
+            muda = rng.random(len(df)) < args.mudam
+            valores = df["Valor"].to_numpy().copy()
+            valores[muda] = np.round(base[muda] * rng.uniform(0.7, 1.2, muda.sum()), 2)
+            # ~0,5% das linhas some em cada carga (e volta na seguinte)
+            presentes = rng.random(len(df)) >= 0.005
+            t0 = time.perf_counter()
+            gravadas += historico.registrar(df.assign(Valor=valores)[presentes], inicio + i * INTERVALO)
+            tempos.append(time.perf_counter() - t0)
+        print(f"{args.cargas - 1} cargas incrementais: p50 {np.median(tempos):.2f}s, max {max(tempos):.2f}s")
+        print(f"linhas no histórico: {gravadas:,} (cópias completas seriam {len(df) * args.cargas:,})")
+        print(f"arquivo: {os.path.getsize(historico.caminho) / 2**20:.0f} MB")
+
+        produtos = df["produto_norm"].astype(str).sample(50, random_state=0).tolist()
+        consultas = {
+            "tendencia": lambda: historico.tendencia(produtos[rng.integers(len(produtos))]),
+            "mercado_mais_barato": lambda: historico.mercado_mais_barato(produtos[rng.integers(len(produtos))]),
+            "maiores_quedas (1 dia)": lambda: historico.maiores_quedas(1),
+            "maiores_quedas (7 dias)": lambda: historico.maiores_quedas(7),
+        }
+        print(f"{'consulta':<24} {'p50':>9} {'p95':>9}")
+        for nome, fn in consultas.items():
+            ms = cronometrar_ms(fn, 20 if "quedas" not in nome else 5)
+            print(f"{nome:<24} {np.percentile(ms, 50):>7.1f}ms {np.percentile(ms, 95):>7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
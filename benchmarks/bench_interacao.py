@@ -0,0 +1,95 @@
+"""Benchmark de interação: CPU de cada rerun do app numa sessão simulada (``AppTest``).
+
+Roda o script de verdade sobre um CSV sintético local e mede, em cada
+interação típica (digitar uma busca, trocar de página, ligar o modo menor
+preço, buscar e marcar itens em "Minha Lista"), o tempo de CPU da thread que
+executa o script, sem o custo do próprio ``AppTest``. O catálogo é preparado
+antes das medições (primeira execução).
+
+Uso: python -m benchmarks.bench_interacao [--linhas 200000] [--repeticoes 3]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import streamlit.runtime.scriptrunner.script_runner as script_runner
+
+from .carga_sessoes import ABAS, APP, abrir_aba
+from .sintetico import gerar_csv
+
+class CPUDoScript:
+    """Soma o tempo de CPU (da thread do script) de cada execução do app."""
+
+    def __init__(self):
+        self.segundos = 0.0
+        self._original = script_runner.exec_func_with_error_handling
+
+    def __enter__(self):
+        def medida(func, ctx):
+            t0 = time.thread_time()
+            try:
+                return self._original(func, ctx)
+            finally:
+                self.segundos += time.thread_time() - t0
+        script_runner.exec_func_with_error_handling = medida
+        return self
+
+    def __exit__(self, *exc):
+        script_runner.exec_func_with_error_handling = self._original
+
+
+def interacoes():
+    """(descrição, função que recebe o AppTest e devolve o AppTest pronto para ``run``)."""
+    return [
+        ("busca 'arroz'", lambda at: at.text_input(key="search_main").set_value("arroz")),
+        ("próxima página", lambda at: at.button(key="prox_main").click()),
+        ("busca 'fejao'", lambda at: at.text_input(key="search_main").set_value("fejao")),
+        ("menor preço", lambda at: at.toggle(key="modo_menor_preco").set_value(True)),
+        ("abrir Minha Lista", lambda at: abrir_aba(at, ABAS[1])),
+        ("busca 'arroz' (lista)", lambda at: at.text_input(key="search_list").set_value("arroz")),
+        ("marcar item", lambda at: at.checkbox[0].check()),
+        ("voltar à principal", lambda at: abrir_aba(at, ABAS[0])),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--linhas", type=int, default=200_000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    from streamlit.testing.v1 import AppTest
+
+    with tempfile.TemporaryDirectory() as pasta:
+        planilha = os.path.join(pasta, "planilha.csv")
+        with open(planilha, "wb") as f:
+            f.write(gerar_csv(args.linhas))
+        os.environ.update({
+            "TOP_PRECOS_FONTES": f"Planilha={planilha}",
+            "TOP_PRECOS_SNAPSHOT": os.path.join(pasta, "catalogo.feather"),
+            "TOP_PRECOS_HISTORICO": "0",
+            "TOP_PRECOS_ALERTAS": "0",
+        })
+
+        tempos = {nome: [] for nome, _ in interacoes()}
+        with CPUDoScript() as cpu:
+            for _ in range(args.repeticoes):
+                at = AppTest.from_file(APP, default_timeout=300).run()
+                for nome, interagir in interacoes():
+                    interagir(at)
+                    antes = cpu.segundos
+                    at.run()
+                    tempos[nome].append(cpu.segundos - antes)
+                    if at.exception:
+                        raise RuntimeError(at.exception[0].value)
+
+        print(f"{'interação':<24} {'CPU (mediana)':>14}")
+        for nome, ts in tempos.items():
+            print(f"{nome:<24} {np.median(ts) * 1e3:>12.1f}ms")
+        print(f"{'total por rodada':<24} {sum(np.median(ts) for ts in tempos.values()) * 1e3:>12.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Benchmark da exportação em PDF: caminho antigo vs. estilos fixos + tabelas em pedaços + cache.
+
+Uso: python -m benchmarks.bench_pdf [n_itens ...]
+"""
+import io
+import sys
+from datetime import datetime
+
+import numpy as np
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from top_precos.exportacao import generate_pdf, renderizar_pdf
+from top_precos.formatacao import format_brl
+from top_precos.lista import agrupar_por_mercado, total_lista
+
+from . import cronometrar
+from .sintetico import mercados, nomes_produtos
+
+
+def pdf_antigo(selected_products):
+    """Caminho antigo: estilos novos a cada chamada e uma tabela inteira por mercado."""
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle('CustomTitle', parent=styles['Heading1'], fontSize=20,
+                                 textColor=colors.HexColor('#4A90A4'), alignment=1, spaceAfter=20)
+    elements = [
+        Paragraph("TOP Preços - Lista de Compras", title_style),
+        Paragraph(f"Data: {datetime.now().strftime('%d/%m/%Y %H:%M')}", styles['Normal']),
+        Spacer(1, 20),
+    ]
+    for fornecedor, itens in agrupar_por_mercado(selected_products).items():
+        elements.append(Paragraph(f"<b>{fornecedor}</b>", styles['Heading2']))
+        data = [['Produto', 'Qtd', 'Valor Unit.', 'Subtotal']]
+        total_fornecedor = 0
+        for _, produto in itens:
+            subtotal = produto['Valor'] * produto['Quantidade']
+            total_fornecedor += subtotal
+            data.append([produto['Produto'], str(produto['Quantidade']), format_brl(produto['Valor']),
+                         format_brl(subtotal)])
+        data.append(['', '', 'Total:', format_brl(total_fornecedor)])
+        table = Table(data)
+        table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4A90A4')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -2), colors.beige),
+            ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#5BA05B')),
+            ('TEXTCOLOR', (0, -1), (-1, -1), colors.whitesmoke),
+            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]))
+        elements.append(table)
+        elements.append(Spacer(1, 20))
+    elements.append(Paragraph(f"<b>TOTAL GERAL: {format_brl(total_lista(selected_products))}</b>",
+                              styles['Heading2']))
+    doc.build(elements)
+    buffer.seek(0)
+    return buffer
+
+
+def lista(n_itens: int, n_mercados: int = 6, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    nomes = nomes_produtos(n_itens, seed)
+    lojas = rng.choice(mercados(n_mercados), n_itens)
+    valores = np.round(rng.lognormal(2.5, 1.0, n_itens), 2)
+    return {
+        f"{p}_{m}": {'Produto': p, 'Mercado': m, 'Valor': float(v), 'Quantidade': int(q)}
+        for p, m, v, q in zip(nomes, lojas, valores, rng.integers(1, 4, n_itens))
+    }
+
+
+def frio(selected_products):
+    renderizar_pdf.cache_clear()
+    return generate_pdf(selected_products)
+
+
+def main(tamanhos):
+    print(f"{'itens':>7} | {'antigo':>9} {'novo':>9} {'x':>6} | {'em cache':>9} | {'páginas':>7}")
+    for n in tamanhos:
+        selecionados = lista(n)
+        rep = 3 if n <= 100 else 1
+        t_antigo, _ = cronometrar(lambda: pdf_antigo(selecionados), rep)
+        t_novo, _ = cronometrar(lambda: frio(selecionados), rep)
+        generate_pdf(selecionados)
+        t_cache, _ = cronometrar(lambda: generate_pdf(selecionados), 5)
+        paginas = generate_pdf(selecionados).getvalue().count(b"/Type /Page\n")
+        print(f"{n:>7} | {t_antigo * 1e3:>7.1f}ms {t_novo * 1e3:>7.1f}ms {t_antigo / t_novo:>5.1f}x"
+              f" | {t_cache * 1e3:>7.3f}ms | {paginas:>7}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [10, 100, 1_000])
@@ -0,0 +1,42 @@
+"""Benchmark da leitura de preços: cadeia de ``str.replace`` original vs. ``analisar_precos``.
+
+O corpus de formatos reais fica em ``tests/test_precos.py``; aqui só se
+confere que os dois caminhos dão os mesmos preços na planilha sintética.
+
+Uso: python -m benchmarks.bench_precos [n_linhas ...]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from top_precos.precos import analisar_precos
+
+from .sintetico import gerar_planilha
+
+
+def cadeia_original(valores: pd.Series) -> pd.Series:
+    """Limpeza de antes: quatro ``str.replace`` na coluna inteira e ``to_numeric``."""
+    limpos = (valores.astype(str).str.replace("R$", "", regex=False).str.replace("\u00A0", " ", regex=False)
+              .str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+    return pd.to_numeric(limpos, errors="coerce")
+
+
+def main(tamanhos):
+    print(f"{'linhas':>9} {'distintos':>9} | {'original':>9} {'analisar':>9} {'x':>6} | rejeitados")
+    for n in tamanhos:
+        precos = pd.Series(gerar_planilha(n)["Preço"].to_numpy(), dtype="str")
+        t0 = time.perf_counter()
+        esperado = cadeia_original(precos)
+        t_ref = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        obtido, relatorio = analisar_precos(precos)
+        t_novo = time.perf_counter() - t0
+        assert np.array_equal(obtido, esperado.to_numpy(np.float64), equal_nan=True)
+        print(f"{n:>9} {precos.nunique():>9} | {t_ref * 1e3:>7.1f}ms {t_novo * 1e3:>7.1f}ms {t_ref / t_novo:>5.1f}x"
+              f" | {relatorio.resumo()}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
@@ -0,0 +1,51 @@
+"""Benchmark do produto canônico: tempo de ``atribuir_produtos`` e qualidade dos grupos.
+
+A planilha sintética escreve parte dos produtos de outro jeito em metade dos
+mercados (``grafias``); a coluna "Produto original" diz qual é o produto de
+verdade, e o benchmark conta quantos produtos ficaram partidos em mais de um
+``produto_id`` e quantos ``produto_id`` juntaram produtos diferentes.
+
+O corpus de pares (grafias que precisam se juntar, produtos diferentes que
+precisam ficar separados) fica em ``tests/test_canonico.py``.
+
+Uso: python -m benchmarks.bench_produtos [--linhas 1000000] [--grafias 0.3]
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from top_precos.canonico import atribuir_produtos
+from top_precos.dados import compactar_colunas, padronizar_colunas
+from top_precos.texto import norm_series
+
+from .sintetico import gerar_planilha
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--linhas", type=int, default=1_000_000)
+    parser.add_argument("--mercados", type=int, default=12)
+    parser.add_argument("--grafias", type=float, default=0.3)
+    args = parser.parse_args()
+
+    bruto = gerar_planilha(args.linhas, args.mercados, grafias=args.grafias)
+    df = compactar_colunas(padronizar_colunas(bruto))
+    original = norm_series(bruto.loc[df.index, "Produto original"])
+    print(f"{len(df):,} linhas, {df['produto_norm'].nunique():,} nomes distintos, "
+          f"{original.nunique():,} produtos de verdade")
+
+    t0 = time.perf_counter()
+    df = atribuir_produtos(df)
+    print(f"atribuir_produtos: {time.perf_counter() - t0:.2f}s")
+
+    pares = pd.DataFrame({"original": original.to_numpy(), "produto_id": df["produto_id"].to_numpy()})
+    partidos = (pares.groupby("original")["produto_id"].nunique() > 1).sum()
+    misturados = (pares.groupby("produto_id")["original"].nunique() > 1).sum()
+    agrupados_antes = df.groupby("produto_norm", observed=True).ngroups
+    print(f"produto_id distintos: {pares['produto_id'].nunique():,} (produto_norm: {agrupados_antes:,})")
+    print(f"produtos partidos em mais de um id: {partidos:,}; ids com produtos diferentes: {misturados:,}")
+
+
+if __name__ == "__main__":
+    main()
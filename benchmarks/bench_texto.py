@@ -0,0 +1,35 @@
+"""Benchmark da normalização: ``apply(norm)`` original vs. ``norm_series``.
+
+Uso: python -m benchmarks.bench_texto [n_linhas ...]
+"""
+import sys
+import time
+
+import pandas as pd
+
+from top_precos.texto import _norm_nfd, norm_series
+
+from .sintetico import gerar_planilha
+
+
+def catalogo(n: int, n_mercados: int = 12, seed: int = 0) -> pd.Series:
+    """Nomes com a repetição típica da planilha: cada item aparece em vários mercados."""
+    return gerar_planilha(n, n_mercados, seed)["Produto"]
+
+
+def main(tamanhos):
+    print(f"{'linhas':>9} {'distintos':>9} | {'apply(norm)':>11} {'norm_series':>11} {'x':>6}")
+    for n in tamanhos:
+        produtos = catalogo(n)
+        t0 = time.perf_counter()
+        esperado = produtos.apply(_norm_nfd)
+        t_ref = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        obtido = norm_series(produtos)
+        t_novo = time.perf_counter() - t0
+        assert obtido.tolist() == esperado.tolist()
+        print(f"{n:>9} {produtos.nunique():>9} | {t_ref * 1e3:>9.1f}ms {t_novo * 1e3:>9.1f}ms {t_ref / t_novo:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
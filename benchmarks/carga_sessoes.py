@@ -0,0 +1,101 @@
+"""Teste de carga: muitas sessões simuladas do app no mesmo processo e a memória de cada uma.
+
+Cada sessão é um ``AppTest`` (o script roda de verdade, com estado de sessão
+próprio) que busca, pagina e marca itens em "Minha Lista"; todas ficam vivas até o fim, como
+usuários conectados ao mesmo tempo. O catálogo vem de um CSV sintético local e
+é preparado uma vez por processo (``st.cache_resource``): o que cresce com as
+sessões é só o estado de cada uma.
+
+Uso: python -m benchmarks.carga_sessoes [--linhas 200000] [--sessoes 1 10 20 40]
+"""
+import argparse
+import gc
+import os
+import resource
+import tempfile
+import time
+import tracemalloc
+
+from .sintetico import gerar_csv
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+ABAS = ["🏠 Página Principal", "📝 Minha Lista", "🛒 Lista de Compras"]
+CONSULTAS = ["arroz", "fejao", "oleo soja", "leite integral", "cafe pilao", "", "acucar", "sabao po"]
+
+
+def rss_mb() -> float:
+    """Memória residente atual do processo (Linux); fora dele, o pico."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10
+
+
+def abrir_aba(at, rotulo: str):
+    """Abre a aba ``rotulo`` no próximo ``run`` (as abas só desenham a que está aberta)."""
+    at.session_state["aba"] = rotulo
+    return at
+
+
+def abrir_sessao(i: int):
+    """Uma sessão: abre o app, busca, vai para a página 2 e marca três itens em "Minha Lista"."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP, default_timeout=300).run()
+    at.text_input(key="search_main").set_value(CONSULTAS[i % len(CONSULTAS)]).run()
+    proxima = [b for b in at.button if b.key == "prox_main"]
+    if proxima and not proxima[0].disabled:
+        proxima[0].click().run()
+    abrir_aba(at, ABAS[1]).run()
+    for checkbox in at.checkbox[:3]:
+        checkbox.check().run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    # Sem itens marcados o teste mediria sessões sem seleção, em silêncio
+    if not at.session_state["selecao"]:
+        raise RuntimeError("sessão sem itens selecionados em Minha Lista")
+    return at
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--linhas", type=int, default=200_000)
+    parser.add_argument("--sessoes", type=int, nargs="+", default=[1, 10, 20, 40])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        planilha = os.path.join(pasta, "planilha.csv")
+        with open(planilha, "wb") as f:
+            f.write(gerar_csv(args.linhas))
+        os.environ.update({
+            "TOP_PRECOS_FONTES": f"Planilha={planilha}",
+            "TOP_PRECOS_SNAPSHOT": os.path.join(pasta, "catalogo.feather"),
+            "TOP_PRECOS_HISTORICO": "0",
+            "TOP_PRECOS_ALERTAS": "0",
+        })
+
+        tracemalloc.start()
+        sessoes = []
+        anterior = None
+        print(f"{'sessões':>7} {'RSS':>9} {'Python':>9} {'Δ RSS/sessão':>13} {'Δ Python/sessão':>16} {'s/sessão':>9}")
+        for alvo in sorted(args.sessoes):
+            t0 = time.perf_counter()
+            novas = alvo - len(sessoes)
+            while len(sessoes) < alvo:
+                sessoes.append(abrir_sessao(len(sessoes)))
+            segundos = (time.perf_counter() - t0) / max(novas, 1)
+            gc.collect()
+            atual = (rss_mb(), tracemalloc.get_traced_memory()[0] / 2**20)
+            if anterior is None:
+                # A primeira sessão paga o catálogo compartilhado; as seguintes, só o próprio estado
+                print(f"{alvo:>7} {atual[0]:>7.0f}MB {atual[1]:>7.0f}MB {'(catálogo)':>13} {'':>16} {segundos:>8.2f}s")
+            else:
+                n = alvo - anterior[0]
+                print(f"{alvo:>7} {atual[0]:>7.0f}MB {atual[1]:>7.0f}MB"
+                      f" {(atual[0] - anterior[1]) / n:>11.2f}MB {(atual[1] - anterior[2]) / n:>14.2f}MB {segundos:>8.2f}s")
+            anterior = (alvo, *atual)
+
+
+if __name__ == "__main__":
+    main()
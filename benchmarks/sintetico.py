@@ -0,0 +1,109 @@
+"""Planilhas sintéticas no formato da planilha publicada, para os benchmarks."""
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from top_precos.formatacao import format_brl_series
+
+BASES = ["Arroz", "Feijão Carioca", "Óleo de Soja", "Açúcar Refinado", "Café Torrado", "Leite Integral",
+         "Pão Francês", "Maçã Gala", "Macarrão Espaguete", "Filé de Frango", "Sabão em Pó", "Requeijão",
+         "Farinha de Mandioca", "Molho de Tomate", "Biscoito Maisena", "Água Sanitária", "Manteiga", "Iogurte"]
+MARCAS = ["Tio João", "Camil", "Liza", "União", "Pilão", "Italac", "Piracanjuba", "Nestlé", "Omo", "Sadia",
+          "Qualitá", "Kicaldo", "Vitarella", "Quero", "Yoki", "Aviação", "Danone", "Seara"]
+MEDIDAS = ["1kg", "5 kg", "900ml", "500g", "1 L", "200 g", "12 un", "2kg", "400 g", "1,5L"]
+MERCADOS = ["Atacadão", "Assaí", "Carrefour", "Extra", "Pão de Açúcar", "Dia", "Big", "Sonda", "Tenda",
+            "Bretas", "Guanabara", "Zaffari", "Condor", "Savegnago", "Muffato", "Comper", "Angeloni",
+            "São Vicente", "Covabra", "Hirota"]
+
+
+def nomes_produtos(n_produtos: int, seed: int = 0) -> np.ndarray:
+    """Nomes distintos com acentos, marcas e medidas variadas."""
+    rng = np.random.default_rng(seed)
+    bases = rng.integers(0, len(BASES), n_produtos)
+    marcas = rng.integers(0, len(MARCAS), n_produtos)
+    medidas = rng.integers(0, len(MEDIDAS), n_produtos)
+    return np.array([
+        f"{BASES[b]} {MARCAS[m]} {MEDIDAS[d]} {i}"
+        for i, (b, m, d) in enumerate(zip(bases, marcas, medidas))
+    ], dtype=object)
+
+
+def _sem_acentos(s: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFD", s) if unicodedata.category(c) != "Mn")
+
+
+def _medida_reescrita(m: re.Match) -> str:
+    quantidade, unidade = float(m.group(1).replace(",", ".")), m.group(2).lower()
+    if unidade in ("kg", "l"):
+        return f"{quantidade * 1000:g} {'g' if unidade == 'kg' else 'ml'}"
+    return f"{m.group(1)}{m.group(2).upper()}"
+
+
+def _com_erro(palavra: str, rng) -> str:
+    """Duas letras vizinhas invertidas, como quem digita rápido."""
+    i = int(rng.integers(1, len(palavra) - 1))
+    return palavra[:i] + palavra[i + 1] + palavra[i] + palavra[i + 2:]
+
+
+def grafia_variante(nome: str, rng) -> str:
+    """O mesmo produto escrito como outro mercado escreveria: caixa, acentos, medida,
+    "Tipo 1", marca antes do produto ou um erro de digitação."""
+    palavras = nome.split()
+    transformacoes = rng.choice(5, size=int(rng.integers(1, 3)), replace=False)
+    for t in transformacoes:
+        if t == 0:
+            palavras = _sem_acentos(" ".join(palavras)).upper().split()
+        elif t == 1:
+            palavras = re.sub(r"(\d+(?:,\d+)?) ?(kg|g|ml|l|un)\b", _medida_reescrita, " ".join(palavras),
+                              flags=re.IGNORECASE).split()
+        elif t == 2:
+            palavras.insert(1, "Tipo 1")
+        elif t == 3 and len(palavras) > 2:
+            palavras = palavras[1:2] + palavras[:1] + palavras[2:]
+        elif t == 4:
+            longas = [i for i, p in enumerate(palavras) if len(p) >= 5 and p.isalpha()]
+            if longas:
+                i = longas[int(rng.integers(len(longas)))]
+                palavras[i] = _com_erro(palavras[i], rng)
+    return " ".join(palavras)
+
+
+def mercados(n_mercados: int) -> list:
+    return [MERCADOS[i] if i < len(MERCADOS) else f"Mercado {i + 1}" for i in range(n_mercados)]
+
+
+def gerar_planilha(n_linhas: int, n_mercados: int = 12, seed: int = 0, grafias: float = 0.0) -> pd.DataFrame:
+    """DataFrame com as colunas e formatos da planilha real (Produto, Supermercado, Preço).
+
+    Cada produto aparece em vários mercados, como na planilha publicada; os
+    preços vêm como texto "R$ 1.234,56", às vezes com NBSP ou inválidos.
+    Com ``grafias`` > 0, essa fração dos produtos ganha outra grafia
+    (``grafia_variante``) nos mercados de índice ímpar, e a coluna "Produto
+    original" guarda o nome de referência.
+    """
+    rng = np.random.default_rng(seed)
+    n_produtos = max(1, n_linhas // max(1, int(n_mercados * 0.7)))
+    nomes = nomes_produtos(n_produtos, seed)
+    lojas = np.array(mercados(n_mercados), dtype=object)
+
+    produto = rng.integers(0, n_produtos, n_linhas)
+    base = rng.lognormal(2.3, 1.0, n_produtos)
+    valores = np.round(base[produto] * rng.uniform(0.8, 1.3, n_linhas), 2)
+    precos = format_brl_series(pd.Series(valores)).to_numpy().copy()
+    nbsp = rng.random(n_linhas) < 0.05
+    precos[nbsp] = np.char.replace(precos[nbsp].astype(str), "R$ ", "R$\u00a0").astype(object)
+    precos[rng.random(n_linhas) < 0.005] = "-"
+
+    loja = rng.integers(0, n_mercados, n_linhas)
+    df = pd.DataFrame({"Produto": nomes[produto], "Supermercado": lojas[loja], "Preço": precos})
+    if grafias > 0:
+        variantes = np.array([grafia_variante(n, rng) if rng.random() < grafias else n for n in nomes], dtype=object)
+        df["Produto original"] = df["Produto"]
+        df["Produto"] = np.where(loja % 2 == 1, variantes[produto], nomes[produto])
+    return df
+
+
+def gerar_csv(n_linhas: int, n_mercados: int = 12, seed: int = 0) -> bytes:
+    return gerar_planilha(n_linhas, n_mercados, seed).to_csv(index=False).encode("utf-8")
@@ -0,0 +1,166 @@
+"""Suíte de benchmarks do núcleo (sem Streamlit) sobre planilhas sintéticas.
+
+Mede cada etapa do caminho dos dados em vários tamanhos de planilha e grava
+uma linha JSON por execução, comparando com a execução anterior para que
+regressões apareçam de uma rodada para outra.
+
+Uso: python -m benchmarks.suite [--tamanhos 1000 10000 ...] [--mercados 12]
+                                [--saida benchmarks/resultados.jsonl] [--nao-salvar]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from top_precos import (
+    Catalogo, analisar_precos, atribuir_produtos, generate_pdf, ler_planilha, norm, norm_series, padronizar_colunas,
+    preparar_csv, preparar_dataframe, renderizar_pdf, resumir_por_produto,
+)
+
+from . import cronometrar
+from .sintetico import gerar_csv
+
+TAMANHOS = [1_000, 10_000, 100_000, 1_000_000]
+SAIDA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resultados.jsonl")
+CONSULTAS = ["a", "ca", "arroz", "feijao", "oleo de soja", "tio joao", "5 kg", "acucar uniao",
+             "leite integral italac", "requeijao", "xyz", "pao", "900ml", "sabao em po omo"]
+# Erros de digitação e palavras fora de ordem: só a busca aproximada encontra
+CONSULTAS_APROXIMADAS = ["fejao", "oleo soja 900", "soja oleo", "arros tio joao", "leite intgral",
+                         "acucar uniao refinado", "sabao po omo", "requeijao 400g"]
+ITENS_PDF = 100
+
+
+def lista_de_compras(df: pd.DataFrame, n_itens: int) -> dict:
+    amostra = df.iloc[np.linspace(0, len(df) - 1, min(n_itens, len(df))).astype(int)]
+    return {
+        f"{p}_{m}": {'Produto': p, 'Mercado': m, 'Valor': float(v), 'Quantidade': 1 + i % 3}
+        for i, (p, m, v) in enumerate(zip(amostra["Produto"], amostra["Mercado"], amostra["Valor"]))
+    }
+
+
+def pdf_sem_cache(lista: dict):
+    """O PDF é memoizado pelo conteúdo da lista; aqui interessa a renderização."""
+    renderizar_pdf.cache_clear()
+    return generate_pdf(lista)
+
+
+def latencias(buscar, consultas, repeticoes: int = 5) -> dict:
+    tempos = []
+    for _ in range(repeticoes):
+        for q in consultas:
+            t0 = time.perf_counter()
+            buscar(norm(q))
+            tempos.append(time.perf_counter() - t0)
+    tempos = np.array(tempos) * 1e3
+    return {
+        "p50_ms": round(float(np.percentile(tempos, 50)), 3),
+        "p95_ms": round(float(np.percentile(tempos, 95)), 3),
+        "max_ms": round(float(tempos.max()), 3),
+    }
+
+
+def medir(n_linhas: int, n_mercados: int) -> dict:
+    conteudo = gerar_csv(n_linhas, n_mercados)
+    rep = 3 if n_linhas <= 100_000 else 1
+    etapas = {}
+
+    def etapa(nome, fn, linhas=n_linhas):
+        segundos, resultado = cronometrar(fn, rep)
+        etapas[nome] = {"ms": round(segundos * 1e3, 3), "linhas_s": round(linhas / segundos) if segundos else None}
+        return resultado
+
+    df_raw = etapa("csv", lambda: ler_planilha(conteudo))
+    etapa("padronizar", lambda: padronizar_colunas(df_raw))
+    etapa("normalizar", lambda: norm_series(df_raw["Produto"]))
+    etapa("precos", lambda: analisar_precos(df_raw["Preço"]))
+    df = etapa("preparar", lambda: preparar_dataframe(df_raw))
+    # Parte do preparar: agrupamento dos nomes em produtos canônicos
+    etapa("canonico", lambda: atribuir_produtos(df), len(df))
+    # Caminho do app: CSV → catálogo lido em partes, sem a planilha bruta inteira
+    etapa("csv_partes", lambda: preparar_csv(conteudo))
+    catalogo = etapa("catalogo", lambda: Catalogo(df), len(df))
+    etapa("agregar", lambda: resumir_por_produto(df, catalogo.indice.codes), len(df))
+
+    # Busca: latência por consulta (o que o usuário sente a cada tecla)
+    etapas["busca"] = latencias(catalogo.indice.search, CONSULTAS)
+    # Caminho do app: busca aproximada, ordenada por similaridade e preço
+    etapas["busca_fuzzy"] = latencias(catalogo.buscar, CONSULTAS + CONSULTAS_APROXIMADAS)
+
+    lista = lista_de_compras(df, ITENS_PDF)
+    etapa("pdf", lambda: pdf_sem_cache(lista), len(lista))
+
+    return {"linhas": n_linhas, "distintos": len(catalogo.resumo), "bytes": len(conteudo), "etapas": etapas}
+
+
+def versao_git() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def ultima_execucao(caminho: str):
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, encoding="utf-8") as f:
+        linhas = [l for l in f if l.strip()]
+    return json.loads(linhas[-1]) if linhas else None
+
+
+def tempo_principal(dados: dict):
+    return dados.get("ms", dados.get("p50_ms"))
+
+
+def imprimir(resultado: dict, anterior):
+    base = {}
+    if anterior:
+        for r in anterior["resultados"]:
+            base[r["linhas"]] = r["etapas"]
+
+    print(f"{'linhas':>9} {'etapa':<11} {'tempo':>11} {'linhas/s':>12} {'vs anterior':>12}")
+    for r in resultado["resultados"]:
+        for nome, dados in r["etapas"].items():
+            tempo = tempo_principal(dados)
+            if "p50_ms" in dados:
+                desc = f"p50 {dados['p50_ms']:.2f}ms p95 {dados['p95_ms']:.2f}ms"
+                print(f"{r['linhas']:>9} {nome:<11} {desc:>24}", end="")
+            else:
+                print(f"{r['linhas']:>9} {nome:<11} {tempo:>9.1f}ms {dados['linhas_s'] or 0:>12,}", end="")
+            ref = base.get(r["linhas"], {}).get(nome)
+            if ref and tempo_principal(ref):
+                print(f" {(tempo / tempo_principal(ref) - 1) * 100:>+10.1f}%")
+            else:
+                print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=TAMANHOS)
+    parser.add_argument("--mercados", type=int, default=12)
+    parser.add_argument("--saida", default=SAIDA)
+    parser.add_argument("--nao-salvar", action="store_true")
+    args = parser.parse_args()
+
+    resultado = {
+        "quando": datetime.now().isoformat(timespec="seconds"),
+        "git": versao_git(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "mercados": args.mercados,
+        "resultados": [medir(n, args.mercados) for n in args.tamanhos],
+    }
+    imprimir(resultado, ultima_execucao(args.saida))
+    if not args.nao_salvar:
+        with open(args.saida, "a", encoding="utf-8") as f:
+            f.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
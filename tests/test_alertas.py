@@ -0,0 +1,115 @@
+"""Lista de observação: disparo das regras, sem alerta repetido, estado que sobrevive a reabrir o banco."""
+import json
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from top_precos.alertas import ListaObservacao
+from top_precos.catalogo import Catalogo
+from top_precos.dados import preparar_dataframe
+
+
+def catalogo(extra, dia):
+    """Arroz 5kg nos mercados Extra e Dia; preço None tira o mercado da planilha."""
+    linhas = [(m, p) for m, p in (("Extra", extra), ("Dia", dia)) if p is not None]
+    return Catalogo(preparar_dataframe(pd.DataFrame({
+        "Produto": ["Arroz Tio João 5kg"] * len(linhas),
+        "Mercado": [m for m, _ in linhas],
+        "Preço": [p for _, p in linhas],
+    })))
+
+
+@pytest.fixture
+def lista(tmp_path):
+    return ListaObservacao(str(tmp_path / "alertas.sqlite"), str(tmp_path / "saida.jsonl"))
+
+
+@pytest.fixture
+def arroz():
+    return catalogo("10,00", "12,00").df["produto_norm"].iloc[0]
+
+
+def disparos(alertas):
+    return sorted(zip(alertas["regra"], alertas["tipo"], alertas["mercado"]))
+
+
+def test_alvo_e_mercado(lista, arroz):
+    alvo = lista.adicionar(arroz, "Arroz", alvo=9.0)
+    observa = lista.adicionar(arroz, "Arroz")
+    no_dia = lista.adicionar(arroz, "Arroz", alvo=11.0, mercado="Dia")
+    com_alvo = lista.adicionar(arroz, "Arroz", alvo=50.0)
+
+    # Primeira avaliação: só o alvo já atingido dispara (não havia mercado anterior)
+    assert disparos(lista.avaliar(catalogo("10,00", "12,00"))) == [(com_alvo, "alvo", "Extra")]
+
+    # Dia fica mais barato: alvo de 9 e alvo no Dia atingidos; só a regra sem alvo avisa da troca de mercado
+    assert disparos(lista.avaliar(catalogo("10,00", "8,00"))) == [
+        (alvo, "alvo", "Dia"), (observa, "mercado", "Dia"), (no_dia, "alvo", "Dia"), (com_alvo, "alvo", "Dia"),
+    ]
+
+
+def test_sem_alerta_repetido(lista, arroz):
+    regra = lista.adicionar(arroz, "Arroz", alvo=9.0)
+    assert disparos(lista.avaliar(catalogo("8,00", "12,00"))) == [(regra, "alvo", "Extra")]
+    assert lista.avaliar(catalogo("8,00", "12,00")).empty
+    # Subir e voltar ao mesmo preço avisa de novo; cair mais, também
+    assert lista.avaliar(catalogo("9,50", "12,00")).empty
+    assert disparos(lista.avaliar(catalogo("8,00", "12,00"))) == [(regra, "alvo", "Extra")]
+    assert disparos(lista.avaliar(catalogo("7,00", "12,00"))) == [(regra, "alvo", "Extra")]
+    # Fora da planilha e de volta ao mesmo preço: avisa
+    assert lista.avaliar(catalogo(None, "12,00")).empty
+    assert disparos(lista.avaliar(catalogo("7,00", "12,00"))) == [(regra, "alvo", "Extra")]
+
+
+def test_regra_nova_avaliada_sozinha(lista, arroz):
+    antiga = lista.adicionar(arroz, "Arroz", alvo=11.0)
+    lista.avaliar(catalogo("10,00", "12,00"))
+    nova = lista.adicionar(arroz, "Arroz", alvo=11.0)
+    assert disparos(lista.avaliar(catalogo("10,00", "12,00"), ids=[nova])) == [(nova, "alvo", "Extra")]
+    assert lista.avaliar(catalogo("10,00", "12,00")).empty
+    assert set(lista.regras()["id"]) == {antiga, nova}
+
+
+def test_estado_persiste(lista, arroz):
+    regra = lista.adicionar(arroz, "Arroz", alvo=9.0)
+    observa = lista.adicionar(arroz, "Arroz")
+    lista.avaliar(catalogo("8,00", "12,00"))
+
+    reaberta = ListaObservacao(lista.caminho, lista.saida)
+    pd.testing.assert_frame_equal(reaberta.regras(), lista.regras())
+    assert reaberta.avaliar(catalogo("8,00", "12,00")).empty
+    assert disparos(reaberta.avaliar(catalogo("9,00", "7,00"))) == [(regra, "alvo", "Dia"), (observa, "mercado", "Dia")]
+
+    reaberta.remover(regra)
+    assert list(ListaObservacao(lista.caminho, lista.saida).regras()["id"]) == [observa]
+
+
+def test_caixa_de_saida(lista, arroz):
+    lista.adicionar(arroz, 'Arroz "tipo 1"', alvo=9.0)
+    lista.adicionar(arroz, "Arroz", alvo=9.0, mercado="Extra")
+    lista.avaliar(catalogo("8,00", "12,00"), quando=0)
+    lista.avaliar(catalogo("7,00", "12,00"), quando=60)
+
+    with open(lista.saida, encoding="utf-8") as f:
+        linhas = [json.loads(linha) for linha in f]
+    assert [(a["regra"], a["valor"], a["quando"]) for a in linhas] == [
+        (1, 8.0, "1970-01-01T00:00:00+00:00"), (2, 8.0, "1970-01-01T00:00:00+00:00"),
+        (1, 7.0, "1970-01-01T00:01:00+00:00"), (2, 7.0, "1970-01-01T00:01:00+00:00"),
+    ]
+    assert linhas[0]["produto"] == 'Arroz "tipo 1"' and linhas[2]["anterior"] == 8.0
+    assert len(lista.recentes) == 4
+
+
+def test_estado_na_tabela_de_regras(tmp_path, arroz):
+    """Bancos antigos, com o estado nas colunas de ``regras``, não disparam de novo."""
+    caminho = str(tmp_path / "alertas.sqlite")
+    with sqlite3.connect(caminho) as con:
+        con.execute("CREATE TABLE regras (id INTEGER PRIMARY KEY, produto_norm TEXT NOT NULL, produto TEXT,"
+                    " alvo REAL, mercado TEXT, criada_em INTEGER NOT NULL, ultimo_valor REAL, ultimo_mercado TEXT)")
+        con.execute("INSERT INTO regras VALUES (1, ?, 'Arroz', 9.0, NULL, 0, 8.0, 'Extra')", (arroz,))
+    con.close()
+
+    lista = ListaObservacao(caminho, str(tmp_path / "saida.jsonl"))
+    assert lista.avaliar(catalogo("8,00", "12,00")).empty
+    assert disparos(lista.avaliar(catalogo("7,00", "12,00"))) == [(1, "alvo", "Extra")]
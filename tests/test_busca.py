@@ -0,0 +1,75 @@
+"""Busca do catálogo: por substring igual a ``str.contains`` e aproximada (erros de digitação) sem inundar termos curtos."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from top_precos.busca import SearchIndex
+from top_precos.catalogo import Catalogo
+from top_precos.dados import preparar_dataframe
+from top_precos.texto import norm
+
+PRODUTOS = [
+    "Arroz Tio João 5kg", "Feijão Carioca Camil 1kg", "Pão Francês", "Pão de Queijo Yoki 400g",
+    "Papel Higiênico Neve 12 un", "Pasta de Dente Colgate", "Sabão em Pó Omo 1kg", "Uvas Passas 200g",
+    "Sal Refinado Cisne 1kg", "Salsicha Sadia 500g", "Leite Integral Italac 1 L", "Óleo de Soja Liza 900ml",
+    "Açúcar Refinado União 1kg", "Requeijão Danone 200 g", "Café Torrado Pilão 500g",
+]
+
+
+@pytest.fixture(scope="module")
+def catalogo():
+    df = pd.DataFrame({
+        "Produto": PRODUTOS * 2,
+        "Mercado": ["Extra"] * len(PRODUTOS) + ["Dia"] * len(PRODUTOS),
+        "Preço": [f"{i + 1},90" for i in range(len(PRODUTOS) * 2)],
+    })
+    return Catalogo(preparar_dataframe(df))
+
+
+def produtos(catalogo, termo):
+    return set(catalogo.df["Produto"].iloc[catalogo.buscar(termo)].astype(str))
+
+
+@pytest.mark.parametrize("termo, esperado", [
+    ("aroz", {"Arroz Tio João 5kg"}),
+    ("fejao", {"Feijão Carioca Camil 1kg"}),
+    ("fejao carioca", {"Feijão Carioca Camil 1kg"}),
+    ("leite intgral", {"Leite Integral Italac 1 L"}),
+    ("soja oleo", {"Óleo de Soja Liza 900ml"}),
+    ("acucar uniao refinado", {"Açúcar Refinado União 1kg"}),
+])
+def test_erros_de_digitacao_encontram(catalogo, termo, esperado):
+    assert produtos(catalogo, termo) == esperado
+
+
+@pytest.mark.parametrize("termo, esperado", [
+    # Duas letras iniciais em comum não bastam: nada de Papel, Pasta, Passas ou Sabão
+    ("pao", {"Pão Francês", "Pão de Queijo Yoki 400g"}),
+    ("sal", {"Sal Refinado Cisne 1kg", "Salsicha Sadia 500g"}),
+    ("pas", {"Pasta de Dente Colgate", "Uvas Passas 200g"}),
+])
+def test_termos_curtos_nao_inundam(catalogo, termo, esperado):
+    assert produtos(catalogo, termo) == esperado
+
+
+def test_substring_vem_primeiro(catalogo):
+    linhas = catalogo.buscar("cafe torado")
+    assert linhas.size and catalogo.df["Produto"].iloc[linhas[0]] == "Café Torrado Pilão 500g"
+    assert produtos(catalogo, "xyz") == set()
+
+
+@pytest.mark.parametrize("categorica", [False, True])
+@pytest.mark.parametrize("termo", [
+    "Pão", "pão de", "AÇÚCAR", "requeijão", "óleo de soja", "feijão carioca",  # com acento
+    "a", "ç", "1", " ", "de", "kg", "1 ",  # uma ou duas letras
+    "arroz tio", "g", "500g", "zzz", "",
+])
+def test_substring_igual_str_contains(catalogo, termo, categorica):
+    nomes = catalogo.df["produto_norm"].astype("category" if categorica else object)
+    normalizado = norm(termo) if termo.strip() else termo  # " " segue como está: nomes com espaço
+    esperado = np.flatnonzero(nomes.astype(str).str.contains(normalizado, regex=False, case=False))
+    obtido = SearchIndex(nomes).search(normalizado)
+    np.testing.assert_array_equal(obtido, esperado)
+    # Escrito como no nome original, com acento e qualquer caixa: nada que str.contains acha fica de fora
+    original = catalogo.df["Produto"].astype(str).str.contains(termo, regex=False, case=False)
+    assert set(np.flatnonzero(original)) <= set(obtido)
@@ -0,0 +1,43 @@
+"""Produto canônico: grafias do mesmo produto se juntam, produtos diferentes ficam separados."""
+import pandas as pd
+import pytest
+
+from top_precos.canonico import atribuir_produtos
+
+# (nome, nome, mesmo produto?) já normalizados
+CORPUS = [
+    ("arroz tio joao 5kg", "arroz tio joao tipo 1 5 kg", True),
+    ("arroz tio joao 5kg", "arroz tiojoao 5000g", True),
+    ("feijao carioca camil 1kg", "feijao caroica camil 1kg", True),
+    ("leite integral italac 1l", "leite integ italac 1 litro", True),
+    ("biscoito recheado bauducco 140g", "biscoito recheado baudcuco 140g", True),
+    # Produtos diferentes: outro tipo, outra medida, palavras curtas a uma letra de distância
+    ("arroz tipo 1 5kg", "arroz tipo 2 5kg", False),
+    ("refrigerante coca 2l", "refrigerante cola 2l", False),
+    ("queijo prato 1kg", "queijo preto 1kg", False),
+    ("cafe pilao 500g", "cafe pilar 500g", False),
+    ("arroz tio joao 5kg", "arroz tio joao 1kg", False),
+    ("leite integral italac 1l", "leite desnatado italac 1l", False),
+]
+
+
+def ids(nomes, categorica=False):
+    coluna = pd.Series(nomes, dtype="category" if categorica else object)
+    return atribuir_produtos(pd.DataFrame({"produto_norm": coluna}))["produto_id"].tolist()
+
+
+@pytest.mark.parametrize("categorica", [False, True])
+@pytest.mark.parametrize("a, b, mesmo", CORPUS)
+def test_pares(a, b, mesmo, categorica):
+    # Linhas repetidas do mesmo nome ficam sempre com o mesmo id
+    id_a, id_b, id_a2 = ids([a, b, a], categorica)
+    assert id_a == id_a2
+    assert (id_a == id_b) == mesmo
+
+
+def test_corpus_inteiro_no_mesmo_catalogo():
+    """Com todos os nomes juntos, um grupo não puxa outro por transitividade."""
+    nomes = sorted({n for a, b, _ in CORPUS for n in (a, b)})
+    produto = dict(zip(nomes, ids(nomes)))
+    for a, b, mesmo in CORPUS:
+        assert (produto[a] == produto[b]) == mesmo, (a, b)
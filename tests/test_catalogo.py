@@ -0,0 +1,92 @@
+"""Catálogo: recortes por posição e menores preços iguais ao filtro e ao groupby do pandas."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from top_precos.catalogo import Catalogo, Recorte
+from top_precos.dados import preparar_dataframe
+
+PRODUTOS = [
+    "Arroz Tio João 5kg", "Arroz Tio João Tipo 1 5 kg", "Feijão Carioca Camil 1kg", "Pão Francês",
+    "Pão de Queijo Yoki 400g", "Sal Refinado Cisne 1kg", "Leite Integral Italac 1 L", "Café Torrado Pilão 500g",
+]
+MERCADOS = ["Extra", "Dia", "Assaí", "Carrefour"]
+
+
+@pytest.fixture(scope="module")
+def catalogo():
+    rng = np.random.default_rng(0)
+    linhas = [(p, m) for p in PRODUTOS for m in MERCADOS if rng.random() < 0.7]
+    linhas += linhas[::3]  # o mesmo produto duas vezes no mesmo mercado, com outro preço
+    return Catalogo(preparar_dataframe(pd.DataFrame({
+        "Produto": [p for p, _ in linhas],
+        "Mercado": [m for _, m in linhas],
+        "Preço": [f"{v:.2f}".replace(".", ",") for v in rng.uniform(1, 50, len(linhas))],
+    })))
+
+
+@pytest.mark.parametrize("termo", ["", "a", "pa", "arroz", "pao", "arroz tio joao 5kg", "xyz"])
+def test_recorte(catalogo, termo):
+    recorte = catalogo.recorte(termo)
+    esperado = catalogo.df if not termo else catalogo.df.iloc[catalogo.buscar(termo)]
+    pd.testing.assert_frame_equal(recorte.materializar(), esperado)
+    assert len(recorte) == len(esperado) and recorte.empty == esperado.empty
+    for inicio, fim in ((0, 3), (2, 5), (len(esperado), len(esperado) + 2)):
+        pd.testing.assert_frame_equal(recorte.fatia(inicio, fim), esperado.iloc[inicio:fim])
+    # Termos curtos: exatamente as linhas do filtro por substring, na ordem de exibição
+    if len(termo) < 3:
+        pd.testing.assert_frame_equal(
+            recorte.materializar(), catalogo.df[catalogo.df["produto_norm"].astype(str).str.contains(termo, regex=False)])
+
+
+@pytest.mark.parametrize("termo", ["a", "arroz", "pao", "cafe torado"])
+def test_recorte_menor_preco(catalogo, termo):
+    df = catalogo.df
+    encontrados = df.iloc[catalogo.buscar(termo)]["produto_id"].unique()
+    grupos = df[df["produto_id"].isin(encontrados)].groupby("produto_id", sort=False)
+    esperado = grupos["Valor"].agg(["min", "max"]).assign(mercados=grupos["Mercado"].nunique())
+
+    obtido = catalogo.recorte(termo, menor_preco=True).materializar()
+    produto = df.groupby("produto_norm", observed=True)["produto_id"].first()
+    obtido = obtido.set_index(produto.loc[obtido["produto_norm"].astype(str)].to_numpy())
+    assert sorted(obtido.index) == sorted(esperado.index)
+    esperado = esperado.loc[obtido.index]
+    np.testing.assert_array_equal(obtido["Valor"], esperado["min"])
+    np.testing.assert_array_equal(obtido["Maior"], esperado["max"])
+    np.testing.assert_array_equal(obtido["Mercados"], esperado["mercados"])
+
+
+def test_recorte_guarda_posicoes():
+    df = pd.DataFrame({"a": range(5)})
+    assert Recorte(df).posicoes is None and len(Recorte(df)) == 5
+    recorte = Recorte(df, np.array([4, 0, 2], dtype=np.int64))
+    assert recorte.posicoes.dtype == np.int32
+    assert recorte.materializar()["a"].tolist() == [4, 0, 2] and recorte.fatia(1, 3)["a"].tolist() == [0, 2]
+
+
+def test_menores_precos(catalogo):
+    df = catalogo.df
+    nomes = list(df["produto_norm"].astype(str).unique()) + ["nao existe"]
+    por_produto = df.groupby("produto_id")["Valor"].min()
+    por_mercado = df.groupby(["produto_id", "Mercado"], observed=True)["Valor"].min()
+    produto = df.groupby("produto_norm", observed=True)["produto_id"].first()
+
+    # Qualquer mercado: o menor preço do produto canônico e um mercado onde ele está
+    valores, codigos = catalogo.menores_precos(nomes)
+    for nome, valor, codigo in zip(nomes, valores, codigos):
+        if nome not in produto:
+            assert np.isnan(valor) and codigo == -1
+            continue
+        assert valor == por_produto[produto[nome]]
+        assert por_mercado[(produto[nome], catalogo.mercados[codigo])] == valor
+
+    # Mercado pedido (um por nome, None: qualquer um; mercado desconhecido: NaN)
+    pedidos = ((MERCADOS + [None, "Outro"]) * len(nomes))[:len(nomes)]
+    valores, codigos = catalogo.menores_precos(nomes, pedidos)
+    for nome, mercado, valor, codigo in zip(nomes, pedidos, valores, codigos):
+        if mercado is None and nome in produto:
+            assert valor == por_produto[produto[nome]]
+        elif mercado is not None and nome in produto and (produto[nome], mercado) in por_mercado.index:
+            assert valor == por_mercado[(produto[nome], mercado)] and catalogo.mercados[codigo] == mercado
+        else:
+            assert np.isnan(valor) and codigo == -1
@@ -0,0 +1,57 @@
+"""Diagnóstico: rodada por rerun, inclusive no rerun só de um fragmento."""
+import json
+import logging
+
+import pytest
+
+from top_precos.diagnostico import METRICAS, encerrar_rodada, iniciar_rodada, rodada_fragmento
+
+
+@pytest.fixture
+def linhas_log():
+    linhas = []
+
+    class Guardar(logging.Handler):
+        def emit(self, registro):
+            linhas.append(json.loads(registro.getMessage()))
+
+    logger = logging.getLogger("top_precos.diagnostico")
+    handler = Guardar()
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    yield linhas
+    logger.removeHandler(handler)
+
+
+def test_rerun_do_fragmento_abre_rodada(linhas_log):
+    # O topo do script já encerrou a rodada dele: o fragmento abre e fecha a sua
+    encerrar_rodada(iniciar_rodada(True))
+    linhas_log.clear()
+    with rodada_fragmento(True, "render_lista_compras") as rodada:
+        with METRICAS.etapa("otimizar", linhas=3):
+            pass
+        METRICAS.contar("pdf")
+    assert rodada is not None and [nome for nome, _, _ in rodada.etapas] == ["otimizar"]
+    assert len(linhas_log) == 1
+    assert linhas_log[0]["fragmento"] == "render_lista_compras"
+    assert linhas_log[0]["etapas"]["otimizar"]["linhas"] == 3 and linhas_log[0]["contadores"] == {"pdf": 1}
+
+
+def test_fragmento_na_execucao_completa_segue_na_rodada_dela(linhas_log):
+    completa = iniciar_rodada(True)
+    with rodada_fragmento(True, "render_lista_compras") as rodada:
+        with METRICAS.etapa("lista_compras"):
+            pass
+    assert rodada is completa and linhas_log == []
+    encerrar_rodada(completa)
+    assert len(linhas_log) == 1 and "fragmento" not in linhas_log[0]
+    assert list(linhas_log[0]["etapas"]) == ["lista_compras"]
+
+
+def test_fragmento_sem_diagnostico(linhas_log):
+    if METRICAS.ativo:
+        pytest.skip("TOP_PRECOS_DIAGNOSTICO=1 liga a rodada para o processo todo")
+    with rodada_fragmento(False, "render_lista_compras") as rodada:
+        with METRICAS.etapa("otimizar"):
+            pass
+    assert rodada is None and linhas_log == []
@@ -0,0 +1,104 @@
+"""FonteCSV contra um servidor HTTP local: ETag/304, troca de conteúdo, max_bytes e nova tentativa em 5xx."""
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from top_precos.fonte import ConteudoGrandeDemais, FonteCSV
+
+CSV = b"Produto,Mercado,Valor\nArroz,Extra,\"12,90\"\n"
+
+
+class Planilha(BaseHTTPRequestHandler):
+    """Serve ``servidor.corpo`` com ETag; ``servidor.falhas`` são status devolvidos antes dele."""
+
+    def do_GET(self):
+        servidor = self.server
+        servidor.pedidos.append(dict(self.headers))
+        if servidor.falhas:
+            self.send_response(servidor.falhas.pop(0))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        etag = '"%s"' % hashlib.sha256(servidor.corpo).hexdigest()[:16]
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        if servidor.declarar_tamanho:
+            self.send_header("Content-Length", str(len(servidor.corpo)))
+        else:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(servidor.corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def servidor():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), Planilha)
+    srv.corpo, srv.falhas, srv.pedidos, srv.declarar_tamanho = CSV, [], [], True
+    thread = threading.Thread(target=srv.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    srv.url = f"http://127.0.0.1:{srv.server_address[1]}/planilha.csv"
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_etag_e_304(servidor):
+    fonte = FonteCSV(servidor.url, ttl=0)
+    digest, conteudo = fonte.obter()
+    assert conteudo == CSV and digest == hashlib.sha256(CSV).hexdigest()
+
+    assert fonte.atualizar() is False
+    assert "If-None-Match" not in servidor.pedidos[0]
+    assert servidor.pedidos[1]["If-None-Match"] == fonte._etag
+    assert fonte._atual == (digest, CSV) and fonte.erro is None
+
+
+def test_conteudo_novo(servidor):
+    fonte = FonteCSV(servidor.url, ttl=0)
+    antes = fonte.obter()
+    servidor.corpo = CSV + b"Feijao,Extra,\"8,50\"\n"
+
+    assert fonte.atualizar() is True
+    assert fonte._atual[1] == servidor.corpo and fonte._atual[0] != antes[0]
+    assert fonte.atualizar() is False
+
+
+@pytest.mark.parametrize("declarar_tamanho", [True, False])
+def test_max_bytes(servidor, declarar_tamanho):
+    servidor.declarar_tamanho = declarar_tamanho
+    servidor.corpo = CSV * 1000
+    fonte = FonteCSV(servidor.url, max_bytes=len(CSV) * 10)
+
+    assert fonte.atualizar() is False
+    assert isinstance(fonte.erro, ConteudoGrandeDemais)
+    assert fonte.obter(bloquear=False) is None
+
+
+def test_nova_tentativa_em_5xx(servidor):
+    servidor.falhas = [503]
+    fonte = FonteCSV(servidor.url, tentativas=2, espera=0)
+
+    assert fonte.atualizar() is True
+    assert len(servidor.pedidos) == 2 and fonte._atual[1] == CSV
+
+    servidor.falhas = [500, 502]
+    assert fonte.atualizar() is False
+    assert isinstance(fonte.erro, requests.HTTPError) and fonte._atual[1] == CSV
+
+
+def test_4xx_nao_tenta_de_novo(servidor):
+    servidor.falhas = [404]
+    fonte = FonteCSV(servidor.url, tentativas=3, espera=0)
+
+    assert fonte.atualizar() is False
+    assert len(servidor.pedidos) == 1 and fonte.erro.response.status_code == 404
@@ -0,0 +1,62 @@
+"""Formatação vetorizada igual, byte a byte, ao caminho antigo por linha."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from top_precos.formatacao import cards_html, cards_html_pagina, format_brl, format_brl_series
+
+
+def card_html_por_linha(df_view: pd.DataFrame) -> list:
+    """Caminho antigo: iterrows + f-string + format_brl por linha."""
+    out = []
+    for _, row in df_view.iterrows():
+        out.append(f"""
+        <div class="product-card">
+            <div class="product-name">{row['Produto']}</div>
+            <div class="supplier-info">
+                <span class="supplier-label">Supermercado</span>
+                <span style="color: var(--muted); font-size: 1.05rem; font-weight: 500;">{row['Mercado']}</span>
+            </div>
+            <div class="price-container">
+                <span class="price-value">{format_brl(row['Valor'])}</span>
+                <span class="available-badge">✅ Disponível</span>
+            </div>
+        </div>
+        """)
+    return out
+
+
+@pytest.mark.parametrize("valores", [
+    [0.0, -0.0, 0.004, 0.005, 0.015, 1.005, 2.675, 12.9, 999.995, 1000.0, 1234.56, -1234.56, 1e6, 999_999_999.995,
+     1e9, 1.5e12, np.nan, np.inf, -np.inf, None],
+    pd.Series([1, 2, 3], dtype="int64", index=[10, 20, 30]),
+    pd.Series(["12,90", "3.5", "x"], dtype=object),
+    [],
+])
+def test_format_brl_series_casos(valores):
+    serie = pd.Series(valores, dtype=object) if isinstance(valores, list) else valores
+    obtido = format_brl_series(serie)
+    assert obtido.tolist() == [format_brl(pd.to_numeric(v, errors="coerce")) for v in serie]
+    assert obtido.index.equals(serie.index)
+
+
+def test_format_brl_series_aleatorio():
+    rng = np.random.default_rng(0)
+    valores = np.concatenate([
+        np.round(rng.lognormal(2.5, 1.2, 20_000), 2),
+        rng.uniform(-1e4, 1e4, 20_000),  # sem arredondar: empates e meio centavo
+        np.arange(0, 100, 0.005),
+    ])
+    valores[rng.random(len(valores)) < 0.01] = np.nan
+    assert format_brl_series(valores).tolist() == [format_brl(v) for v in valores]
+
+
+def test_cards_html():
+    df = pd.DataFrame({
+        "Produto": ["Açúcar União 1kg", "Arroz <5kg>", "Café", "Óleo"],
+        "Mercado": ["Atacadão", "Assaí", "Extra", "Dia"],
+        "Valor": [4.99, 1234.5, np.nan, 0.0],
+    }, index=[7, 3, 5, 1])
+    assert cards_html(df).tolist() == card_html_por_linha(df)
+    assert cards_html(df).index.equals(df.index)
+    assert cards_html_pagina(df) == "".join(card_html_por_linha(df))
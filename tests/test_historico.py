@@ -0,0 +1,85 @@
+"""Histórico de preços: só as mudanças entram, append-only, e fonte fora da carga não apaga ofertas."""
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from top_precos.historico import HistoricoPrecos
+
+ARROZ, FEIJAO, LEITE = ("Arroz", "Extra", 10.0), ("Feijão", "Extra", 8.0), ("Leite", "Dia", 5.0)
+
+
+def carga(fontes: dict) -> pd.DataFrame:
+    """{fonte: [(produto, mercado, valor)]} → catálogo com a coluna Fonte."""
+    linhas = [(p, m, v, p.lower(), f) for f, ofertas in fontes.items() for p, m, v in ofertas]
+    return pd.DataFrame(linhas, columns=["Produto", "Mercado", "Valor", "produto_norm", "Fonte"]).astype(
+        {"Mercado": "category", "Fonte": "category"})
+
+
+def mudancas(historico):
+    with sqlite3.connect(historico.caminho) as con:
+        linhas = con.execute("SELECT o.produto, m.registrado_em, m.valor, m.anterior FROM mudancas m"
+                             " JOIN ofertas o ON o.chave = m.chave ORDER BY m.rowid").fetchall()
+    con.close()
+    return linhas
+
+
+@pytest.fixture
+def historico(tmp_path):
+    return HistoricoPrecos(str(tmp_path / "historico.sqlite"))
+
+
+def test_so_mudancas_e_append_only(historico):
+    assert historico.registrar(carga({"a": [ARROZ, FEIJAO]}), quando=1) == 2
+    # Mesmo preço: nenhuma linha nova, nem reabrindo o banco
+    assert historico.registrar(carga({"a": [ARROZ, FEIJAO]}), quando=2) == 0
+    assert HistoricoPrecos(historico.caminho).registrar(carga({"a": [ARROZ, FEIJAO]}), quando=3) == 0
+
+    assert historico.registrar(carga({"a": [("Arroz", "Extra", 9.0), FEIJAO]}), quando=4) == 1
+    assert historico.registrar(carga({"a": [ARROZ, FEIJAO]}), quando=5) == 1
+    # As linhas antigas continuam lá, na ordem em que entraram
+    assert mudancas(historico) == [
+        ("Arroz", 1, 10.0, None), ("Feijão", 1, 8.0, None), ("Arroz", 4, 9.0, 10.0), ("Arroz", 5, 10.0, 9.0),
+    ]
+
+
+def test_oferta_repetida_vale_pelo_menor_preco(historico):
+    assert historico.registrar(carga({"a": [ARROZ, ("Arroz", "Extra", 7.0)]}), quando=1) == 1
+    assert historico.registrar(carga({"a": [("Arroz", "Extra", 7.0), ARROZ]}), quando=2) == 0
+    assert mudancas(historico) == [("Arroz", 1, 7.0, None)]
+
+
+def test_fonte_ausente_nao_remove(historico):
+    historico.registrar(carga({"a": [ARROZ, FEIJAO], "b": [LEITE]}), quando=1)
+    # Fonte b fora do ar nesta carga: o leite continua vigente
+    assert historico.registrar(carga({"a": [ARROZ, FEIJAO]}), quando=2) == 0
+    assert historico.registrar(carga({"a": [ARROZ, FEIJAO], "b": [LEITE]}), quando=3) == 0
+    # Fonte a veio sem o feijão: ele saiu
+    assert historico.registrar(carga({"a": [ARROZ], "b": [LEITE]}), quando=4) == 1
+    assert mudancas(historico)[-1] == ("Feijão", 4, None, 8.0)
+    # Vale também depois de reabrir (fontes lidas do banco)
+    assert HistoricoPrecos(historico.caminho).registrar(carga({"a": [ARROZ]}), quando=5) == 0
+    # Sem a coluna Fonte, toda oferta ausente sai
+    assert HistoricoPrecos(historico.caminho).registrar(carga({"a": [ARROZ]}).drop(columns="Fonte"), quando=6) == 1
+    assert mudancas(historico)[-1] == ("Leite", 6, None, 5.0)
+
+
+def test_tendencia_e_quedas(historico):
+    leite_extra = ("Leite", "Extra", 6.0)
+    historico.registrar(carga({"a": [ARROZ, LEITE, leite_extra]}), quando=0)
+    historico.registrar(carga({"a": [("Arroz", "Extra", 8.0), LEITE, leite_extra]}), quando=86400)
+    historico.registrar(carga({"a": [("Arroz", "Extra", 8.0), leite_extra]}), quando=2 * 86400)
+
+    tendencia = historico.tendencia("arroz")
+    assert tendencia["valor"].tolist() == [10.0, 8.0]
+    assert tendencia["registrado_em"].iloc[-1] == pd.Timestamp("1970-01-02", tz="UTC")
+
+    quedas = historico.maiores_quedas(dias=7, agora=3 * 86400)
+    assert quedas[["produto", "antes", "agora"]].values.tolist() == [["Arroz", 10.0, 8.0]]
+    assert quedas["queda_pct"].iloc[0] == pytest.approx(0.2)
+
+    # Oferta que saiu fica NaN, sem o preço antigo repetido
+    precos = historico.precos_vigentes("leite")
+    assert precos["Dia"].iloc[0] == 5.0 and np.isnan(precos["Dia"].iloc[-1])
+    assert historico.mercado_mais_barato("leite")["mercado"].tolist() == ["Dia", "Dia", "Extra"]
@@ -0,0 +1,66 @@
+"""Otimizador da lista: mesmo total que a força bruta sobre todos os conjuntos de mercados."""
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from top_precos.otimizador import otimizar_cesta
+
+
+def forca_bruta(precos, quantidades, max_mercados):
+    custos = precos * quantidades[:, None]
+    melhor = np.inf
+    for k in range(1, min(max_mercados, precos.shape[1]) + 1):
+        for conjunto in combinations(range(precos.shape[1]), k):
+            melhor = min(melhor, custos[:, list(conjunto)].min(axis=1).sum())
+    return melhor
+
+
+def instancia(rng, n_itens, n_mercados, faltando=0.3):
+    precos = np.round(rng.uniform(1, 30, (n_itens, n_mercados)), 2)
+    precos[rng.random(precos.shape) < faltando] = np.inf
+    return precos, rng.integers(1, 4, n_itens).astype(float)
+
+
+def conferir(precos, quantidades, cesta, max_mercados):
+    escolhidos = cesta.mercados[cesta.mercados >= 0]
+    assert max_mercados is None or len(np.unique(escolhidos)) <= max_mercados
+    if np.isfinite(cesta.total):
+        i = np.arange(len(precos))
+        assert cesta.total == pytest.approx((precos[i, cesta.mercados] * quantidades).sum())
+
+
+@pytest.mark.parametrize("semente", range(60))
+def test_igual_forca_bruta(semente):
+    rng = np.random.default_rng(semente)
+    precos, quantidades = instancia(rng, int(rng.integers(1, 12)), int(rng.integers(2, 8)))
+    for max_mercados in (1, 2, 3):
+        cesta = otimizar_cesta(precos, quantidades, max_mercados, tempo_limite=5)
+        assert cesta.otimo
+        esperado = forca_bruta(precos, quantidades, max_mercados)
+        assert cesta.total == pytest.approx(esperado)
+        conferir(precos, quantidades, cesta, max_mercados)
+
+
+def test_sem_limite_e_casos_de_borda():
+    precos = np.array([[5.0, 3.0, np.inf], [np.inf, 4.0, 2.0], [np.inf, np.inf, np.inf]])
+    quantidades = np.array([2.0, 1.0, 1.0])
+    livre = otimizar_cesta(precos, quantidades)
+    assert livre.mercados.tolist() == [1, 2, -1] and livre.total == np.inf and livre.otimo
+
+    # Sem o item impossível: com um mercado só, o único que tem os dois
+    cesta = otimizar_cesta(precos[:2], quantidades[:2], 1)
+    assert cesta.mercados.tolist() == [1, 1] and cesta.total == 10.0
+    assert otimizar_cesta(precos[:2], quantidades[:2], 2).total == 8.0
+    assert otimizar_cesta(precos[:2], quantidades[:2], 0).mercados.tolist() == [-1, -1]
+    assert otimizar_cesta(np.empty((0, 3)), np.empty(0)).total == 0.0
+
+
+def test_limite_de_tempo():
+    rng = np.random.default_rng(1)
+    precos, quantidades = instancia(rng, 100, 25, faltando=0.2)
+    cesta = otimizar_cesta(precos, quantidades, 6, tempo_limite=0.01)
+    conferir(precos, quantidades, cesta, 6)
+    # Parou antes: devolve a melhor cesta achada até ali, dentro do limite de mercados
+    assert not cesta.otimo
+    assert otimizar_cesta(precos, quantidades).total <= cesta.total < np.inf
@@ -0,0 +1,42 @@
+"""Leitura de preços: corpus de formatos reais e separador decimal decidido pela coluna inteira."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from top_precos.dados import ler_planilha_padronizada
+from top_precos.precos import analisar_precos
+
+NAN = float("nan")
+
+# (coluna, valores esperados, separador decimal que a coluna deve decidir)
+CORPUS = [
+    (["R$ 1.234,56", "R$ 12,90", "R$ 1.234", "0,99", "r$5", "  7,00 ", "1 234,56", "R$ 2.500.000,00"],
+     [1234.56, 12.9, 1234.0, 0.99, 5.0, 7.0, 1234.56, 2500000.0], ","),
+    (["$1,234.56", "12.5", "US$ 4.99", "1,234", "BRL 3.00", "0.500", "1,000,000"],
+     [1234.56, 12.5, 4.99, 1234.0, 3.0, 0.5, 1000000.0], "."),
+    # Ambíguos sozinhos: padrão brasileiro
+    (["1.234", "5", "R$ 10"], [1234.0, 5.0, 10.0], ","),
+    # Negativos e faixas (o menor valor)
+    (["-2,50", "(2,50)", "2,50-", "-R$ 3,00", "R$ 5,00 - R$ 7,00", "5 a 7", "10 até 12,50", "3–4,5"],
+     [-2.5, -2.5, -2.5, -3.0, 5.0, 5.0, 10.0, 3.0], ","),
+    # Lixo e vazio: rejeitados, não zerados
+    (["-", "", None, "consulte", "1.2.3", "(5", "5,", "R$ 12,50/kg", "12,50"],
+     [NAN, NAN, NAN, NAN, NAN, NAN, NAN, NAN, 12.5], ","),
+    # Colunas que o pandas já leu como número
+    ([12.5, 3, None, "4,50"], [12.5, 3.0, NAN, 4.5], ","),
+]
+
+
+@pytest.mark.parametrize("coluna, esperado, decimal", CORPUS)
+def test_corpus(coluna, esperado, decimal):
+    valores, relatorio = analisar_precos(pd.Series(coluna, dtype=object))
+    np.testing.assert_allclose(valores, esperado)
+    assert relatorio.decimal == decimal
+    assert len(relatorio.rejeitados) == int(np.isnan(esperado).sum())
+
+
+@pytest.mark.parametrize("linhas_por_parte", [1, 2, 100])
+def test_partes_nao_mudam_o_separador(linhas_por_parte):
+    # Lida em partes, a coluna decide o separador inteira: "1.250" só é 1,25 por causa de "3.75" e "4.99"
+    csv = b'Produto,Mercado,Valor\nA,M,"1.250"\nB,M,"2.500"\nC,M,"3.75"\nD,M,"4.99"\n'
+    assert ler_planilha_padronizada(csv, linhas_por_parte)["Valor"].tolist() == [1.25, 2.5, 3.75, 4.99]
@@ -0,0 +1,38 @@
+"""Snapshot do catálogo: só volta na versão da planilha e das regras com que foi gravado."""
+import pandas as pd
+import pytest
+
+from top_precos.snapshot import ler_snapshot, salvar_snapshot
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({"Produto": ["Arroz", "Feijão"], "Valor": [10.0, 8.5]}, index=[3, 7])
+
+
+def test_ida_e_volta(tmp_path, df):
+    caminho = str(tmp_path / "snap" / "catalogo.feather")
+    salvar_snapshot(df, "abc", caminho, 2)
+    digest, lido = ler_snapshot(caminho)
+    assert digest == "abc"
+    pd.testing.assert_frame_equal(lido, df)
+    assert ler_snapshot(caminho, "abc", 2)[0] == "abc"
+    assert ler_snapshot(caminho, "outro") is None
+
+
+def test_versao_das_regras(tmp_path, df):
+    caminho = str(tmp_path / "catalogo.feather")
+    salvar_snapshot(df, "abc", caminho, 2)
+    assert ler_snapshot(caminho, versao=2) is not None
+    assert ler_snapshot(caminho, versao=3) is None
+    # Gravado antes da versão existir: não serve a quem pede uma
+    salvar_snapshot(df, "abc", caminho)
+    assert ler_snapshot(caminho, versao=2) is None
+    assert ler_snapshot(caminho) is not None
+
+
+def test_arquivo_ausente_ou_invalido(tmp_path):
+    assert ler_snapshot(str(tmp_path / "nada.feather")) is None
+    invalido = tmp_path / "lixo.feather"
+    invalido.write_bytes(b"nao e arrow")
+    assert ler_snapshot(str(invalido)) is None
@@ -0,0 +1,36 @@
+"""Normalização: ``norm`` e ``norm_series`` iguais à implementação de referência (NFD completo)."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from top_precos.texto import _norm_nfd, norm, norm_series
+
+NOMES = [
+    "Açúcar Refinado União 1kg", "  PÃO   FRANCÊS  ", "Feijão Carioca", "Crème brûlée", "Ñoquis",
+    "Maçã Fuji", "Leite Integral 1 L", "café", "cafe\u0301",  # acento já decomposto
+    "Øleo", "straße", "ﬁlé", "Ǆ", "ＡＢＣ", "a\u0345\u0301b", "Ω", "",  # caracteres que o NFD trata diferente
+    None, np.nan, 12.5,
+]
+
+
+@pytest.mark.parametrize("nome", NOMES)
+def test_norm_igual_referencia(nome):
+    assert norm(nome) == _norm_nfd(nome)
+
+
+@pytest.mark.parametrize("inicio, fim", [(0, 0x3000), (0xFB00, 0x10000)])
+def test_norm_cada_caractere(inicio, fim):
+    # Com letras e um acento combinante ao redor: a reordenação canônica também conta
+    for cp in range(inicio, fim):
+        if 0xD800 <= cp < 0xE000:
+            continue
+        s = f"a{chr(cp)}\u0301b"
+        assert norm(s) == _norm_nfd(s), hex(cp)
+
+
+def test_norm_series():
+    valores = pd.Series(NOMES * 3, index=range(100, 100 + len(NOMES) * 3), dtype=object)
+    obtido = norm_series(valores)
+    assert obtido.tolist() == valores.apply(_norm_nfd).tolist()
+    assert obtido.index.equals(valores.index)
+    assert norm_series(pd.Series([], dtype=object)).tolist() == []
@@ -0,0 +1,34 @@
+"""Lógica do TOP Preços independente da interface Streamlit.
+
+Tudo aqui pode ser importado, cronometrado e perfilado fora de um servidor
+Streamlit; ``app.py`` só cuida de cache, estado de sessão e renderização.
+"""
+from .alertas import ListaObservacao, avaliar_regras
+from .busca import SearchIndex
+from .canonico import atribuir_produtos, chaves_canonicas, ids_produtos
+from .catalogo import Catalogo, Recorte, resumir_por_produto
+from .dados import (
+    ErroPlanilha, compactar_colunas, escolher_colunas, ler_planilha, ler_planilha_padronizada, limpar_valores,
+    padronizar_colunas, preparar_csv, preparar_dataframe, preparar_fontes,
+)
+from .exportacao import chave_lista, exportar_csv, exportar_xlsx, generate_pdf, renderizar_pdf
+from .fonte import ConteudoGrandeDemais, FonteArquivo, FonteCSV, abrir_fonte, interpretar_fontes
+from .formatacao import cards_html, format_brl, format_brl_series
+from .historico import HistoricoPrecos, chaves_ofertas
+from .lista import agrupar_por_mercado, lista_dataframe, subtotais_por_mercado, sugerir_lista, total_lista
+from .otimizador import Cesta, otimizar_cesta
+from .precos import RelatorioPrecos, analisar_precos
+from .snapshot import ler_snapshot, salvar_snapshot
+from .texto import norm, norm_series
+
+
+__all__ = [
+    "ListaObservacao", "avaliar_regras", "SearchIndex", "atribuir_produtos", "chaves_canonicas", "ids_produtos",
+    "Catalogo", "Recorte", "resumir_por_produto", "ErroPlanilha", "compactar_colunas", "escolher_colunas",
+    "ler_planilha", "ler_planilha_padronizada", "limpar_valores", "padronizar_colunas", "preparar_csv",
+    "preparar_dataframe", "preparar_fontes", "chave_lista", "exportar_csv", "exportar_xlsx", "generate_pdf",
+    "renderizar_pdf", "ConteudoGrandeDemais", "FonteArquivo", "FonteCSV", "abrir_fonte", "interpretar_fontes",
+    "cards_html", "format_brl", "format_brl_series", "HistoricoPrecos", "chaves_ofertas", "agrupar_por_mercado",
+    "lista_dataframe", "subtotais_por_mercado", "sugerir_lista", "total_lista", "Cesta", "otimizar_cesta",
+    "RelatorioPrecos", "analisar_precos", "ler_snapshot", "salvar_snapshot", "norm", "norm_series",
+]
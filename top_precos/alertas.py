@@ -0,0 +1,190 @@
+"""Lista de observação: regras (produto, preço alvo, mercado opcional) avaliadas em lote a cada carga.
+
+As regras ficam num SQLite local, com o estado da última avaliação (menor
+preço e mercado mais barato). ``avaliar_regras`` cruza todas as regras com o
+catálogo de uma vez, pelo ``produto_norm`` (o menor preço é o do produto
+canônico); cada alerta disparado vai para uma caixa de saída local (JSON
+Lines), de onde outro processo pode enviá-lo.
+"""
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from .banco import conexao, criar_banco
+from .catalogo import Catalogo
+
+# Alertas mais recentes guardados em memória para a interface
+ALERTAS_RECENTES = 200
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS regras (
+    id             INTEGER PRIMARY KEY,
+    produto_norm   TEXT NOT NULL,
+    produto        TEXT,             -- nome para exibir
+    alvo           REAL,             -- preço alvo; NULL: só avisa quando o mercado mais barato muda
+    mercado        TEXT,             -- NULL: qualquer mercado
+    criada_em      INTEGER NOT NULL
+);
+-- Estado da última avaliação, à parte: regravar uma linha estreita custa bem menos que a regra inteira
+CREATE TABLE IF NOT EXISTS estado (
+    regra          INTEGER PRIMARY KEY,  -- regras.id
+    ultimo_valor   REAL,                 -- menor preço na última avaliação (NULL: fora da planilha)
+    ultimo_mercado TEXT                  -- mercado mais barato na última avaliação
+);
+"""
+
+_COLUNAS_ALERTAS = ["regra", "tipo", "produto", "produto_norm", "mercado", "valor", "anterior", "mercado_anterior",
+                    "alvo", "quando"]
+
+
+def _diferentes(antes: pd.Series, depois: pd.Series) -> np.ndarray:
+    """Linha a linha, ``antes`` != ``depois``, com nulo igual a nulo."""
+    return ~((antes == depois) | (antes.isna() & depois.isna())).to_numpy()
+
+
+def avaliar_regras(regras: pd.DataFrame, catalogo: Catalogo):
+    """(alertas disparados, estado novo de cada regra) para ``regras`` contra ``catalogo``.
+
+    Dois tipos de alerta: "alvo", quando o menor preço fica igual ou abaixo do
+    alvo e abaixo do da avaliação anterior (não repete a cada carga com o
+    mesmo preço); e "mercado", quando o mercado mais barato de uma regra sem
+    mercado fixo e sem alvo muda (com alvo, só o preço importa). O estado tem as colunas ``ultimo_valor`` e
+    ``ultimo_mercado``, na ordem de ``regras``.
+    """
+    valores, codigos = catalogo.menores_precos(regras["produto_norm"].to_numpy(dtype=object),
+                                               regras["mercado"].to_numpy(dtype=object))
+    mercados = np.append(np.array(catalogo.mercados, dtype=object), None)[codigos]
+    anterior = regras["ultimo_valor"].to_numpy(np.float64)
+    mercado_anterior = regras["ultimo_mercado"].to_numpy(dtype=object)
+    alvo = regras["alvo"].to_numpy(np.float64)
+
+    with np.errstate(invalid="ignore"):
+        no_alvo = (valores <= alvo) & ~(valores >= anterior)
+    trocou = (np.isnan(alvo) & pd.isna(regras["mercado"].to_numpy(dtype=object)) & (codigos >= 0)
+              & pd.notna(mercado_anterior) & (mercados != mercado_anterior))
+
+    i = np.concatenate((np.flatnonzero(no_alvo), np.flatnonzero(trocou)))
+    texto = {
+        "tipo": np.repeat(np.array(["alvo", "mercado"], dtype=object), (no_alvo.sum(), trocou.sum())),
+        "produto": regras["produto"].to_numpy(dtype=object)[i],
+        "produto_norm": regras["produto_norm"].to_numpy(dtype=object)[i],
+        "mercado": mercados[i],
+        "mercado_anterior": mercado_anterior[i],
+    }
+    # Texto fica object: a caixa de saída serializa object bem mais rápido que str (pyarrow)
+    alertas = pd.DataFrame({
+        "regra": regras["id"].to_numpy()[i], **{c: pd.Series(v, dtype=object) for c, v in texto.items()},
+        "valor": valores[i], "anterior": anterior[i], "alvo": alvo[i],
+    })[_COLUNAS_ALERTAS[:-1]]
+    estado = pd.DataFrame({"ultimo_valor": valores, "ultimo_mercado": mercados}, index=regras.index)
+    return alertas, estado
+
+
+class ListaObservacao:
+    """Regras de alerta em ``caminho`` (SQLite) e caixa de saída em ``saida`` (JSON Lines); seguro para várias threads.
+
+    As regras ficam em memória entre avaliações; só as que mudaram de estado
+    são regravadas.
+    """
+
+    def __init__(self, caminho: str, saida: str):
+        self.caminho = caminho
+        self.saida = saida
+        self._lock = threading.Lock()
+        self._regras = None  # DataFrame das regras, lido na primeira avaliação
+        self.recentes = pd.DataFrame(columns=_COLUNAS_ALERTAS)
+        os.makedirs(os.path.dirname(saida) or ".", exist_ok=True)
+        criar_banco(caminho, _ESQUEMA)
+        with conexao(caminho) as con:
+            # Regras gravadas quando o estado ficava na própria tabela regras
+            if "ultimo_valor" in {coluna[1] for coluna in con.execute("PRAGMA table_info(regras)")}:
+                con.execute("INSERT OR IGNORE INTO estado SELECT id, ultimo_valor, ultimo_mercado FROM regras"
+                            " WHERE ultimo_valor IS NOT NULL OR ultimo_mercado IS NOT NULL")
+                con.execute("UPDATE regras SET ultimo_valor = NULL, ultimo_mercado = NULL"
+                            " WHERE ultimo_valor IS NOT NULL OR ultimo_mercado IS NOT NULL")
+
+    def _carregar(self, con) -> pd.DataFrame:
+        if self._regras is None:
+            # Cursor direto: read_sql_query custa o dobro com 100 mil regras
+            cursor = con.execute("SELECT r.id, r.produto_norm, r.produto, r.alvo, r.mercado, e.ultimo_valor,"
+                                 " e.ultimo_mercado FROM regras r LEFT JOIN estado e ON e.regra = r.id ORDER BY r.id")
+            self._regras = pd.DataFrame.from_records(
+                cursor.fetchall(), columns=[c[0] for c in cursor.description],
+            ).astype({"id": "int64", "produto_norm": object, "produto": object, "alvo": "float64", "mercado": object,
+                      "ultimo_valor": "float64", "ultimo_mercado": object})
+        return self._regras
+
+    def regras(self) -> pd.DataFrame:
+        """Regras cadastradas, da mais antiga para a mais nova."""
+        with self._lock, conexao(self.caminho) as con:
+            return self._carregar(con).copy()
+
+    def adicionar(self, produto_norm: str, produto: str, alvo=None, mercado=None, quando=None) -> int:
+        """Cadastra uma regra e devolve o id; ``alvo`` None só observa o mercado mais barato."""
+        quando = int(time.time() if quando is None else quando)
+        with self._lock, conexao(self.caminho) as con:
+            cursor = con.execute(
+                "INSERT INTO regras (produto_norm, produto, alvo, mercado, criada_em) VALUES (?, ?, ?, ?, ?)",
+                (produto_norm, produto, alvo, mercado, quando),
+            )
+            if self._regras is not None:
+                nova = pd.DataFrame({"id": [cursor.lastrowid], "produto_norm": [produto_norm], "produto": [produto],
+                                     "alvo": [alvo], "mercado": [mercado], "ultimo_valor": [None],
+                                     "ultimo_mercado": [None]}, dtype=object).fillna(np.nan)
+                self._regras = pd.concat([self._regras, nova.astype(self._regras.dtypes.to_dict())],
+                                         ignore_index=True)
+            return cursor.lastrowid
+
+    def adicionar_varias(self, regras: pd.DataFrame, quando=None) -> int:
+        """Cadastra várias regras (colunas produto_norm, produto, alvo, mercado) de uma vez; devolve quantas."""
+        quando = int(time.time() if quando is None else quando)
+        linhas = regras[["produto_norm", "produto", "alvo", "mercado"]].astype(object)
+        with self._lock, conexao(self.caminho) as con:
+            con.executemany(
+                "INSERT INTO regras (produto_norm, produto, alvo, mercado, criada_em) VALUES (?, ?, ?, ?, ?)",
+                ((*(None if pd.isna(v) else v for v in linha), quando) for linha in linhas.itertuples(index=False)),
+            )
+            self._regras = None
+        return len(linhas)
+
+    def remover(self, regra: int):
+        with self._lock, conexao(self.caminho) as con:
+            con.execute("DELETE FROM regras WHERE id = ?", (int(regra),))
+            con.execute("DELETE FROM estado WHERE regra = ?", (int(regra),))
+            self._regras = None
+
+    def avaliar(self, catalogo: Catalogo, quando=None, ids=None) -> pd.DataFrame:
+        """Avalia as regras contra ``catalogo`` (só as de ``ids``, se dado): grava o estado
+        que mudou, manda os alertas para a caixa de saída e os devolve."""
+        quando = int(time.time() if quando is None else quando)
+        with self._lock, conexao(self.caminho) as con:
+            regras = self._carregar(con)
+            if ids is not None:
+                regras = regras[regras["id"].isin(ids)]
+            if regras.empty:
+                return self.recentes.iloc[:0]
+            alertas, estado = avaliar_regras(regras, catalogo)
+            alertas["quando"] = pd.Timestamp(quando, unit="s", tz="UTC").isoformat()
+
+            mudou = _diferentes(regras["ultimo_valor"], estado["ultimo_valor"])
+            mudou |= _diferentes(regras["ultimo_mercado"], estado["ultimo_mercado"])
+            if mudou.any():
+                novos = estado[mudou]
+                con.executemany(
+                    "INSERT OR REPLACE INTO estado (ultimo_valor, ultimo_mercado, regra) VALUES (?, ?, ?)",
+                    zip([None if v != v else v for v in novos["ultimo_valor"].tolist()],
+                        novos["ultimo_mercado"].tolist(), regras["id"].to_numpy()[mudou].tolist()),
+                )
+                self._regras.loc[novos.index, ["ultimo_valor", "ultimo_mercado"]] = novos
+
+            if not alertas.empty:
+                # Registros planos e aspas escapadas nos textos: '},{"regra":' só separa dois alertas,
+                # e a troca custa menos que o lines=True do pandas
+                texto = alertas.to_json(orient="records", force_ascii=False)
+                with open(self.saida, "a", encoding="utf-8") as f:
+                    f.write(texto[1:-1].replace('},{"regra":', '}\n{"regra":') + "\n")
+                self.recentes = pd.concat([alertas, self.recentes], ignore_index=True).head(ALERTAS_RECENTES)
+        return alertas
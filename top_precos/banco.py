@@ -0,0 +1,24 @@
+"""SQLite local do histórico de preços e dos alertas: uma conexão por operação, em modo WAL."""
+import os
+import sqlite3
+from contextlib import contextmanager
+
+
+@contextmanager
+def conexao(caminho: str):
+    """Conexão a ``caminho`` numa transação (commit na saída, rollback em erro) e fechada em seguida."""
+    con = sqlite3.connect(caminho, timeout=30)
+    try:
+        with con:
+            yield con
+    finally:
+        con.close()
+
+
+def criar_banco(caminho: str, esquema: str):
+    """Cria a pasta e as tabelas de ``esquema`` que ainda não existem, com o journal em WAL
+    (leituras de outras threads não esperam a gravação)."""
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    with conexao(caminho) as con:
+        con.execute("PRAGMA journal_mode=WAL")
+        con.executescript(esquema)
@@ -0,0 +1,181 @@
+"""Busca de produtos sobre ``produto_norm``: por substring e aproximada (trigramas por palavra)."""
+from collections import defaultdict
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+
+def trigramas_palavra(palavra: str) -> set:
+    """Trigramas de uma palavra com uma borda de cada lado: "arroz" → " ar", "arr", "rro", "roz", "oz ".
+
+    Sem a borda dupla (o "  a" de antes), duas letras iniciais em comum não bastam
+    para um termo curto parecer com qualquer palavra que comece igual.
+    """
+    palavra = f" {palavra} "
+    return {palavra[j:j + 3] for j in range(len(palavra) - 2)}
+
+
+class SearchIndex:
+    """Índice invertido de trigramas sobre ``produto_norm``.
+
+    Indexa só os nomes distintos (o mesmo produto aparece em vários mercados)
+    e devolve posições de linha (``iloc``) na ordem original do DataFrame, com
+    o mesmo resultado de ``str.contains(termo, regex=False)``.
+    ``search_fuzzy`` usa um segundo índice, de trigramas das palavras do
+    vocabulário, que tolera erros de digitação e palavras fora de ordem.
+    """
+
+    N = 3
+
+    def __init__(self, nomes: pd.Series):
+        if isinstance(nomes.dtype, pd.CategoricalDtype):
+            # Catálogo compactado: os códigos da categoria já são a fatoração
+            codes, uniques = nomes.cat.codes.to_numpy(np.int64), nomes.cat.categories.astype(str)
+        else:
+            codes, uniques = pd.factorize(nomes.astype(str).to_numpy())
+        self._nomes = list(uniques)
+        self._n_linhas = len(codes)
+        # Linhas agrupadas por nome: linhas do nome u = _ordem[_inicio[u]:_inicio[u + 1]]
+        self._ordem = np.argsort(codes, kind="stable")
+        self._inicio = np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=len(uniques)))))
+        self._codes = codes
+
+        postings = defaultdict(list)
+        for i, nome in enumerate(self._nomes):
+            for g in {nome[j:j + self.N] for j in range(len(nome) - self.N + 1)}:
+                postings[g].append(i)
+        self._postings = {g: np.array(ids, dtype=np.int64) for g, ids in postings.items()}
+        self._id_por_nome = {nome: i for i, nome in enumerate(self._nomes)}
+        self._indice_nomes = None  # pd.Index dos nomes, montado na primeira consulta em lote
+        self._montar_aproximado()
+
+    def _montar_aproximado(self):
+        """Índices CSR da busca aproximada: palavras do vocabulário com o trigrama g em
+        ``_fz_palavras[_fz_inicio[g]:_fz_inicio[g + 1]]`` e nomes com a palavra w em
+        ``_pl_nomes[_pl_inicio[w]:_pl_inicio[w + 1]]``."""
+        por_nome = [nome.split() for nome in self._nomes]
+        n_palavras = np.fromiter(map(len, por_nome), dtype=np.int64, count=len(por_nome))
+        palavras, vocabulario = pd.factorize(
+            np.fromiter(chain.from_iterable(por_nome), dtype=object, count=n_palavras.sum()))
+        dono = np.repeat(np.arange(len(por_nome), dtype=np.int64), n_palavras)
+
+        # Palavra → nomes que a contêm, sem repetição
+        pares = np.unique(palavras * len(por_nome) + dono)
+        palavra = pares // len(por_nome)
+        self._pl_nomes = pares % len(por_nome)
+        self._pl_inicio = np.concatenate(([0], np.cumsum(np.bincount(palavra, minlength=len(vocabulario)))))
+
+        # Trigrama → palavras do vocabulário: trigramas calculados uma vez por palavra distinta
+        por_palavra = [trigramas_palavra(p) for p in vocabulario]
+        self._fz_tamanho = np.fromiter(map(len, por_palavra), dtype=np.int64, count=len(por_palavra))
+        gram, grams = pd.factorize(
+            np.fromiter(chain.from_iterable(por_palavra), dtype=object, count=self._fz_tamanho.sum()))
+        palavra = np.repeat(np.arange(len(vocabulario), dtype=np.int64), self._fz_tamanho)
+        self._fz_gram = {g: i for i, g in enumerate(grams)}
+        self._fz_palavras = palavra[np.argsort(gram, kind="stable")]
+        self._fz_inicio = np.concatenate(([0], np.cumsum(np.bincount(gram, minlength=len(grams)))))
+
+    def _palavras_parecidas(self, palavra: str, minimo: float):
+        """(ids, similaridade) das palavras do vocabulário com Dice de trigramas >= ``minimo``."""
+        consulta = trigramas_palavra(palavra)
+        listas = [self._fz_palavras[self._fz_inicio[g]:self._fz_inicio[g + 1]]
+                  for g in (self._fz_gram.get(t) for t in consulta) if g is not None]
+        if not listas:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        comuns = np.bincount(np.concatenate(listas), minlength=len(self._fz_tamanho))
+        dice = 2 * comuns / (len(consulta) + self._fz_tamanho)
+        ids = np.flatnonzero(dice >= minimo)
+        return ids, dice[ids]
+
+    def __len__(self):
+        return self._n_linhas
+
+    @property
+    def n_nomes(self) -> int:
+        return len(self._nomes)
+
+    def name_id(self, nome: str):
+        """Id do nome distinto ``nome`` (já normalizado), ou None."""
+        return self._id_por_nome.get(nome)
+
+    def name_ids(self, nomes) -> np.ndarray:
+        """Id de cada nome em ``nomes`` (já normalizados), -1 para os que não existem: um join, sem laço."""
+        if self._indice_nomes is None:
+            self._indice_nomes = pd.Index(self._nomes, dtype=object)
+        return self._indice_nomes.get_indexer(pd.Index(nomes, dtype=object))
+
+    @property
+    def codes(self) -> np.ndarray:
+        """Id do nome distinto de cada linha."""
+        return self._codes
+
+    def _match_ids(self, termo: str) -> np.ndarray:
+        """Ids dos nomes distintos que contêm ``termo`` como substring."""
+        if len(termo) < self.N:
+            # Termos curtos: varre só os nomes distintos, não as linhas
+            return np.array([i for i, nome in enumerate(self._nomes) if termo in nome], dtype=np.int64)
+
+        grams = {termo[j:j + self.N] for j in range(len(termo) - self.N + 1)}
+        listas = [self._postings.get(g) for g in grams]
+        if any(l is None for l in listas):
+            return np.empty(0, dtype=np.int64)
+        listas.sort(key=len)
+        cand = listas[0]
+        for l in listas[1:]:
+            cand = np.intersect1d(cand, l, assume_unique=True)
+            if not len(cand):
+                return cand
+        # Trigramas em comum não garantem a substring: confirma nos candidatos
+        return np.array([i for i in cand if termo in self._nomes[i]], dtype=np.int64)
+
+    def _linhas(self, ids: np.ndarray) -> np.ndarray:
+        if len(ids) > 256:
+            mask = np.zeros(len(self._nomes), dtype=bool)
+            mask[ids] = True
+            return np.flatnonzero(mask[self._codes])
+        if not len(ids):
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate([self._ordem[self._inicio[i]:self._inicio[i + 1]] for i in ids]))
+
+    def search(self, termo: str) -> np.ndarray:
+        """Posições das linhas cujo nome contém ``termo`` (já normalizado)."""
+        if not termo:
+            return np.arange(self._n_linhas)
+        return self._linhas(self._match_ids(termo))
+
+    def search_names(self, termo: str) -> np.ndarray:
+        """Ids (crescentes) dos nomes distintos que contêm ``termo``."""
+        if not termo:
+            return np.arange(len(self._nomes))
+        return self._match_ids(termo)
+
+    def search_fuzzy(self, termo: str, minimo: float = 0.5):
+        """(ids, similaridade) dos nomes distintos parecidos com ``termo`` (já normalizado).
+
+        Cada palavra do termo vale pela palavra mais parecida do nome (Dice dos
+        trigramas, 0 abaixo de ``minimo``); a similaridade do nome é a média
+        entre as palavras do termo. Nomes que contêm ``termo`` como substring
+        valem 1. Ids crescentes.
+        """
+        palavras = termo.split()
+        if not palavras:
+            return np.arange(len(self._nomes)), np.ones(len(self._nomes))
+        soma = np.zeros(len(self._nomes))
+        for palavra in palavras:
+            ids, dice = self._palavras_parecidas(palavra, minimo)
+            if not len(ids):
+                continue
+            tamanhos = self._pl_inicio[ids + 1] - self._pl_inicio[ids]
+            nomes = np.concatenate([self._pl_nomes[self._pl_inicio[w]:self._pl_inicio[w + 1]] for w in ids])
+            melhor = np.zeros(len(self._nomes))
+            np.maximum.at(melhor, nomes, np.repeat(dice, tamanhos))
+            soma += melhor
+        similaridade = soma / len(palavras)
+        similaridade[self._match_ids(termo)] = 1.0
+        ids = np.flatnonzero(similaridade >= minimo)
+        return ids, similaridade[ids]
+
+    def linhas_dos_nomes(self, ids: np.ndarray) -> np.ndarray:
+        """Posições (crescentes) das linhas dos nomes distintos ``ids``."""
+        return self._linhas(ids)
@@ -0,0 +1,181 @@
+"""Produto canônico: o mesmo item com nomes diferentes em cada mercado vira um só ``produto_id``.
+
+"Arroz Tio João 5kg" e "ARROZ TIO JOAO TIPO 1 5 KG" têm a mesma chave: medida
+convertida para a unidade base (5000g), palavras sem descritores e em ordem
+alfabética; marcas escritas juntas ou separadas ("tiojoao", "tio joao") viram a
+forma separada; "tipo 1" é descartado, mas "tipo 2" continua na chave. Chaves
+que diferem por um erro de digitação em uma palavra longa se juntam depois,
+comparando cada chave só com as vizinhas em ordem alfabética dentro do mesmo
+bloco (mesma medida, mesmo nº de palavras, mesmos números), nunca todos os pares.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+# Muda junto com as regras da chave: snapshots gravados com outra versão têm outros produto_id
+VERSAO = 2
+# Palavras mais curtas que isso precisam ser idênticas: entre palavras curtas, uma letra
+# de diferença costuma ser outra palavra ("coca" x "cola", "prato" x "preto", "pilao" x "pilar")
+TAMANHO_MINIMO_ERRO = 6
+# Duas letras vizinhas invertidas raramente formam outra palavra: valem a partir de 5 letras ("feijao" x "fejiao")
+TAMANHO_MINIMO_INVERSAO = 5
+# Quantas vizinhas em ordem alfabética cada chave compara, em cada ordenação
+JANELA = 4
+
+_UNIDADES = {
+    **dict.fromkeys(("kg", "kgs", "quilo", "quilos"), ("g", 1000)),
+    **dict.fromkeys(("g", "gr", "grs", "grama", "gramas"), ("g", 1)),
+    **dict.fromkeys(("l", "lt", "lts", "litro", "litros"), ("ml", 1000)),
+    **dict.fromkeys(("ml",), ("ml", 1)),
+    **dict.fromkeys(("un", "und", "unid", "unidade", "unidades"), ("un", 1)),
+}
+_MEDIDA = re.compile(
+    r"(?<![a-z0-9])(?:(\d+)\s*x\s*)?(\d+(?:[.,]\d+)?)\s*(" + "|".join(sorted(_UNIDADES, key=len, reverse=True))
+    + r")(?![a-z0-9])"
+)
+_TIPO = re.compile(r"(?<![a-z0-9])tipo\s*(\d+)(?![a-z0-9])")
+_PALAVRA = re.compile(r"[a-z0-9]+")
+
+# Abreviações comuns nas planilhas → forma por extenso
+ABREVIACOES = {
+    "c": "com", "s": "sem", "trad": "tradicional", "integ": "integral", "desn": "desnatado",
+    "desnat": "desnatado", "semidesn": "semidesnatado", "refrig": "refrigerante", "pct": "pacote",
+}
+# Palavras que não distinguem um produto de outro
+DESCRITORES = frozenset({"de", "da", "do", "das", "dos", "e", "com", "em", "para", "pacote", "embalagem", "emb"})
+
+
+# Cada palavra já na forma final; descritores viram "" e são descartados
+_FORMA = {**ABREVIACOES, **dict.fromkeys(DESCRITORES, "")}
+
+
+def _medida(nome: str):
+    """(medida na unidade base, nome sem ela): "1,5 l" → "1500ml"; "2x500g" → "2x500g"."""
+    m = _MEDIDA.search(nome)
+    if m is None:
+        return "", nome
+    pacote, quantidade, unidade = m.groups()
+    base, fator = _UNIDADES[unidade]
+    medida = f"{float(quantidade.replace(',', '.')) * fator:g}{base}"
+    if pacote and int(pacote) > 1:
+        medida = f"{int(pacote)}x{medida}"
+    return medida, nome[:m.start()] + " " + nome[m.end():]
+
+
+def _separar(nomes):
+    """(medidas, palavras em ordem alfabética) de cada nome (já normalizado)."""
+    medidas, palavras = [], []
+    for nome in nomes:
+        medida, resto = _medida(nome)
+        if "tipo" in resto:
+            # "tipo 1" é o padrão e some (como o nome sem tipo); os outros são outro produto
+            resto = _TIPO.sub(lambda m: " " if int(m.group(1)) == 1 else f" tipo{int(m.group(1))} ", resto)
+        medidas.append(medida)
+        palavras.append([f for f in (_FORMA.get(p, p) for p in _PALAVRA.findall(resto)) if f])
+    # Palavra que aparece separada em outro nome ("tiojoao" e "tio joao") fica separada
+    juntas = {a + b: (a, b) for ps in palavras for a, b in zip(ps, ps[1:])}
+    vocabulario = {p for ps in palavras for p in ps}
+    juntas = {p: juntas[p] for p in vocabulario if p in juntas}
+    if juntas:
+        palavras = [[q for p in ps for q in juntas.get(p, (p,))] for ps in palavras]
+    for ps in palavras:
+        ps.sort()
+    return medidas, palavras
+
+
+def chaves_canonicas(nomes) -> list:
+    """Chave canônica de cada nome (já normalizado): palavras em ordem alfabética | medida."""
+    medidas, palavras = _separar(nomes)
+    return [f"{' '.join(ps)}|{medida}" for medida, ps in zip(medidas, palavras)]
+
+
+def _erro_de_digitacao(a: str, b: str) -> bool:
+    """``a`` e ``b`` diferem por uma letra trocada, sobrando, faltando ou duas vizinhas invertidas."""
+    if min(len(a), len(b)) < TAMANHO_MINIMO_INVERSAO or abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) < len(b):
+        a, b = b, a
+    i = next((i for i, (x, y) in enumerate(zip(a, b)) if x != y), len(b))
+    if a[i + 2:] == b[i + 2:] and len(a) == len(b) and a[i:i + 2] == b[i:i + 2][::-1]:
+        return True
+    if len(b) < TAMANHO_MINIMO_ERRO:
+        return False
+    return a[i + 1:] == (b[i:] if len(a) > len(b) else b[i + 1:])
+
+
+def _mesmo_produto(a: set, b: set) -> bool:
+    """Mesmas palavras, exceto uma de cada lado com erro de digitação."""
+    sobra_a, sobra_b = a - b, b - a
+    return len(sobra_a) == len(sobra_b) == 1 and _erro_de_digitacao(sobra_a.pop(), sobra_b.pop())
+
+
+def _componentes(n: int, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Menor índice do grupo de cada nó, com as arestas (a, b): propagação de rótulos."""
+    rotulo = np.arange(n)
+    while True:
+        menor = np.minimum(rotulo[a], rotulo[b])
+        novo = rotulo.copy()
+        np.minimum.at(novo, a, menor)
+        np.minimum.at(novo, b, menor)
+        novo = novo[novo]
+        if np.array_equal(novo, rotulo):
+            return rotulo
+        rotulo = novo
+
+
+def agrupar_chaves(chaves: np.ndarray, medidas: list, palavras: list) -> np.ndarray:
+    """Para cada chave canônica distinta (em ordem alfabética, com a medida e as
+    palavras dela), o índice da menor chave do seu grupo."""
+    blocos = [
+        f"{medida}|{len(ps)}|{' '.join(p for p in ps if p.isdigit())}"
+        for medida, ps in zip(medidas, palavras)
+    ]
+    bloco, _ = pd.factorize(np.array(blocos, dtype=object))
+    conjuntos = [set(ps) for ps in palavras]
+
+    # Vizinhança ordenada: pelas palavras (as chaves já estão em ordem alfabética) e pelas
+    # palavras de trás para a frente, para que um erro na primeira palavra não afaste as chaves
+    invertidas = np.array([" ".join(ps[::-1]) for ps in palavras], dtype=object)
+    posto_invertidas = np.empty(len(chaves), dtype=np.int64)
+    posto_invertidas[np.argsort(invertidas)] = np.arange(len(chaves))
+    a, b = [], []
+    for posto in (np.arange(len(chaves)), posto_invertidas):
+        ordem = np.lexsort((posto, bloco))
+        for k in range(1, JANELA + 1):
+            x, y = ordem[:-k], ordem[k:]
+            mesmo = bloco[x] == bloco[y]
+            a.append(x[mesmo])
+            b.append(y[mesmo])
+    a, b = np.concatenate(a), np.concatenate(b)
+    parecido = np.fromiter(
+        (_mesmo_produto(conjuntos[i], conjuntos[j]) for i, j in zip(a.tolist(), b.tolist())),
+        dtype=bool, count=len(a),
+    )
+    return _componentes(len(chaves), a[parecido], b[parecido])
+
+
+def ids_produtos(nomes) -> np.ndarray:
+    """``produto_id`` (int64) de cada nome distinto: hash da menor chave canônica do grupo."""
+    medidas, palavras = _separar(nomes)
+    chaves = np.array([f"{' '.join(ps)}|{medida}" for medida, ps in zip(medidas, palavras)], dtype=object)
+    codigo, unicas = pd.factorize(chaves, sort=True)
+    unicas = np.asarray(unicas, dtype=object)
+    if not len(unicas):
+        return np.empty(0, dtype=np.int64)
+    # Um nome de cada chave distinta fornece a medida e as palavras dela
+    primeiro = np.empty(len(unicas), dtype=np.int64)
+    primeiro[codigo[::-1]] = np.arange(len(codigo))[::-1]
+    grupo = agrupar_chaves(unicas, [medidas[i] for i in primeiro.tolist()], [palavras[i] for i in primeiro.tolist()])
+    ids = pd.util.hash_pandas_object(pd.Series(unicas[grupo], dtype=object), index=False).to_numpy().view(np.int64)
+    return ids[codigo]
+
+
+def atribuir_produtos(df: pd.DataFrame) -> pd.DataFrame:
+    """Coluna ``produto_id``: o produto canônico de cada linha, calculado uma vez por nome distinto."""
+    nomes = df["produto_norm"]
+    if isinstance(nomes.dtype, pd.CategoricalDtype):
+        codes, uniques = nomes.cat.codes.to_numpy(np.int64), nomes.cat.categories.to_numpy(dtype=object)
+    else:
+        codes, uniques = pd.factorize(nomes.astype(str).to_numpy(dtype=object))
+    return df.assign(produto_id=ids_produtos(uniques.tolist()).take(codes) if len(uniques) else np.int64(0))
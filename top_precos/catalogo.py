@@ -0,0 +1,220 @@
+"""Catálogo preparado: índice de busca, resumos e vetores de preço por mercado."""
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .busca import SearchIndex
+from .canonico import atribuir_produtos
+from .dados import atribuir_ids
+
+# Similaridade mínima para aparecer: de cada palavra da busca com a palavra mais parecida do nome
+# (Dice dos trigramas) e da média entre as palavras da busca
+SIMILARIDADE_MINIMA = 0.5
+# Resultados de busca guardados por catálogo (termo, modo); um termo curto pode ocupar 4 bytes por linha
+RECORTES_EM_CACHE = 32
+
+
+def resumir_por_produto(df: pd.DataFrame, codes: np.ndarray):
+    """Menor preço, mercado mais barato, diferença e nº de mercados por produto.
+
+    ``codes`` é o id do produto de cada linha (o nome distinto, ``SearchIndex.codes``,
+    ou o produto canônico, ``produto_id`` fatorado).
+    Devolve o resumo na ordem de exibição do catálogo e, para cada id, a sua
+    posição no resumo.
+    """
+    valores = df["Valor"].to_numpy(np.float64)
+    mercados = df["Mercado"].cat.codes.to_numpy(np.int64)
+
+    # Ordena por (nome, preço): a primeira linha de cada grupo é a mais barata
+    ordem = np.lexsort((valores, codes))
+    codes_ord = codes[ordem]
+    inicio = np.flatnonzero(np.r_[True, codes_ord[1:] != codes_ord[:-1]])
+    ids = codes_ord[inicio]
+    mais_barata = ordem[inicio]
+    maior = np.maximum.reduceat(valores[ordem], inicio)
+
+    n_mercados = mercados.max() + 1
+    pares = np.unique(codes * n_mercados + mercados)
+    qtd_mercados = np.bincount(pares // n_mercados, minlength=ids.max() + 1)[ids]
+
+    # O catálogo já está em ordem de exibição: basta seguir a posição da linha mais barata
+    exib = np.argsort(mais_barata, kind="stable")
+    resumo = df.iloc[mais_barata[exib]][["Produto", "Mercado", "Valor", "produto_norm"]].reset_index(drop=True)
+    resumo["Maior"] = maior[exib]
+    resumo["Diferenca"] = resumo["Maior"] - resumo["Valor"]
+    resumo["Mercados"] = qtd_mercados[exib]
+
+    linha_resumo = np.full(ids.max() + 1, -1, dtype=np.int64)
+    linha_resumo[ids[exib]] = np.arange(len(exib))
+    return resumo, linha_resumo
+
+
+class Recorte:
+    """Linhas de um DataFrame compartilhado, guardadas só como posições.
+
+    O catálogo é um só por processo; cada sessão guarda o seu resultado como
+    um vetor de posições (``None``: todas as linhas, na ordem do DataFrame) e
+    materializa apenas a fatia que vai exibir ou exportar.
+    """
+
+    __slots__ = ("df", "posicoes")
+
+    def __init__(self, df: pd.DataFrame, posicoes=None):
+        self.df = df
+        # int32 basta para qualquer planilha real e é metade do que cada sessão guarda
+        self.posicoes = None if posicoes is None else np.asarray(posicoes, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.df) if self.posicoes is None else len(self.posicoes)
+
+    @property
+    def empty(self) -> bool:
+        return len(self) == 0
+
+    def fatia(self, inicio: int, fim: int) -> pd.DataFrame:
+        """Linhas ``inicio:fim`` do recorte (ex.: uma página de cards)."""
+        if self.posicoes is None:
+            return self.df.iloc[inicio:fim]
+        return self.df.iloc[self.posicoes[inicio:fim]]
+
+    def materializar(self) -> pd.DataFrame:
+        """O recorte inteiro como DataFrame (só para exportar)."""
+        return self.df if self.posicoes is None else self.df.iloc[self.posicoes]
+
+
+class Catalogo:
+    """Artefatos derivados de uma versão da planilha, montados uma vez por carga."""
+
+    def __init__(self, df: pd.DataFrame):
+        # Snapshots gravados antes das colunas existirem
+        if "produto_id" not in df.columns:
+            df = atribuir_produtos(df)
+        if "id" not in df.columns:
+            df = atribuir_ids(df)
+        self.df = df
+        self._por_id = pd.Index(df["id"].to_numpy())
+        self.indice = SearchIndex(df["produto_norm"])
+
+        # Produto canônico: o mesmo item com nomes diferentes em cada mercado é comparado junto
+        produtos = pd.factorize(df["produto_id"].to_numpy())[0]
+        self._produto_do_nome = np.full(self.indice.n_nomes, -1, dtype=np.int64)
+        self._produto_do_nome[self.indice.codes] = produtos
+        self.resumo, self._linha_resumo = resumir_por_produto(df, produtos)
+        self.mercados = list(df["Mercado"].cat.categories)
+
+        # Menor preço de cada (produto, mercado), agrupado por produto: vetores do otimizador
+        n_merc = len(self.mercados)
+        chaves = produtos * n_merc + df["Mercado"].cat.codes.to_numpy(np.int64)
+        ordem = np.lexsort((df["Valor"].to_numpy(), chaves))
+        chaves_ord = chaves[ordem]
+        primeira = np.r_[True, chaves_ord[1:] != chaves_ord[:-1]]
+        self._pm_chave = chaves_ord[primeira]
+        self._pm_linha = ordem[primeira]
+        self._pm_mercado = self._pm_chave % n_merc
+        self._pm_inicio = np.searchsorted(chaves_ord[primeira] // n_merc, np.arange(produtos.max() + 2))
+
+        # O mesmo termo nas duas abas (e em outras sessões) é filtrado uma vez só
+        self._posicoes_recorte = lru_cache(maxsize=RECORTES_EM_CACHE)(self._calcular_recorte)
+
+    def buscar(self, termo: str) -> np.ndarray:
+        """Posições das linhas parecidas com ``termo`` (já normalizado): mais similares
+        primeiro e, entre as igualmente similares, as mais baratas.
+
+        Termos com menos de três letras seguem a busca por substring, na ordem de exibição.
+        """
+        if len(termo) < SearchIndex.N:
+            return self.indice.search(termo)
+        ids, similaridade = self.indice.search_fuzzy(termo, SIMILARIDADE_MINIMA)
+        linhas = self.indice.linhas_dos_nomes(ids)
+        por_nome = np.zeros(self.indice.n_nomes)
+        por_nome[ids] = similaridade
+        # lexsort é estável: empates de similaridade e preço mantêm a ordem de exibição
+        return linhas[np.lexsort((self.df["Valor"].to_numpy()[linhas], -por_nome[self.indice.codes[linhas]]))]
+
+    def linhas_menor_preco(self, termo: str):
+        """Posições no resumo dos produtos parecidos com ``termo`` (já normalizado),
+        na ordem de ``buscar``; None quando não há termo (o resumo inteiro).
+
+        Um produto canônico vale pelo mais parecido dos seus nomes.
+        """
+        if not termo:
+            return None
+        if len(termo) < SearchIndex.N:
+            produtos = self._produto_do_nome[self.indice.search_names(termo)]
+            return np.sort(self._linha_resumo[np.unique(produtos[produtos >= 0])])
+        ids, similaridade = self.indice.search_fuzzy(termo, SIMILARIDADE_MINIMA)
+        produtos = self._produto_do_nome[ids]
+        similaridade, produtos = similaridade[produtos >= 0], produtos[produtos >= 0]
+        ordem = np.lexsort((-similaridade, produtos))
+        primeiro = ordem[np.r_[True, produtos[ordem][1:] != produtos[ordem][:-1]]]
+        linhas = self._linha_resumo[produtos[primeiro]]
+        return linhas[np.lexsort((self.resumo["Valor"].to_numpy()[linhas], -similaridade[primeiro]))]
+
+    def _calcular_recorte(self, termo: str, menor_preco: bool):
+        if menor_preco:
+            posicoes = self.linhas_menor_preco(termo)
+        else:
+            posicoes = self.buscar(termo) if termo else None
+        if posicoes is not None:
+            # Compartilhado entre sessões: int32 (o que o Recorte guarda) e só leitura
+            posicoes = posicoes.astype(np.int32)
+            posicoes.flags.writeable = False
+        return posicoes
+
+    def recorte(self, termo: str, menor_preco: bool = False) -> "Recorte":
+        """Resultado da busca como ``Recorte``: posições sobre o catálogo (ou o resumo), sem copiar linhas.
+
+        As posições de cada (termo, modo) ficam em cache no catálogo, compartilhadas entre abas e sessões.
+        """
+        return Recorte(self.resumo if menor_preco else self.df, self._posicoes_recorte(termo, menor_preco))
+
+    def posicoes(self, ids) -> np.ndarray:
+        """Posição (iloc) de cada id em ``df``; -1 para ids que não estão no catálogo."""
+        return self._por_id.get_indexer(np.asarray(ids, dtype=np.int64))
+
+    def precos_por_mercado(self, nome: str):
+        """Menor preço do produto canônico de ``nome`` (normalizado) em cada mercado
+        (inf onde não há) e a linha do catálogo correspondente (-1), ou None se o
+        produto não existe."""
+        u = self.indice.name_id(nome)
+        if u is None or self._produto_do_nome[u] < 0:
+            return None
+        p = self._produto_do_nome[u]
+        ini, fim = self._pm_inicio[p], self._pm_inicio[p + 1]
+        precos = np.full(len(self.mercados), np.inf)
+        linhas = np.full(len(self.mercados), -1, dtype=np.int64)
+        linhas[self._pm_mercado[ini:fim]] = self._pm_linha[ini:fim]
+        precos[self._pm_mercado[ini:fim]] = self.df["Valor"].to_numpy()[self._pm_linha[ini:fim]]
+        return precos, linhas
+
+    def menores_precos(self, nomes, mercados=None):
+        """Menor preço (NaN onde não há) e mercado (código em ``mercados``; -1) do produto
+        canônico de cada nome (normalizado), em qualquer mercado ou no mercado pedido.
+
+        Em lote: ``mercados`` traz um mercado por nome (None: qualquer um), e cada
+        par é uma busca binária sobre os vetores do otimizador, sem laço por nome.
+        """
+        u = self.indice.name_ids(nomes)
+        produto = np.where(u >= 0, self._produto_do_nome[u], -1)
+        valores = np.full(len(u), np.nan)
+        mercado = np.full(len(u), -1, dtype=np.int64)
+
+        # Em qualquer mercado: a linha do produto no resumo
+        if mercados is None:
+            qualquer = produto >= 0
+        else:
+            codigo = pd.Index(self.mercados, dtype=object).get_indexer(pd.Index(mercados, dtype=object))
+            sem_mercado = pd.isna(np.asarray(mercados, dtype=object))
+            qualquer = (produto >= 0) & sem_mercado
+            # No mercado pedido: (produto, mercado) em _pm_chave
+            alvo = np.flatnonzero((produto >= 0) & ~sem_mercado & (codigo >= 0))
+            chave = produto[alvo] * len(self.mercados) + codigo[alvo]
+            pos = np.minimum(np.searchsorted(self._pm_chave, chave), len(self._pm_chave) - 1)
+            achou = self._pm_chave[pos] == chave
+            valores[alvo[achou]] = self.df["Valor"].to_numpy()[self._pm_linha[pos[achou]]]
+            mercado[alvo[achou]] = codigo[alvo[achou]]
+        linha = self._linha_resumo[produto[qualquer]]
+        valores[qualquer] = self.resumo["Valor"].to_numpy()[linha]
+        mercado[qualquer] = self.resumo["Mercado"].cat.codes.to_numpy(np.int64)[linha]
+        return valores, mercado
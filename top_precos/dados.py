@@ -0,0 +1,180 @@
+"""Leitura e padronização da planilha de preços."""
+import io
+
+import numpy as np
+import pandas as pd
+
+from .canonico import atribuir_produtos
+from .precos import analisar_precos, decimal_dos_votos, juntar_relatorios, votos_decimal
+from .texto import norm_series
+
+
+class ErroPlanilha(ValueError):
+    """A planilha não tem o formato esperado."""
+
+
+# Nomes aceitos para cada coluna (comparados em minúsculas), em ordem de preferência
+COLUNAS_PRODUTO = ("produto", "item", "descrição", "descricao", "nome")
+COLUNAS_MERCADO = ("mercado", "supermercado", "fornecedor", "loja")
+COLUNAS_VALOR = ("valor unitário", "valor unitario", "preço", "preco", "valor", "price")
+
+
+def ler_planilha(conteudo: bytes) -> pd.DataFrame:
+    """CSV bruto (bytes) → DataFrame sem tratamento."""
+    return pd.read_csv(io.BytesIO(conteudo))
+
+
+def escolher_colunas(colunas) -> tuple:
+    """Nomes reais das colunas de produto, mercado e valor em ``colunas``."""
+    colmap = {str(c).strip().lower(): c for c in colunas}
+
+    def pick(*ops):
+        for o in ops:
+            if o in colmap:
+                return colmap[o]
+        return None
+
+    c_prod = pick(*COLUNAS_PRODUTO)
+    c_mkt = pick(*COLUNAS_MERCADO)
+    c_val = pick(*COLUNAS_VALOR)
+    
+    if not all([c_prod, c_mkt, c_val]):
+        raise ErroPlanilha("Colunas esperadas não encontradas. Esperado: Produto, Mercado, Valor")
+    return c_prod, c_mkt, c_val
+
+
+def limpar_valores(valores: pd.Series) -> pd.Series:
+    """Texto monetário ("R$ 1.234,56", "1,234.56") → float; NaN no que não é preço (``analisar_precos``)."""
+    return pd.Series(analisar_precos(valores, negativos=False)[0], index=valores.index)
+
+
+def padronizar_colunas(df: pd.DataFrame) -> pd.DataFrame:
+    if df.empty:
+        return df
+        
+    c_prod, c_mkt, c_val = escolher_colunas(df.columns)
+
+    df = df[[c_prod, c_mkt, c_val]].copy()
+    df.columns = ["Produto", "Mercado", "Valor"]
+    
+    # Limpa valores monetários
+    df["Valor"] = limpar_valores(df["Valor"])
+    df = df.dropna(subset=["Produto", "Mercado", "Valor"])
+    
+    df["produto_norm"] = norm_series(df["Produto"])
+    return df
+
+
+def _ler_partes(conteudo: bytes, linhas_por_parte: int):
+    """(planilha padronizada, ``RelatorioPrecos`` da coluna de valor)."""
+    fonte = io.BytesIO(conteudo)
+    c_prod, c_mkt, c_val = escolher_colunas(pd.read_csv(fonte, nrows=0).columns)
+    fonte.seek(0)
+
+    partes, votos = [], {",": 0, ".": 0}
+    for parte in pd.read_csv(fonte, usecols=[c_prod, c_mkt, c_val], dtype=str, chunksize=linhas_por_parte):
+        parte = parte[[c_prod, c_mkt, c_val]]
+        parte.columns = ["Produto", "Mercado", "Valor"]
+        for sep, n in votos_decimal(parte["Valor"]).items():
+            votos[sep] += n
+        partes.append(parte)
+
+    # O separador é da coluna inteira: só depois de todas as partes votarem alguma é convertida,
+    # e o resultado não depende do tamanho das partes
+    decimal = decimal_dos_votos(votos)
+    relatorios = []
+    for i, parte in enumerate(partes):
+        valores, relatorio = analisar_precos(parte["Valor"], decimal, negativos=False)
+        relatorios.append(relatorio)
+        partes[i] = parte.assign(Valor=valores).dropna()
+    relatorio = juntar_relatorios(relatorios)._replace(decidido=any(votos.values()))
+    if not partes:
+        return pd.DataFrame(columns=["Produto", "Mercado", "Valor", "produto_norm"]), relatorio
+    df = pd.concat(partes)
+    del partes
+    df["produto_norm"] = norm_series(df["Produto"])
+    return df, relatorio
+
+
+def ler_planilha_padronizada(conteudo: bytes, linhas_por_parte: int = 100_000) -> pd.DataFrame:
+    """``padronizar_colunas(ler_planilha(conteudo))`` sem materializar a planilha bruta.
+
+    Lê só as três colunas usadas, em partes de ``linhas_por_parte`` linhas:
+    nunca existe a planilha bruta inteira, só as três colunas. O separador
+    decimal é votado pela coluna toda antes de converter as partes.
+    """
+    return _ler_partes(conteudo, linhas_por_parte)[0]
+
+
+def compactar_colunas(df: pd.DataFrame) -> pd.DataFrame:
+    """Texto repetido vira categoria (códigos inteiros + dicionário) e Valor, float64."""
+    tipos = {
+        "Produto": "category",
+        "Mercado": "category",
+        "produto_norm": "category",
+        "Valor": "float64",
+    }
+    if "Fonte" in df.columns:
+        tipos["Fonte"] = "category"
+    return df.astype(tipos)
+
+
+def atribuir_ids(df: pd.DataFrame) -> pd.DataFrame:
+    """Coluna ``id``: identidade estável de cada oferta (int64).
+
+    Hash de (produto_norm, Mercado[, Fonte]) mais a ocorrência do par, para
+    ofertas repetidas. Não depende da posição da linha nem do preço: a mesma
+    oferta mantém o id quando a planilha é atualizada.
+    """
+    chave = ["produto_norm", "Mercado"] + (["Fonte"] if "Fonte" in df.columns else [])
+    partes = df[chave].assign(ocorrencia=df.groupby(chave, observed=True, sort=False).cumcount())
+    ids = pd.util.hash_pandas_object(partes, index=False).to_numpy().view(np.int64)
+    return df.assign(id=ids)
+
+
+def _ordenar_e_compactar(df: pd.DataFrame) -> pd.DataFrame:
+    if df.empty:
+        return df
+    # Ordem de exibição fixada uma vez; as buscas preservam essa ordem. produto_id sai junto
+    # com o catálogo: fica no snapshot e no cache da versão, sem reagrupar a cada sessão
+    return atribuir_ids(atribuir_produtos(compactar_colunas(df.sort_values(["Produto", "Valor"], kind="stable"))))
+
+
+def preparar_dataframe(df_raw: pd.DataFrame) -> pd.DataFrame:
+    """Planilha bruta → catálogo padronizado, com produto canônico, em ordem de exibição e compactado."""
+    return _ordenar_e_compactar(padronizar_colunas(df_raw))
+
+
+def preparar_csv(conteudo: bytes, linhas_por_parte: int = 100_000) -> pd.DataFrame:
+    """CSV (bytes) → o mesmo catálogo de ``preparar_dataframe``, lido em partes."""
+    return _ordenar_e_compactar(ler_planilha_padronizada(conteudo, linhas_por_parte))
+
+
+def preparar_fontes(conteudos: dict, linhas_por_parte: int = 100_000):
+    """{nome da fonte: CSV em bytes} → (catálogo único com a coluna Fonte, erros por fonte,
+    ``RelatorioPrecos`` por fonte).
+
+    Cada fonte é padronizada sozinha, com os próprios nomes de coluna e o
+    próprio separador decimal; uma fonte ilegível fica de fora e aparece em
+    ``erros`` sem derrubar as outras. Os rótulos das linhas seguem únicos entre
+    fontes (deslocados em sequência); os dos preços rejeitados, os do CSV.
+    """
+    partes, erros, precos = [], {}, {}
+    deslocamento = 0
+    for nome, conteudo in conteudos.items():
+        try:
+            df, precos[nome] = _ler_partes(conteudo, linhas_por_parte)
+        except ValueError as e:  # ErroPlanilha, CSV vazio ou malformado, encoding
+            erros[nome] = e
+            continue
+        if df.empty:
+            continue
+        df.index = df.index + deslocamento
+        deslocamento = int(df.index.max()) + 1
+        partes.append(df.assign(Fonte=nome))
+
+    if not partes:
+        if erros and all(isinstance(e, ErroPlanilha) for e in erros.values()):
+            raise next(iter(erros.values()))
+        return pd.DataFrame(columns=["Produto", "Mercado", "Valor", "produto_norm", "Fonte"]), erros, precos
+    return _ordenar_e_compactar(pd.concat(partes)), erros, precos
@@ -0,0 +1,176 @@
+"""Instrumentação leve por etapa: tempos, percentis móveis, contadores e linhas.
+
+Desligada (padrão), cada ``METRICAS.etapa(...)`` devolve um context manager
+vazio compartilhado e ``contar`` retorna na hora. Liga para o processo todo com
+``TOP_PRECOS_DIAGNOSTICO=1`` ou só para a rodada atual via ``iniciar_rodada(True)``;
+o rerun só de um fragmento abre a própria rodada com ``rodada_fragmento``.
+"""
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+logger = logging.getLogger("top_precos.diagnostico")
+
+_RODADA = contextvars.ContextVar("top_precos_rodada", default=None)
+
+
+class _Nada:
+    """Etapa quando a instrumentação está desligada."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def linhas(self, n):
+        pass
+
+
+_NADA = _Nada()
+
+
+class _Etapa:
+    __slots__ = ("metricas", "rodada", "nome", "n_linhas", "t0")
+
+    def __init__(self, metricas, rodada, nome, linhas):
+        self.metricas, self.rodada, self.nome, self.n_linhas = metricas, rodada, nome, linhas
+
+    def linhas(self, n):
+        self.n_linhas = n
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metricas._registrar(self.nome, (time.perf_counter() - self.t0) * 1e3, self.n_linhas, self.rodada)
+        return False
+
+
+class Rodada:
+    """O que aconteceu em uma execução do script (um rerun de uma sessão)."""
+
+    def __init__(self, fragmento: str = None):
+        self.inicio = time.perf_counter()
+        self.fragmento = fragmento  # nome do fragmento, num rerun só dele
+        self.etapas = []
+        self.contadores = Counter()
+
+    def linha_log(self) -> str:
+        etapas = {}
+        for nome, ms, linhas in self.etapas:
+            atual = etapas.setdefault(nome, {"ms": 0.0, "n": 0})
+            atual["ms"] = round(atual["ms"] + ms, 3)
+            atual["n"] += 1
+            if linhas is not None:
+                atual["linhas"] = linhas
+        return json.dumps({
+            "evento": "rerun",
+            **({"fragmento": self.fragmento} if self.fragmento else {}),
+            "ms": round((time.perf_counter() - self.inicio) * 1e3, 3),
+            "etapas": etapas,
+            "contadores": dict(self.contadores),
+        }, ensure_ascii=False)
+
+
+class Metricas:
+    """Tempos por etapa com janela móvel, contadores e linhas processadas."""
+
+    def __init__(self, janela: int = 200, ativo: bool = False):
+        self.ativo = ativo
+        self._lock = threading.Lock()
+        self._tempos = defaultdict(lambda: deque(maxlen=janela))
+        self._linhas = {}
+        self._contadores = Counter()
+
+    def etapa(self, nome: str, linhas=None):
+        """``with METRICAS.etapa("busca") as e: ...; e.linhas(n)``"""
+        rodada = _RODADA.get()
+        if rodada is None and not self.ativo:
+            return _NADA
+        return _Etapa(self, rodada, nome, linhas)
+
+    def contar(self, nome: str, n: int = 1):
+        rodada = _RODADA.get()
+        if rodada is None and not self.ativo:
+            return
+        with self._lock:
+            self._contadores[nome] += n
+        if rodada is not None:
+            rodada.contadores[nome] += n
+
+    def _registrar(self, nome, ms, linhas, rodada):
+        with self._lock:
+            self._tempos[nome].append(ms)
+            if linhas is not None:
+                self._linhas[nome] = linhas
+        if rodada is not None:
+            rodada.etapas.append((nome, ms, linhas))
+
+    def resumo(self) -> list:
+        """Uma linha por etapa: execuções na janela, último tempo, p50, p95 e linhas."""
+        with self._lock:
+            tempos = {nome: np.array(t) for nome, t in self._tempos.items()}
+            linhas = dict(self._linhas)
+        return [
+            {
+                "etapa": nome,
+                "n": len(t),
+                "ultimo_ms": round(float(t[-1]), 2),
+                "p50_ms": round(float(np.percentile(t, 50)), 2),
+                "p95_ms": round(float(np.percentile(t, 95)), 2),
+                "linhas": linhas.get(nome),
+            }
+            for nome, t in sorted(tempos.items())
+        ]
+
+    def contadores(self) -> dict:
+        with self._lock:
+            return dict(self._contadores)
+
+
+METRICAS = Metricas(ativo=os.environ.get("TOP_PRECOS_DIAGNOSTICO") == "1")
+
+
+def iniciar_rodada(ativa: bool, fragmento: str = None):
+    """Abre a rodada do rerun atual (ou limpa a anterior, se ``ativa`` for False)."""
+    rodada = Rodada(fragmento) if ativa or METRICAS.ativo else None
+    _RODADA.set(rodada)
+    return rodada
+
+
+def encerrar_rodada(rodada):
+    """Fecha a rodada e emite a linha de log estruturada."""
+    _RODADA.set(None)
+    if rodada is None:
+        return
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    logger.info(rodada.linha_log())
+
+
+@contextmanager
+def rodada_fragmento(ativa: bool, nome: str):
+    """Rodada de um rerun só do fragmento ``nome``, que não passa pelo topo do script;
+    dentro de uma execução completa, as etapas seguem na rodada dela."""
+    atual = _RODADA.get()
+    if atual is not None:
+        yield atual
+        return
+    rodada = iniciar_rodada(ativa, nome)
+    try:
+        yield rodada
+    finally:
+        encerrar_rodada(rodada)
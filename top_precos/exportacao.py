@@ -0,0 +1,242 @@
+"""Exportação da lista de compras."""
+import io
+from datetime import datetime
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from .formatacao import format_brl
+from .lista import agrupar_por_mercado, total_lista
+
+# Linhas de produto por tabela: cada pedaço cabe em uma página e repete o cabeçalho
+LINHAS_POR_TABELA = 30
+
+# Estilos montados uma vez por processo (só são lidos durante a renderização)
+_STYLES = getSampleStyleSheet()
+_TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_STYLES['Heading1'],
+    fontSize=20,
+    textColor=colors.HexColor('#4A90A4'),
+    alignment=1,  # CENTER
+    spaceAfter=20
+)
+_CELL_STYLE = ParagraphStyle('CelulaProduto', parent=_STYLES['Normal'], fontSize=10, leading=12, alignment=1)
+
+_HEADER = ['Produto', 'Qtd', 'Valor Unit.', 'Subtotal']
+# Larguras fixas: os pedaços de uma mesma tabela ficam alinhados entre si
+_COL_WIDTHS = [238, 50, 90, 90]
+_PADDING = 12
+
+_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4A90A4')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+# Último pedaço: a linha final é o total do mercado
+_TOTAL_TABLE_STYLE = TableStyle(list(_TABLE_STYLE.getCommands()) + [
+    ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#5BA05B')),
+    ('TEXTCOLOR', (0, -1), (-1, -1), colors.whitesmoke),
+    ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+])
+
+
+def _celula_produto(nome):
+    """Nome curto vai como texto simples; só o que não cabe na coluna vira Paragraph (quebra linha)."""
+    nome = str(nome)
+    if stringWidth(nome, 'Helvetica', 10) <= _COL_WIDTHS[0] - _PADDING:
+        return nome
+    return Paragraph(escape(nome), _CELL_STYLE)
+
+
+def _tabelas_mercado(itens) -> list:
+    """Tabelas de um mercado em pedaços de ``LINHAS_POR_TABELA`` linhas, com o total no último."""
+    linhas = []
+    total_fornecedor = 0
+    for _, produto in itens:
+        subtotal = produto['Valor'] * produto['Quantidade']
+        total_fornecedor += subtotal
+        linhas.append([
+            _celula_produto(produto['Produto']),
+            str(produto['Quantidade']),
+            format_brl(produto['Valor']),
+            format_brl(subtotal)
+        ])
+    total = ['', '', 'Total:', format_brl(total_fornecedor)]
+
+    tabelas = []
+    for inicio in range(0, len(linhas), LINHAS_POR_TABELA):
+        pedaco = [_HEADER] + linhas[inicio:inicio + LINHAS_POR_TABELA]
+        ultimo = inicio + LINHAS_POR_TABELA >= len(linhas)
+        if ultimo:
+            pedaco.append(total)
+        # repeatRows: se ainda assim o pedaço quebrar de página, o cabeçalho se repete
+        tabelas.append(Table(pedaco, colWidths=_COL_WIDTHS, repeatRows=1,
+                             style=_TOTAL_TABLE_STYLE if ultimo else _TABLE_STYLE))
+    return tabelas
+
+
+def chave_lista(selected_products: dict) -> tuple:
+    """Conteúdo da lista como tupla imutável: o que de fato aparece no PDF."""
+    return tuple(
+        (item['Produto'], item['Mercado'], float(item['Valor']), int(item['Quantidade']))
+        for item in selected_products.values()
+    )
+
+
+@lru_cache(maxsize=16)
+def renderizar_pdf(itens: tuple, data: str) -> bytes:
+    """PDF da lista ``itens`` (ver ``chave_lista``), memoizado pelo conteúdo e pela data."""
+    selected_products = {
+        i: {'Produto': produto, 'Mercado': mercado, 'Valor': valor, 'Quantidade': quantidade}
+        for i, (produto, mercado, valor, quantidade) in enumerate(itens)
+    }
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+
+    # Elementos do PDF
+    elements = []
+
+    # Título
+    title = Paragraph("TOP Preços - Lista de Compras", _TITLE_STYLE)
+    elements.append(title)
+
+    # Data
+    date = Paragraph(f"Data: {data}", _STYLES['Normal'])
+    elements.append(date)
+    elements.append(Spacer(1, 20))
+
+    # Agrupa por fornecedor
+    produtos_por_fornecedor = agrupar_por_mercado(selected_products)
+    total_geral = total_lista(selected_products)
+
+    # Para cada fornecedor
+    for fornecedor, itens_mercado in produtos_por_fornecedor.items():
+        # Header do fornecedor
+        fornecedor_title = Paragraph(f"<b>{fornecedor}</b>", _STYLES['Heading2'])
+        elements.append(fornecedor_title)
+        elements.extend(_tabelas_mercado(itens_mercado))
+        elements.append(Spacer(1, 20))
+
+    # Total geral
+    total_para = Paragraph(f"<b>TOTAL GERAL: {format_brl(total_geral)}</b>", _STYLES['Heading2'])
+    elements.append(total_para)
+
+    # Gera PDF
+    doc.build(elements)
+    return buffer.getvalue()
+
+
+def generate_pdf(selected_products):
+    """Gera PDF com lista de compras
+
+    Listas iguais no mesmo minuto reaproveitam o PDF já gerado.
+    """
+    data = datetime.now().strftime('%d/%m/%Y %H:%M')
+    return io.BytesIO(renderizar_pdf(chave_lista(selected_products), data))
+
+
+# Exportação tabular (XLSX / CSV): lista de compras ou qualquer recorte do catálogo
+COLUNAS_EXPORTACAO = ["Mercado", "Produto", "Quantidade", "Valor Unit.", "Subtotal"]
+LINHAS_POR_BLOCO = 10_000
+
+
+def _blocos_por_mercado(df: pd.DataFrame, linhas_por_bloco: int = LINHAS_POR_BLOCO):
+    """Gera (mercado, bloco, total do mercado ou None) com as linhas agrupadas por mercado.
+
+    Mercados na ordem da primeira aparição (como em ``generate_pdf``) e, dentro
+    de cada um, a ordem original. Só o bloco em andamento é materializado; sem
+    coluna Quantidade, cada linha conta uma unidade.
+    """
+    valor = df["Valor"].to_numpy(dtype=np.float64)
+    if "Quantidade" in df.columns:
+        quantidade = df["Quantidade"].to_numpy(dtype=np.int64)
+    else:
+        quantidade = np.ones(len(df), dtype=np.int64)
+    codes, mercados = pd.factorize(df["Mercado"])
+    ordem = np.argsort(codes, kind="stable")
+    limites = np.searchsorted(codes[ordem], np.arange(len(mercados) + 1))
+    produtos = df["Produto"]
+
+    for g, mercado in enumerate(mercados):
+        linhas = ordem[limites[g]:limites[g + 1]]
+        total = 0.0
+        for inicio in range(0, len(linhas), linhas_por_bloco):
+            pos = linhas[inicio:inicio + linhas_por_bloco]
+            subtotal = valor[pos] * quantidade[pos]
+            total += subtotal.sum()
+            bloco = pd.DataFrame({
+                "Mercado": mercado,
+                "Produto": produtos.iloc[pos].to_numpy(dtype=object),
+                "Quantidade": quantidade[pos],
+                "Valor Unit.": valor[pos],
+                "Subtotal": subtotal,
+            })
+            ultimo = inicio + linhas_por_bloco >= len(linhas)
+            yield mercado, bloco, (float(total) if ultimo else None)
+
+
+def _linha_total(rotulo: str, total: float) -> pd.DataFrame:
+    return pd.DataFrame([[rotulo, None, None, None, total]], columns=COLUNAS_EXPORTACAO)
+
+
+def exportar_csv(df: pd.DataFrame) -> bytes:
+    """CSV agrupado por mercado com subtotais (";" e vírgula decimal, abre direto no Excel pt-BR)."""
+    saida = io.BytesIO()
+    saida.write("\ufeff".encode("utf-8"))
+    opcoes = dict(sep=";", decimal=",", float_format="%.2f", index=False, encoding="utf-8")
+    pd.DataFrame(columns=COLUNAS_EXPORTACAO).to_csv(saida, **opcoes)
+    total_geral = 0.0
+    for mercado, bloco, total in _blocos_por_mercado(df):
+        bloco.to_csv(saida, header=False, **opcoes)
+        if total is not None:
+            total_geral += total
+            _linha_total(f"Total {mercado}", total).to_csv(saida, header=False, **opcoes)
+    _linha_total("TOTAL GERAL", total_geral).to_csv(saida, header=False, **opcoes)
+    return saida.getvalue()
+
+
+def exportar_xlsx(df: pd.DataFrame) -> bytes:
+    """Planilha XLSX agrupada por mercado com subtotais, escrita em modo streaming (write-only)."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Lista de Compras")
+    negrito = Font(bold=True)
+
+    def destaque(valores):
+        celulas = []
+        for valor in valores:
+            celula = WriteOnlyCell(ws, value=valor)
+            celula.font = negrito
+            celulas.append(celula)
+        return celulas
+
+    ws.append(destaque(COLUNAS_EXPORTACAO))
+    total_geral = 0.0
+    for mercado, bloco, total in _blocos_por_mercado(df):
+        # Uma lista Python por coluna do bloco; as linhas saem direto para o arquivo
+        for linha in zip(*(bloco[c].tolist() for c in COLUNAS_EXPORTACAO)):
+            ws.append(linha)
+        if total is not None:
+            total_geral += total
+            ws.append(destaque([f"Total {mercado}", None, None, None, total]))
+    ws.append(destaque(["TOTAL GERAL", None, None, None, total_geral]))
+
+    saida = io.BytesIO()
+    wb.save(saida)
+    return saida.getvalue()
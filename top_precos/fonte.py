@@ -0,0 +1,203 @@
+"""Download do CSV publicado com revalidação condicional e refresh em segundo plano."""
+import hashlib
+import io
+import os
+import threading
+import time
+
+import requests
+
+from .diagnostico import METRICAS
+
+
+class ConteudoGrandeDemais(requests.RequestException):
+    """A resposta passou de ``max_bytes``; o download é interrompido."""
+
+
+class FonteCSV:
+    """Mantém a última versão de um CSV remoto, no estilo stale-while-revalidate.
+
+    A primeira chamada a ``obter`` baixa o arquivo de forma bloqueante. Depois
+    disso ``obter`` sempre responde na hora com a versão em memória; passado o
+    ``ttl`` ela dispara uma revalidação em uma thread (If-None-Match /
+    If-Modified-Since), que só troca o conteúdo se o servidor mandar um novo.
+
+    O corpo é lido em blocos e abandonado assim que passar de ``max_bytes``
+    (None = sem limite), sem guardar a resposta inteira antes de conferir.
+    Falhas de conexão, timeouts e erros 5xx são tentados de novo até
+    ``tentativas`` vezes, com espera crescente entre elas.
+    """
+
+    def __init__(self, url: str, ttl: float = 120, timeout: float = 25, headers=None, session=None,
+                 max_bytes=None, tentativas: int = 2, espera: float = 0.5):
+        self.url = url
+        self.ttl = ttl
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.tentativas = max(1, tentativas)
+        self.espera = espera
+        self.headers = dict(headers or {})
+        self.session = session or requests.Session()
+        self.erro = None
+
+        self._lock = threading.RLock()
+        self._atualizando = False
+        self._thread = None
+        self._verificado_em = float("-inf")
+        self._etag = None
+        self._last_modified = None
+        self._atual = None  # (digest, bytes), trocado sempre por inteiro
+
+    def obter(self, bloquear: bool = True):
+        """(hash do conteúdo, bytes) da versão atual, ou None se ainda não baixou.
+
+        Com ``bloquear=False`` nem o primeiro download espera a rede.
+        """
+        with self._lock:
+            vencido = time.monotonic() - self._verificado_em >= self.ttl
+            if vencido and not self._atualizando:
+                if self._atual is None and bloquear:
+                    self.atualizar()
+                else:
+                    self._atualizando = True
+                    self._thread = threading.Thread(target=self._atualizar_em_segundo_plano, daemon=True)
+                    self._thread.start()
+            thread = self._thread
+        if self._atual is None and bloquear and thread is not None:
+            # Primeiro download já em andamento em segundo plano: espera por ele
+            thread.join()
+        return self._atual
+
+    @property
+    def pendente(self) -> bool:
+        """True enquanto o primeiro download ainda está em andamento."""
+        return self._atual is None and self._atualizando
+
+    def atualizar(self) -> bool:
+        """Revalida no servidor (bloqueante). True se o conteúdo mudou."""
+        headers = dict(self.headers)
+        if self._etag:
+            headers["If-None-Match"] = self._etag
+        if self._last_modified:
+            headers["If-Modified-Since"] = self._last_modified
+
+        try:
+            for tentativa in range(self.tentativas):
+                try:
+                    return self._baixar(headers)
+                except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                    transitorio = not isinstance(e, requests.HTTPError) or e.response.status_code >= 500
+                    if not transitorio or tentativa + 1 == self.tentativas:
+                        raise
+                    METRICAS.contar("download_nova_tentativa")
+                    time.sleep(self.espera * 2 ** tentativa)
+        except requests.RequestException as e:
+            METRICAS.contar("download_erro")
+            self.erro = e
+            return False
+        finally:
+            self._verificado_em = time.monotonic()
+
+    def _baixar(self, headers) -> bool:
+        with METRICAS.etapa("download"):
+            with self.session.get(self.url, headers=headers, timeout=self.timeout,
+                                  allow_redirects=True, stream=True) as r:
+                if r.status_code == 304:
+                    METRICAS.contar("download_304")
+                    self.erro = None
+                    return False
+                r.raise_for_status()
+                digest, conteudo = self._ler_corpo(r)
+        METRICAS.contar("download_200")
+        with self._lock:
+            mudou = self._atual is None or digest != self._atual[0]
+            self._etag = r.headers.get("ETag")
+            self._last_modified = r.headers.get("Last-Modified")
+            self._atual = (digest, conteudo)
+            self.erro = None
+        return mudou
+
+    def _ler_corpo(self, r):
+        """(sha256, bytes) do corpo, lido em blocos e respeitando ``max_bytes``."""
+        limite = self.max_bytes
+        declarado = r.headers.get("Content-Length")
+        if limite is not None and declarado and declarado.isdigit() and int(declarado) > limite:
+            raise ConteudoGrandeDemais(f"planilha com {int(declarado)} bytes passa do limite de {limite}")
+        hash_ = hashlib.sha256()
+        buffer = io.BytesIO()
+        for bloco in r.iter_content(chunk_size=1 << 16):
+            hash_.update(bloco)
+            buffer.write(bloco)
+            if limite is not None and buffer.tell() > limite:
+                raise ConteudoGrandeDemais(f"planilha passa do limite de {limite} bytes")
+        # getvalue() devolve o próprio buffer, sem uma segunda cópia do conteúdo
+        return hash_.hexdigest(), buffer.getvalue()
+
+    def _atualizar_em_segundo_plano(self):
+        try:
+            self.atualizar()
+        finally:
+            self._atualizando = False
+
+
+class FonteArquivo:
+    """CSV local com a mesma interface de ``FonteCSV``; relê quando o arquivo muda."""
+
+    pendente = False
+
+    def __init__(self, caminho: str, max_bytes=None):
+        self.caminho = caminho
+        self.max_bytes = max_bytes
+        self.erro = None
+        self._versao = None
+        self._atual = None
+
+    def obter(self, bloquear: bool = True):
+        self.atualizar()
+        return self._atual
+
+    def atualizar(self) -> bool:
+        try:
+            info = os.stat(self.caminho)
+            versao = (info.st_mtime_ns, info.st_size)
+            if versao == self._versao:
+                return False
+            if self.max_bytes is not None and info.st_size > self.max_bytes:
+                raise ConteudoGrandeDemais(f"planilha com {info.st_size} bytes passa do limite de {self.max_bytes}")
+            with open(self.caminho, "rb") as f:
+                conteudo = f.read()
+        except (OSError, ConteudoGrandeDemais) as e:
+            self.erro = e
+            return False
+        digest = hashlib.sha256(conteudo).hexdigest()
+        mudou = self._atual is None or digest != self._atual[0]
+        self._versao, self._atual, self.erro = versao, (digest, conteudo), None
+        return mudou
+
+
+def abrir_fonte(origem: str, **opcoes):
+    """``FonteCSV`` para URLs http(s), ``FonteArquivo`` para caminhos locais (ou file://)."""
+    if origem.startswith(("http://", "https://")):
+        return FonteCSV(origem, **opcoes)
+    caminho = origem[len("file://"):] if origem.startswith("file://") else origem
+    return FonteArquivo(caminho, max_bytes=opcoes.get("max_bytes"))
+
+
+def interpretar_fontes(texto: str) -> dict:
+    """"Nome=origem; origem; ..." (também uma por linha) → {nome: origem}.
+
+    Sem nome, arquivos locais usam o nome do arquivo e URLs viram "Fonte N".
+    """
+    fontes = {}
+    for item in (t.strip() for t in texto.replace("\n", ";").split(";")):
+        if not item:
+            continue
+        nome, sep, origem = item.partition("=")
+        if not sep or "/" in nome or ":" in nome:
+            origem = item
+            if origem.startswith(("http://", "https://")):
+                nome = f"Fonte {len(fontes) + 1}"
+            else:
+                nome = os.path.splitext(os.path.basename(origem))[0]
+        fontes[nome.strip()] = origem.strip()
+    return fontes
@@ -0,0 +1,134 @@
+"""Formatação de valores e HTML dos cards de produto."""
+import numpy as np
+import pandas as pd
+
+
+def format_brl(x):
+    if pd.isna(x):
+        return "-"
+    s = f"{float(x):,.2f}"
+    return "R$ " + s.replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+# Tabelas de consulta: grupos de milhar e centavos viram ``take`` em arrays de str
+_GRUPO = np.array([str(i) for i in range(1000)], dtype=object)
+_GRUPO_SEP = np.array([f".{i:03d}" for i in range(1000)], dtype=object)
+_CENTAVOS = np.array([f",{i:02d}" for i in range(100)], dtype=object)
+# Acima disso (ou perto de um empate em meio centavo) o arredondamento em
+# float pode divergir do ``f"{x:.2f}"``; esses poucos valores vão pelo caminho escalar
+_LIMITE_VETORIAL = 1e9
+
+
+def format_brl_series(valores) -> pd.Series:
+    """``format_brl`` aplicado a uma coluna inteira de uma vez.
+
+    Saída idêntica byte a byte à versão escalar, inclusive NaN → "-".
+    """
+    serie = valores if isinstance(valores, pd.Series) else pd.Series(valores)
+    x = pd.to_numeric(serie, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    out = np.full(len(x), "-", dtype=object)
+
+    ax = np.abs(x)
+    y = ax * 100
+    with np.errstate(invalid="ignore"):
+        escalar = ~np.isfinite(x) | (ax >= _LIMITE_VETORIAL) | (np.abs(y - np.floor(y) - 0.5) < 1e-4)
+    escalar &= ~np.isnan(x)
+    ok = ~np.isnan(x) & ~escalar
+
+    if ok.any():
+        cents = np.rint(y[ok]).astype(np.int64)
+        reais, cent = np.divmod(cents, 100)
+        partes = np.full(len(reais), "", dtype=object)
+        nivel = 1
+        while nivel * 1000 <= reais.max():
+            nivel *= 1000
+        while nivel >= 1:
+            grupo = (reais // nivel) % 1000
+            topo = (reais >= nivel) & (reais < nivel * 1000) if nivel > 1 else reais < 1000
+            meio = reais >= nivel * 1000
+            partes = partes + np.where(topo, _GRUPO[grupo], np.where(meio, _GRUPO_SEP[grupo], ""))
+            nivel //= 1000
+        sinal = np.where(np.signbit(x[ok]), "R$ -", "R$ ")
+        out[ok] = sinal + partes + _CENTAVOS[cent]
+
+    for i in np.flatnonzero(escalar):
+        out[i] = format_brl(x[i])
+
+    return pd.Series(out, index=serie.index, dtype=object)
+
+
+CARD_HTML_INICIO = """
+        <div class="product-card">
+            <div class="product-name">"""
+CARD_HTML_MERCADO = """</div>
+            <div class="supplier-info">
+                <span class="supplier-label">Supermercado</span>
+                <span style="color: var(--muted); font-size: 1.05rem; font-weight: 500;">"""
+CARD_HTML_PRECO = """</span>
+            </div>
+            <div class="price-container">
+                <span class="price-value">"""
+CARD_HTML_FIM = """</span>
+                <span class="available-badge">✅ Disponível</span>
+            </div>
+        </div>
+        """
+
+
+def cards_html(df_view: pd.DataFrame) -> pd.Series:
+    """HTML de um card por linha, montado coluna a coluna (sem iterrows)."""
+    produtos = df_view["Produto"].astype(str).to_numpy(dtype=object)
+    mercados = df_view["Mercado"].astype(str).to_numpy(dtype=object)
+    precos = format_brl_series(df_view["Valor"]).to_numpy()
+    html = (
+        CARD_HTML_INICIO + produtos
+        + CARD_HTML_MERCADO + mercados
+        + CARD_HTML_PRECO + precos
+        + CARD_HTML_FIM
+    )
+    return pd.Series(html, index=df_view.index, dtype=object)
+
+
+def cards_html_pagina(df_view: pd.DataFrame) -> str:
+    """Todos os cards de ``df_view`` em um único bloco HTML."""
+    return "".join(cards_html(df_view))
+
+
+CARD_MENOR_INICIO = """
+        <div class="product-card">
+            <div class="product-name">"""
+CARD_MENOR_MERCADO = """</div>
+            <div class="supplier-info">
+                <span class="supplier-label">Mais barato em</span>
+                <span style="color: var(--muted); font-size: 1.05rem; font-weight: 500;">"""
+CARD_MENOR_PRECO = """</span>
+            </div>
+            <div class="price-container">
+                <span class="price-value">"""
+CARD_MENOR_BADGE = """</span>
+                <span class="available-badge">"""
+CARD_MENOR_FIM = """</span>
+            </div>
+        </div>
+        """
+
+
+def cards_menor_preco_html(resumo: pd.DataFrame) -> pd.Series:
+    """Cards do modo "menor preço": mercado mais barato, nº de mercados e diferença."""
+    qtd = resumo["Mercados"].to_numpy()
+    mercados = np.where(qtd == 1, "🏪 1 mercado", "🏪 " + qtd.astype(str).astype(object) + " mercados")
+    diferenca = np.where(
+        qtd > 1, " · até " + format_brl_series(resumo["Diferenca"]).to_numpy() + " de economia", ""
+    )
+    html = (
+        CARD_MENOR_INICIO + resumo["Produto"].astype(str).to_numpy(dtype=object)
+        + CARD_MENOR_MERCADO + resumo["Mercado"].astype(str).to_numpy(dtype=object)
+        + CARD_MENOR_PRECO + format_brl_series(resumo["Valor"]).to_numpy()
+        + CARD_MENOR_BADGE + mercados + diferenca
+        + CARD_MENOR_FIM
+    )
+    return pd.Series(html, index=resumo.index, dtype=object)
+
+
+def cards_menor_preco_html_pagina(resumo: pd.DataFrame) -> str:
+    return "".join(cards_menor_preco_html(resumo))
@@ -0,0 +1,206 @@
+"""Histórico local de preços em SQLite: só as mudanças entre cargas, com consultas de tendência.
+
+``mudancas`` é append-only: uma linha por oferta (produto_norm + Mercado) que
+apareceu, mudou de preço ou saiu da planilha. ``ofertas`` tem uma linha por
+oferta já vista, com o texto, a fonte e o preço vigente: é contra ela que a
+carga seguinte calcula a diferença, e é ela que responde às maiores quedas.
+Só sai da planilha a oferta cuja fonte veio na carga: fonte fora do ar ou com
+erro não apaga as ofertas dela.
+"""
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from .banco import conexao, criar_banco
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS ofertas (
+    chave        INTEGER PRIMARY KEY,  -- hash de (produto_norm, Mercado), ver chaves_ofertas
+    produto_norm TEXT NOT NULL,
+    mercado      TEXT NOT NULL,
+    produto      TEXT,
+    fonte        TEXT,                 -- planilha de onde veio; NULL: carga sem coluna Fonte
+    valor        REAL,                 -- preço vigente; NULL: fora da planilha
+    anterior     REAL,                 -- preço antes da última mudança
+    desde        INTEGER NOT NULL,     -- quando o preço vigente começou (unix, segundos)
+    queda_pct    REAL                  -- (anterior - valor) / anterior, só quando baixou
+);
+CREATE INDEX IF NOT EXISTS ofertas_produto ON ofertas (produto_norm, mercado);
+CREATE INDEX IF NOT EXISTS ofertas_queda ON ofertas (queda_pct) WHERE queda_pct > 0;
+CREATE TABLE IF NOT EXISTS mudancas (
+    chave         INTEGER NOT NULL,
+    registrado_em INTEGER NOT NULL,
+    valor         REAL,  -- NULL: a oferta saiu da planilha
+    anterior      REAL   -- NULL: a oferta apareceu nesta carga
+);
+CREATE INDEX IF NOT EXISTS mudancas_oferta ON mudancas (chave, registrado_em);
+"""
+
+_GRAVAR_OFERTA = """
+INSERT INTO ofertas (chave, produto_norm, mercado, produto, fonte, valor, anterior, desde, queda_pct)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (chave) DO UPDATE SET
+    produto = excluded.produto, fonte = excluded.fonte, valor = excluded.valor, anterior = excluded.anterior,
+    desde = excluded.desde, queda_pct = excluded.queda_pct
+"""
+
+
+def chaves_ofertas(df: pd.DataFrame) -> np.ndarray:
+    """Hash int64 de (produto_norm, Mercado) por linha; igual para texto ou categoria."""
+    return pd.util.hash_pandas_object(df[["produto_norm", "Mercado"]], index=False).to_numpy().view(np.int64)
+
+
+def _instantes(segundos: pd.Series) -> pd.Series:
+    return pd.to_datetime(segundos, unit="s", utc=True)
+
+
+def _nulos(valores: np.ndarray) -> list:
+    """float64 → lista com None no lugar de NaN (NULL no SQLite)."""
+    return [None if v != v else v for v in valores.tolist()]
+
+
+class HistoricoPrecos:
+    """Histórico de preços em ``caminho`` (SQLite); seguro para várias threads.
+
+    Cada consulta abre a própria conexão; ``registrar`` é serializado e guarda
+    em memória o preço vigente de cada oferta para comparar com a carga seguinte.
+    """
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self._vigentes = None  # DataFrame (valor, fonte) indexado pela chave da oferta
+        criar_banco(caminho, _ESQUEMA)
+        with conexao(caminho) as con:
+            # Histórico gravado antes da coluna fonte
+            if "fonte" not in {coluna[1] for coluna in con.execute("PRAGMA table_info(ofertas)")}:
+                con.execute("ALTER TABLE ofertas ADD COLUMN fonte TEXT")
+
+    def _carregar_vigentes(self, con) -> pd.DataFrame:
+        if self._vigentes is None:
+            atual = pd.read_sql_query("SELECT chave, valor, fonte FROM ofertas WHERE valor IS NOT NULL", con)
+            self._vigentes = pd.DataFrame(
+                {"valor": atual["valor"].to_numpy(np.float64), "fonte": atual["fonte"].to_numpy(dtype=object)},
+                index=pd.Index(atual["chave"].to_numpy(np.int64), name="chave"),
+            )
+        return self._vigentes
+
+    def registrar(self, df: pd.DataFrame, quando=None) -> int:
+        """Grava as ofertas de ``df`` que mudaram desde a carga anterior; devolve quantas.
+
+        Oferta repetida na planilha (mesmo produto no mesmo mercado) vale pelo
+        menor preço. Oferta que sumiu ganha uma mudança com ``valor`` NULL, mas
+        só se a fonte dela (coluna ``Fonte``) está em ``df``: a de uma fonte
+        ausente nesta carga continua vigente. Sem a coluna, toda oferta
+        ausente sai.
+        """
+        quando = int(time.time() if quando is None else quando)
+        chave = chaves_ofertas(df)
+        valor = df["Valor"].to_numpy(np.float64)
+        fonte = (df["Fonte"].astype(object).to_numpy() if "Fonte" in df.columns
+                 else np.full(len(df), None, dtype=object))
+        ordem = np.lexsort((valor, chave))
+        primeira = ordem[np.diff(chave[ordem], prepend=chave[ordem][:1] - 1) != 0]
+        novos = pd.DataFrame({"valor": valor[primeira], "fonte": fonte[primeira]},
+                             index=pd.Index(chave[primeira], name="chave"))
+
+        with self._lock, conexao(self.caminho) as con:
+            vigentes = self._carregar_vigentes(con)
+            anterior = vigentes.reindex(novos.index)
+            antes = anterior["valor"].to_numpy()
+            mudou = novos["valor"].to_numpy() != antes  # NaN (oferta nova) também conta
+            # Mesmo preço vindo de outra fonte (ou de histórico sem fonte): só a fonte é regravada
+            nova_fonte = novos["fonte"].to_numpy()
+            refonte = ~mudou & pd.notna(nova_fonte) & (anterior["fonte"].to_numpy() != nova_fonte)
+
+            fora = vigentes.loc[vigentes.index.difference(novos.index)]
+            ausente = np.zeros(len(fora), dtype=bool)
+            if "Fonte" in df.columns:
+                ausente = (fora["fonte"].notna() & ~fora["fonte"].isin(pd.unique(fonte))).to_numpy()
+            saiu = fora.index[~ausente].tolist()
+
+            chaves = novos.index[mudou].tolist()
+            valores = novos["valor"].to_numpy()[mudou]
+            anteriores = antes[mudou]
+            with np.errstate(invalid="ignore"):
+                queda = np.where(anteriores > valores, (anteriores - valores) / anteriores, np.nan)
+            linhas = df.iloc[primeira[mudou]]
+            con.executemany(
+                "INSERT INTO mudancas (chave, registrado_em, valor, anterior) VALUES (?, ?, ?, ?)",
+                zip(chaves, [quando] * len(chaves), valores.tolist(), _nulos(anteriores)),
+            )
+            con.executemany(_GRAVAR_OFERTA, zip(
+                chaves,
+                linhas["produto_norm"].astype(str).tolist(),
+                linhas["Mercado"].astype(str).tolist(),
+                linhas["Produto"].astype(str).tolist(),
+                nova_fonte[mudou].tolist(),
+                valores.tolist(),
+                _nulos(anteriores),
+                [quando] * len(chaves),
+                _nulos(queda),
+            ))
+            con.executemany("UPDATE ofertas SET fonte = ? WHERE chave = ?",
+                            zip(nova_fonte[refonte].tolist(), novos.index[refonte].tolist()))
+            con.executemany(
+                "INSERT INTO mudancas (chave, registrado_em, valor, anterior)"
+                " SELECT chave, ?, NULL, valor FROM ofertas WHERE chave = ?",
+                [(quando, c) for c in saiu],
+            )
+            con.executemany(
+                "UPDATE ofertas SET anterior = valor, valor = NULL, desde = ?, queda_pct = NULL WHERE chave = ?",
+                [(quando, c) for c in saiu],
+            )
+            self._vigentes = pd.concat([fora[ausente], novos])
+        return len(chaves) + len(saiu)
+
+    def tendencia(self, produto_norm: str, mercado: str = None) -> pd.DataFrame:
+        """Mudanças de preço de um produto (em todos os mercados ou em um), em ordem cronológica."""
+        sql = (
+            "SELECT m.registrado_em, o.mercado, o.produto, m.valor, m.anterior"
+            " FROM ofertas o JOIN mudancas m ON m.chave = o.chave WHERE o.produto_norm = ?"
+        )
+        params = [produto_norm]
+        if mercado is not None:
+            sql += " AND o.mercado = ?"
+            params.append(mercado)
+        with conexao(self.caminho) as con:
+            df = pd.read_sql_query(sql + " ORDER BY m.registrado_em", con, params=params)
+        df["registrado_em"] = _instantes(df["registrado_em"])
+        return df
+
+    def maiores_quedas(self, dias: float = 7, limite: int = 20, agora=None) -> pd.DataFrame:
+        """Ofertas cujo preço vigente veio de uma queda nos últimos ``dias``, da maior para a menor (em %)."""
+        desde = int((time.time() if agora is None else agora) - dias * 86400)
+        with conexao(self.caminho) as con:
+            df = pd.read_sql_query(
+                "SELECT produto_norm, mercado, produto, anterior AS antes, valor AS agora,"
+                " anterior - valor AS queda, queda_pct, desde FROM ofertas"
+                " WHERE queda_pct > 0 AND desde >= ? ORDER BY queda_pct DESC LIMIT ?",
+                con, params=(desde, limite),
+            )
+        df["desde"] = _instantes(df["desde"])
+        return df
+
+    def precos_vigentes(self, produto_norm: str, freq: str = "D") -> pd.DataFrame:
+        """Preço do produto em cada mercado (colunas) no fim de cada período de ``freq``; NaN: fora da planilha."""
+        mud = self.tendencia(produto_norm)
+        if mud.empty:
+            return pd.DataFrame()
+        # Oferta retirada: infinito até reaparecer (o ffill não pode trazer o preço antigo de volta)
+        return (mud.assign(valor=mud["valor"].fillna(np.inf))
+                   .pivot_table(index="registrado_em", columns="mercado", values="valor", aggfunc="last")
+                   .ffill()
+                   .resample(freq).last()
+                   .ffill()
+                   .replace(np.inf, np.nan)
+                   .dropna(how="all"))
+
+    def mercado_mais_barato(self, produto_norm: str, freq: str = "D") -> pd.DataFrame:
+        """Mercado mais barato do produto em cada período de ``freq`` e o preço dele."""
+        grade = self.precos_vigentes(produto_norm, freq)
+        if grade.empty:
+            return pd.DataFrame(columns=["mercado", "valor"])
+        return pd.DataFrame({"mercado": grade.idxmin(axis=1), "valor": grade.min(axis=1)})
@@ -0,0 +1,100 @@
+"""Operações sobre a lista de compras (``selected_products``)."""
+import numpy as np
+import pandas as pd
+
+from .catalogo import Catalogo
+from .otimizador import otimizar_cesta
+from .texto import norm
+
+
+def agrupar_por_mercado(selected_products: dict) -> dict:
+    """{mercado: [(chave, item), ...]} na ordem em que os itens foram escolhidos."""
+    produtos_por_fornecedor = {}
+    for key, item in selected_products.items():
+        fornecedor = item['Mercado']
+        if fornecedor not in produtos_por_fornecedor:
+            produtos_por_fornecedor[fornecedor] = []
+        produtos_por_fornecedor[fornecedor].append((key, item))
+    return produtos_por_fornecedor
+
+
+def subtotais_por_mercado(selected_products: dict) -> dict:
+    """{mercado: soma de Valor × Quantidade dos itens daquele mercado}."""
+    subtotais = {}
+    for item in selected_products.values():
+        subtotais[item['Mercado']] = subtotais.get(item['Mercado'], 0.0) + item['Valor'] * item['Quantidade']
+    return subtotais
+
+
+def lista_dataframe(selected_products: dict) -> pd.DataFrame:
+    """A lista como tabela (Produto, Mercado, Valor, Quantidade), na ordem de escolha."""
+    return pd.DataFrame(list(selected_products.values()), columns=["Produto", "Mercado", "Valor", "Quantidade"])
+
+
+def resolver_selecao(catalogo: Catalogo, selecao: dict, conhecidos: dict) -> dict:
+    """{id: quantidade} → {id: item} (Produto, Mercado, Valor, Quantidade) com os preços atuais.
+
+    Os ids são re-resolvidos no catálogo a cada chamada, então a seleção
+    sobrevive a atualizações da planilha. ``conhecidos`` guarda o último item
+    visto de cada id (atualizado aqui) e cobre ids que saíram do catálogo.
+    """
+    if not selecao:
+        return {}
+    ids = np.fromiter(selecao, dtype=np.int64, count=len(selecao))
+    pos = catalogo.posicoes(ids)
+    achados = catalogo.df.iloc[pos[pos >= 0]]
+    for id_linha, produto, mercado, valor in zip(
+        ids[pos >= 0].tolist(), achados["Produto"], achados["Mercado"], achados["Valor"]
+    ):
+        conhecidos[id_linha] = {'Produto': produto, 'Mercado': mercado, 'Valor': float(valor)}
+    return {
+        id_linha: {**conhecidos[id_linha], 'Quantidade': quantidade}
+        for id_linha, quantidade in selecao.items()
+        if id_linha in conhecidos
+    }
+
+
+def total_lista(selected_products: dict) -> float:
+    return sum(item['Valor'] * item['Quantidade'] for item in selected_products.values())
+
+
+def sugerir_lista(catalogo: Catalogo, selected_products: dict, max_mercados=None):
+    """Onde comprar cada item da lista pelo menor total, com limite opcional de mercados.
+
+    Itens que não estão mais no catálogo ficam onde estão. Devolve a tabela de
+    sugestões, o total atual, o total sugerido e se a busca provou o ótimo; a
+    tabela liga a chave do item na lista ("id atual") ao id da oferta sugerida.
+    """
+    itens, precos, linhas, fixos = [], [], [], 0.0
+    for key, item in selected_products.items():
+        vetor = catalogo.precos_por_mercado(norm(item['Produto']))
+        if vetor is None:
+            fixos += item['Valor'] * item['Quantidade']
+            continue
+        itens.append((key, item))
+        precos.append(vetor[0])
+        linhas.append(vetor[1])
+
+    total_atual = total_lista(selected_products)
+    if not itens:
+        return pd.DataFrame(), total_atual, total_atual, True
+
+    quantidades = np.array([item['Quantidade'] for _, item in itens])
+    cesta = otimizar_cesta(np.vstack(precos), quantidades, max_mercados)
+    df = catalogo.df
+    sugestao = []
+    for (key, item), m, linhas_item in zip(itens, cesta.mercados, linhas):
+        if m < 0:
+            continue
+        linha = df.iloc[linhas_item[m]]
+        sugestao.append({
+            'Produto': linha['Produto'],
+            'Quantidade': item['Quantidade'],
+            'Mercado atual': item['Mercado'],
+            'Valor atual': item['Valor'],
+            'Mercado': linha['Mercado'],
+            'Valor': float(linha['Valor']),
+            'id atual': key,
+            'id': int(linha['id']),
+        })
+    return pd.DataFrame(sugestao), total_atual, cesta.total + fixos, cesta.otimo
@@ -0,0 +1,129 @@
+"""Otimização da lista de compras: em qual mercado comprar cada produto."""
+import time
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+
+class Cesta(NamedTuple):
+    mercados: np.ndarray  # índice do mercado escolhido para cada item (-1 se nenhum)
+    total: float          # custo total (inf se não dá para cobrir todos os itens)
+    otimo: bool           # False se a busca parou no limite de tempo
+
+
+def otimizar_cesta(precos: np.ndarray, quantidades: np.ndarray, max_mercados: Optional[int] = None,
+                   tempo_limite: float = 0.15) -> Cesta:
+    """Atribui cada item ao mercado mais barato, visitando no máximo ``max_mercados``.
+
+    ``precos`` é uma matriz itens × mercados com ``inf`` onde o mercado não tem
+    o produto. Sem limite de mercados a resposta é o mínimo de cada linha. Com
+    limite, escolher o conjunto de mercados é combinatório: uma solução gulosa
+    refinada por trocas serve de ponto de partida para um branch-and-bound que
+    descarta ramos pelo limite inferior; se ``tempo_limite`` (segundos) estourar,
+    devolve a melhor solução encontrada até ali com ``otimo=False``.
+    """
+    custos = np.asarray(precos, dtype=np.float64) * np.asarray(quantidades, dtype=np.float64)[:, None]
+    n_itens, n_mercados = custos.shape
+    if n_itens == 0:
+        return Cesta(np.empty(0, dtype=np.int64), 0.0, True)
+
+    # Só interessam mercados que têm algum dos itens
+    uteis = np.flatnonzero(np.isfinite(custos).any(axis=0))
+    livre = _sem_limite(custos)
+    if max_mercados is None or len(np.unique(livre.mercados[livre.mercados >= 0])) <= max_mercados:
+        return livre
+    if max_mercados <= 0:
+        return Cesta(np.full(n_itens, -1, dtype=np.int64), float("inf"), True)
+
+    # Item sem mercado vira uma penalidade finita: as contas de limite ficam estáveis
+    finitos = custos[np.isfinite(custos)]
+    penalidade = (finitos.max() if len(finitos) else 1.0) * n_itens * 10 + 1
+    c = np.where(np.isfinite(custos[:, uteis]), custos[:, uteis], penalidade)
+
+    escolhidos = _guloso(c, max_mercados)
+    escolhidos = _melhorar_por_trocas(c, escolhidos)
+    melhor = c[:, escolhidos].min(axis=1).sum()
+
+    # Ramifica primeiro nos mercados da solução inicial, depois nos mais baratos
+    ordem = np.array(escolhidos + [m for m in np.argsort(c.sum(axis=0)) if m not in escolhidos])
+    c_ord = c[:, ordem]
+    # Mínimo por item entre os mercados ainda não decididos a partir da posição p
+    sufixo = np.minimum.accumulate(c_ord[:, ::-1], axis=1)[:, ::-1]
+    sufixo = np.concatenate([sufixo, np.full((n_itens, 1), np.inf)], axis=1)
+
+    prazo = time.perf_counter() + tempo_limite
+    estado = {"melhor": melhor, "conjunto": [ordem.tolist().index(m) for m in escolhidos], "completo": True}
+
+    def ramificar(pos, conjunto, atual):
+        if time.perf_counter() > prazo:
+            estado["completo"] = False
+            return
+        total = atual.sum()
+        if len(conjunto) == max_mercados or pos == len(ordem):
+            if total < estado["melhor"]:
+                estado["melhor"], estado["conjunto"] = total, list(conjunto)
+            return
+        # Limite 1: cada item pelo menor preço entre os escolhidos e os restantes
+        if np.minimum(atual, sufixo[:, pos]).sum() >= estado["melhor"]:
+            return
+        # Limite 2: ganhos de mercados isolados somam mais que o ganho conjunto
+        vagas = max_mercados - len(conjunto)
+        ganhos = np.maximum(atual[:, None] - c_ord[:, pos:], 0).sum(axis=0)
+        if vagas < len(ganhos):
+            ganhos = np.partition(ganhos, len(ganhos) - vagas)[-vagas:]
+        if total - ganhos.sum() >= estado["melhor"]:
+            return
+        conjunto.append(pos)
+        ramificar(pos + 1, conjunto, np.minimum(atual, c_ord[:, pos]))
+        conjunto.pop()
+        ramificar(pos + 1, conjunto, atual)
+
+    # Sem mercado escolhido, cada item custa a penalidade (mantém os limites finitos)
+    ramificar(0, [], np.full(n_itens, penalidade))
+
+    colunas = uteis[ordem[estado["conjunto"]]]
+    sub = custos[:, colunas]
+    escolha = colunas[np.argmin(sub, axis=1)]
+    total = sub.min(axis=1).sum()
+    if not np.isfinite(total):
+        escolha = np.where(np.isfinite(sub.min(axis=1)), escolha, -1)
+    return Cesta(escolha, float(total), estado["completo"])
+
+
+def _sem_limite(custos: np.ndarray) -> Cesta:
+    escolha = np.argmin(custos, axis=1)
+    minimos = custos[np.arange(len(custos)), escolha]
+    escolha = np.where(np.isfinite(minimos), escolha, -1)
+    return Cesta(escolha, float(minimos.sum()), True)
+
+
+def _guloso(c: np.ndarray, k: int) -> list:
+    """Adiciona, um a um, o mercado que mais reduz o custo total."""
+    atual = np.full(len(c), np.inf)
+    escolhidos = []
+    for _ in range(min(k, c.shape[1])):
+        totais = np.minimum(atual[:, None], c).sum(axis=0)
+        totais[escolhidos] = np.inf
+        m = int(np.argmin(totais))
+        escolhidos.append(m)
+        atual = np.minimum(atual, c[:, m])
+    return escolhidos
+
+
+def _melhorar_por_trocas(c: np.ndarray, escolhidos: list) -> list:
+    """Busca local: troca um mercado escolhido por um de fora enquanto isso baratear."""
+    escolhidos = list(escolhidos)
+    fora = [m for m in range(c.shape[1]) if m not in escolhidos]
+    if not fora:
+        return escolhidos
+    while True:
+        sub = c[:, escolhidos]
+        total = sub.min(axis=1).sum()
+        # Custo de cada item sem cada mercado escolhido (k × itens)
+        sem = np.stack([np.delete(sub, j, axis=1).min(axis=1) if sub.shape[1] > 1 else np.full(len(c), np.inf)
+                        for j in range(sub.shape[1])])
+        trocas = np.minimum(sem[:, None, :], c[:, fora].T[None, :, :]).sum(axis=2)
+        j, f = np.unravel_index(np.argmin(trocas), trocas.shape)
+        if trocas[j, f] >= total - 1e-9:
+            return escolhidos
+        escolhidos[j], fora[f] = fora[f], escolhidos[j]
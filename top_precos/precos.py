@@ -0,0 +1,194 @@
+"""Leitura de preços em texto: "R$ 1.234,56", "1,234.56", "(2,50)", "5,00 a 7,00" → float.
+
+Cada valor distinto é analisado uma vez, em lote (pyarrow), e o separador
+decimal é decidido por coluna: valores que só têm uma leitura possível
+("12,50", "1,234.56", "1.234.567") votam, pesados pelo nº de linhas, e a
+coluna toda segue o vencedor nos valores ambíguos ("1.234"). Sem nenhum voto,
+vale o padrão brasileiro (vírgula decimal). O que não é preço não some: vai
+para o relatório com o motivo.
+"""
+from typing import NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Separador decimal quando a coluna não tem nenhum valor que o distinga
+DECIMAL_PADRAO = ","
+
+# Moeda e espaços (inclusive NBSP e o espaço estreito) não fazem parte do número
+_RUIDO = r"us\$|r\$|\$|brl|reais|\s|\x{a0}|\x{202f}|'"
+# Faixa ("5,00 - 7,00", "5 a 7", "5–7"): fica o menor valor, o primeiro
+_FAIXA = r"^([-(]?\d[\d.,]*\)?)(?:-|–|—|a|ate|até)[-(]?\d[\d.,]*\)?$"
+# Sinal: "-2,50", "(2,50)" ou "2,50-"
+_NUMERO = r"^(?P<antes>[-(]?)(?P<numero>\d[\d.,]*)(?P<depois>[-)]?)$"
+# As duas leituras de um número; um grupo de milhar não começa com zero ("0,500" é decimal)
+_LEITURAS = {
+    ",": r"^(?:\d+|[1-9]\d{0,2}(?:\.\d{3})+)(?:,\d+)?$",
+    ".": r"^(?:\d+|[1-9]\d{0,2}(?:,\d{3})+)(?:\.\d+)?$",
+}
+_MILHAR = {",": ".", ".": ","}
+
+MOTIVOS = ("vazio", "sem número", "formato", "negativo")
+
+
+class RelatorioPrecos(NamedTuple):
+    decimal: str              # separador decimal dos valores ambíguos ("," ou ".")
+    decidido: bool            # False: nenhum valor distinguia o separador e valeu DECIMAL_PADRAO
+    linhas: int               # linhas analisadas
+    faixas: int               # linhas com faixa ("5,00 a 7,00"), lidas pelo menor valor
+    negativos: int            # linhas com valor negativo ("-2,50", "(2,50)", "2,50-")
+    rejeitados: pd.DataFrame  # uma linha por valor rejeitado (índice de origem): Valor (texto) e Motivo
+
+    def resumo(self) -> dict:
+        """{motivo: nº de linhas rejeitadas}, só os motivos que aconteceram."""
+        return self.rejeitados["Motivo"].value_counts(sort=False).to_dict()
+
+
+def juntar_relatorios(relatorios) -> RelatorioPrecos:
+    """Um relatório para as partes de uma mesma coluna (ex.: lida em pedaços)."""
+    relatorios = list(relatorios)
+    decidido = next((r for r in relatorios if r.decidido), None)
+    return RelatorioPrecos(
+        decimal=(decidido or relatorios[0]).decimal if relatorios else DECIMAL_PADRAO,
+        decidido=decidido is not None,
+        linhas=sum(r.linhas for r in relatorios),
+        faixas=sum(r.faixas for r in relatorios),
+        negativos=sum(r.negativos for r in relatorios),
+        rejeitados=pd.concat([r.rejeitados for r in relatorios]) if relatorios else _sem_rejeitados(),
+    )
+
+
+def _sem_rejeitados(index=None) -> pd.DataFrame:
+    return pd.DataFrame({"Valor": pd.Series(index=index, dtype=object), "Motivo": pd.Series(index=index, dtype=object)})
+
+
+def _booleano(resultado) -> np.ndarray:
+    return pc.fill_null(resultado, False).to_numpy(zero_copy_only=False)
+
+
+def _separar_numero(textos: pa.Array):
+    """(texto limpo, faixa, partes do número: antes, numero, depois) de cada texto."""
+    limpo = pc.replace_substring_regex(pc.utf8_lower(textos), _RUIDO, "")
+    faixa = _booleano(pc.match_substring_regex(limpo, _FAIXA))
+    partes = pc.extract_regex(pc.replace_substring_regex(limpo, _FAIXA, r"\1") if faixa.any() else limpo, _NUMERO)
+    return limpo, faixa, partes
+
+
+def _leituras(numero: pa.Array):
+    """(lê com vírgula decimal, lê com ponto decimal, só uma das leituras serve e há separador)."""
+    virgula, ponto = (_booleano(pc.match_substring_regex(numero, _LEITURAS[sep])) for sep in (",", "."))
+    unica = _booleano(pc.match_substring_regex(numero, r"[.,]")) & (virgula != ponto)
+    return virgula, ponto, unica
+
+
+def _textos_distintos(valores: pd.Series):
+    """(códigos por linha, textos distintos em pyarrow, linhas de cada texto, quais distintos são texto,
+    distintos brutos ou None)."""
+    codes, uniques = pd.factorize(valores)
+    pesos = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    if isinstance(valores.dtype, pd.StringDtype):
+        return codes, pa.array(uniques.array, type=pa.string()), pesos, np.ones(len(uniques), dtype=bool), None
+    # Planilhas lidas sem dtype=str podem misturar números e texto na mesma coluna
+    brutos = np.asarray(uniques, dtype=object)
+    texto = np.fromiter((isinstance(u, str) for u in brutos), dtype=bool, count=len(brutos))
+    return codes, pa.array(brutos[texto], type=pa.string()), pesos, texto, brutos
+
+
+def votos_decimal(valores: pd.Series) -> dict:
+    """{separador decimal: nº de linhas cujo valor só admite essa leitura}.
+
+    Somados entre as partes de uma coluna lida em pedaços, decidem o separador
+    da coluna inteira (``decimal_dos_votos``) antes de converter qualquer parte.
+    """
+    _, textos, pesos, texto, _ = _textos_distintos(valores)
+    virgula, ponto, unica = _leituras(_separar_numero(textos)[2].field("numero"))
+    pesos = pesos[texto]
+    return {",": int(pesos[unica & virgula].sum()), ".": int(pesos[unica & ponto].sum())}
+
+
+def decimal_dos_votos(votos: dict) -> str:
+    """O separador com mais votos; empate ou nenhum voto: DECIMAL_PADRAO."""
+    return "." if votos["."] > votos[","] else DECIMAL_PADRAO
+
+
+def _analisar_textos(textos: pa.Array, pesos: np.ndarray, decimal: Optional[str]):
+    """(número, motivo, faixa, negativo) de cada texto distinto, o separador decimal
+    e se algum valor o distinguiu; motivo é o índice em MOTIVOS ou -1."""
+    limpo, faixa, partes = _separar_numero(textos)
+    numero = partes.field("numero")
+    sinal = np.char.add(pc.fill_null(partes.field("antes"), "?").to_numpy(zero_copy_only=False).astype(str),
+                        pc.fill_null(partes.field("depois"), "?").to_numpy(zero_copy_only=False).astype(str))
+
+    # Votos: valores com separador que só admitem uma leitura, pesados pelas linhas
+    virgula, ponto, unica = _leituras(numero)
+    decidido = decimal is not None or bool(pesos[unica].sum())
+    if decimal is None:
+        decimal = decimal_dos_votos({",": pesos[unica & virgula].sum(), ".": pesos[unica & ponto].sum()})
+    le_virgula = virgula & (~ponto | (decimal == ","))
+
+    normal = {sep: pc.replace_substring(pc.replace_substring(numero, _MILHAR[sep], ""), sep, ".") for sep in _LEITURAS}
+    texto = pc.if_else(pa.array(le_virgula), normal[","], normal["."])
+    texto = pc.if_else(pa.array(virgula | ponto), texto, pa.nulls(len(texto), pa.string()))
+    numeros = pc.cast(texto, pa.float64()).to_numpy(zero_copy_only=False).copy()
+
+    # Sinal antes e depois juntos: "-" (um dos lados) e "()" são negativos; o resto é inválido
+    negativo = np.isin(sinal, ("-", "()"))
+    numeros[~negativo & (sinal != "")] = np.nan
+    numeros[negativo] *= -1
+
+    motivo = np.full(len(textos), -1, dtype=np.int8)
+    motivo[np.isnan(numeros)] = MOTIVOS.index("formato")
+    motivo[~_booleano(pc.match_substring_regex(limpo, r"\d"))] = MOTIVOS.index("sem número")
+    motivo[_booleano(pc.equal(limpo, ""))] = MOTIVOS.index("vazio")
+    numeros[motivo >= 0] = np.nan
+    return numeros, motivo, faixa & (motivo < 0), negativo & (motivo < 0), decimal, decidido
+
+
+def analisar_precos(valores: pd.Series, decimal: Optional[str] = None, negativos: bool = True):
+    """Texto monetário → (float64 de cada linha, ``RelatorioPrecos``); NaN nas linhas rejeitadas.
+
+    ``decimal`` fixa o separador dos valores ambíguos ("," ou "."); None decide
+    pelos valores da própria coluna. Com ``negativos=False``, preço negativo
+    também é rejeitado (motivo "negativo"). Colunas já numéricas só têm os
+    nulos rejeitados.
+    """
+    if decimal not in (None, *_LEITURAS):
+        raise ValueError(f"Separador decimal inválido: {decimal!r}")
+    codes, textos, pesos, texto, brutos = _textos_distintos(valores)
+
+    numeros = np.full(len(pesos), np.nan)
+    motivo = np.full(len(pesos), MOTIVOS.index("formato"), dtype=np.int8)
+    faixa = np.zeros(len(pesos), dtype=bool)
+    negativo = np.zeros(len(pesos), dtype=bool)
+    decidido = decimal is not None
+    if texto.any():
+        (numeros[texto], motivo[texto], faixa[texto], negativo[texto],
+         decimal, decidido) = _analisar_textos(textos, pesos[texto], decimal)
+    if not texto.all():
+        outros = pd.to_numeric(pd.Series(brutos[~texto], dtype=object), errors="coerce").to_numpy(np.float64)
+        numeros[~texto] = outros
+        motivo[~texto] = np.where(np.isnan(outros), MOTIVOS.index("formato"), -1)
+        negativo[~texto] = outros < 0
+    if not negativos:
+        motivo[negativo] = MOTIVOS.index("negativo")
+        numeros[negativo] = np.nan
+
+    # Sentinela -1 (nulos) cai na posição extra do fim
+    numeros = np.append(numeros, np.nan).take(codes)
+    motivo_linha = np.append(motivo, MOTIVOS.index("vazio")).take(codes)
+    rejeitadas = np.flatnonzero(motivo_linha >= 0)
+    rejeitados = _sem_rejeitados(valores.index[rejeitadas])
+    if len(rejeitadas):
+        rejeitados["Valor"] = valores.iloc[rejeitadas].astype(object).to_numpy()
+        rejeitados["Motivo"] = np.array(MOTIVOS, dtype=object)[motivo_linha[rejeitadas]]
+    relatorio = RelatorioPrecos(
+        decimal=decimal or DECIMAL_PADRAO,
+        decidido=decidido,
+        linhas=len(valores),
+        faixas=int(pesos[faixa].sum()),
+        negativos=int(pesos[negativo].sum()),
+        rejeitados=rejeitados,
+    )
+    return numeros, relatorio
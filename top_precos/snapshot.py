@@ -0,0 +1,43 @@
+"""Snapshot local do catálogo preparado, em Arrow/Feather, para partida a frio."""
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+CHAVE_DIGEST = b"top_precos.digest"
+CHAVE_VERSAO = b"top_precos.versao"
+
+
+def salvar_snapshot(df: pd.DataFrame, digest: str, caminho: str, versao=None):
+    """Grava ``df`` em ``caminho`` de forma atômica, marcado com o hash da planilha
+    e a ``versao`` das regras que o prepararam (a do produto canônico)."""
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    tabela = pa.Table.from_pandas(df, preserve_index=True)
+    metadados = {CHAVE_DIGEST: digest.encode()}
+    if versao is not None:
+        metadados[CHAVE_VERSAO] = str(versao).encode()
+    tabela = tabela.replace_schema_metadata({**(tabela.schema.metadata or {}), **metadados})
+    tmp = f"{caminho}.tmp"
+    feather.write_feather(tabela, tmp)
+    os.replace(tmp, caminho)
+
+
+def ler_snapshot(caminho: str, digest: str = None, versao=None):
+    """(digest, DataFrame) do snapshot em ``caminho``, ou None.
+
+    Com ``digest`` informado, só devolve o snapshot se ele for daquela versão
+    da planilha; com ``versao``, só se foi preparado por aquela versão das
+    regras (snapshot gravado sem versão também fica de fora).
+    """
+    try:
+        tabela = feather.read_table(caminho, memory_map=True)
+    except (OSError, pa.ArrowInvalid):
+        return None
+    metadados = tabela.schema.metadata or {}
+    salvo = metadados.get(CHAVE_DIGEST)
+    if salvo is None or (digest is not None and salvo.decode() != digest):
+        return None
+    if versao is not None and metadados.get(CHAVE_VERSAO) != str(versao).encode():
+        return None
+    return salvo.decode(), tabela.to_pandas()
@@ -0,0 +1,60 @@
+"""Normalização de nomes de produto para busca e agrupamento."""
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+
+def _norm_nfd(s) -> str:
+    """Implementação de referência: NFD completo e filtro por categoria."""
+    s = str(s or "").strip().lower()
+    s = "".join(ch for ch in unicodedata.normalize("NFD", s) if unicodedata.category(ch) != "Mn")
+    s = " ".join(s.split())
+    return s
+
+
+class _ForaDaTabela(Exception):
+    pass
+
+
+class _TabelaAcentos(dict):
+    """Tabela de ``str.translate`` preenchida sob demanda.
+
+    Cada caractere vira sua decomposição NFD sem as marcas Mn. Isso equivale ao
+    NFD da string inteira, exceto quando sobra uma marca combinante que não é Mn
+    (a reordenação canônica poderia mudar o resultado): esses caracteres
+    levantam ``_ForaDaTabela`` e a string segue pela referência.
+    """
+
+    def __missing__(self, cp):
+        ch = chr(cp)
+        partes = unicodedata.normalize("NFD", ch)
+        if any(unicodedata.combining(c) and unicodedata.category(c) != "Mn" for c in partes):
+            raise _ForaDaTabela
+        valor = "".join(c for c in partes if unicodedata.category(c) != "Mn")
+        self[cp] = valor
+        return valor
+
+
+_TABELA = _TabelaAcentos()
+
+
+def norm(s) -> str:
+    s = str(s or "").strip().lower()
+    if not s.isascii():
+        try:
+            s = s.translate(_TABELA)
+        except _ForaDaTabela:
+            return _norm_nfd(s)
+    return " ".join(s.split())
+
+
+def norm_series(valores: pd.Series) -> pd.Series:
+    """``valores.apply(norm)`` normalizando cada nome distinto uma única vez."""
+    codes, uniques = pd.factorize(valores)
+    # Sentinela -1 (nulos) cai no "" extra do fim; None e NaN são tratados à parte
+    normalizados = np.array([norm(u) for u in uniques] + [""], dtype=object).take(codes)
+    nulos = codes < 0
+    if nulos.any():
+        normalizados[nulos] = [norm(v) for v in valores.to_numpy(dtype=object)[nulos]]
+    return pd.Series(normalizados, index=valores.index, dtype=object)